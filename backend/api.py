@@ -1,25 +1,316 @@
 # api.py - FINAL FIXED VERSION
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Request
+from starlette.requests import ClientDisconnect
 from fastapi.middleware.cors import CORSMiddleware  
-import joblib
-import warnings
-import pandas as pd
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+import asyncio
+import logging
+import time
+import secrets
+import threading
 import sys
 import os
-
-# Suppress scikit-learn version warnings
-from sklearn.exceptions import InconsistentVersionWarning
-warnings.filterwarnings("ignore", category=InconsistentVersionWarning)
+from typing import List, Optional, Tuple
+from pydantic import BaseModel
 
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.predictor import PredictorService
 from src.fighter_service import FighterService
+from src.prediction_cache import PredictionCache, file_version
+from src.batcher import MicroBatcher
+from src.workers import BoundedExecutor, Overloaded
+from src.metrics import REGISTRY, CONTENT_TYPE, MetricsMiddleware, span
+from src.snapshots import load_model, load_fighter_service, validate_services
+from src.matchup_matrix import MatchupMatrices, load_matrices
+from src.entity_index import EntityIndex, entities_path, load_entity_index
+from src.export import (FIGHTER_COLUMNS, PREDICTION_COLUMNS, RecordEncoder, fighter_records, read_pairs,
+                        score_pairs, unscored_records)
+from src.simulation import win_matrix, simulate_bracket, simulate_title_defenses, standard_error
+
+# INFO shows startup messages; DEBUG adds per-request name resolution and span timings
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO').upper(), format='%(levelname)s %(name)s: %(message)s')
+
+# Paths are relative to this file, not the working directory
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(BASE_DIR, 'models', 'ufc_predictor.joblib')
+FIGHTER_DB_PATH = os.path.join(BASE_DIR, 'fighter_database_REBALANCED.json')
+SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR', os.path.join(BASE_DIR, 'snapshots'))
+DATA_DIR = os.path.join(BASE_DIR, '..', 'data', 'data')
+
+# Hot reload: poll the model + fighter DB every HOT_RELOAD_INTERVAL seconds (0 = only POST /admin/reload);
+# with ADMIN_TOKEN set, /admin endpoints need a matching X-Admin-Token header
+HOT_RELOAD_INTERVAL = float(os.environ.get('HOT_RELOAD_INTERVAL', '0'))
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+logger = logging.getLogger('api')
+
+# POST /simulate limits
+MAX_SIMULATION_FIGHTERS = 64
+MAX_SIMULATION_SAMPLES = 10_000_000
+MAX_SIMULATION_SECONDS = 10.0
+
+# POST /export/predictions: a batch still refused by a full pool after this long is
+# streamed back as error records instead of retrying forever
+EXPORT_RETRY_SECONDS = float(os.environ.get('EXPORT_RETRY_SECONDS', '30'))
+
+# Matchup cache in front of the predictor (keys include model + fighter DB versions)
+prediction_cache = PredictionCache(
+    max_size=int(os.environ.get('PREDICTION_CACHE_SIZE', '4096')),
+    ttl_seconds=float(os.environ.get('PREDICTION_CACHE_TTL', '3600'))
+)
+REGISTRY.callback('ufc_prediction_cache_hits_total', 'Prediction cache hits', lambda: prediction_cache.hits, 'counter')
+REGISTRY.callback('ufc_prediction_cache_misses_total', 'Prediction cache misses', lambda: prediction_cache.misses, 'counter')
+REGISTRY.callback('ufc_prediction_cache_evictions_total', 'Prediction cache LRU evictions',
+                  lambda: prediction_cache.evictions, 'counter')
+REGISTRY.callback('ufc_prediction_cache_entries', 'Prediction cache size', lambda: prediction_cache.stats()['size'])
+
+# Model inference and name scans run here, not on the event loop; beyond
+# INFERENCE_WORKERS running + INFERENCE_QUEUE waiting, requests get 503 + Retry-After
+INFERENCE_WORKERS = int(os.environ.get('INFERENCE_WORKERS', str(min(4, os.cpu_count() or 1))))
+INFERENCE_QUEUE = int(os.environ.get('INFERENCE_QUEUE', '64'))
+inference = BoundedExecutor(max_workers=INFERENCE_WORKERS, max_queue=INFERENCE_QUEUE)
+REGISTRY.callback('ufc_executor_pending', 'Inference tasks running or waiting', lambda: inference.pending)
+
+# Concurrent /predict-fight requests are scored together: a batch closes after
+# PREDICT_BATCH_WAIT_MS or PREDICT_BATCH_SIZE requests, whichever comes first
+PREDICT_BATCH_SIZE = int(os.environ.get('PREDICT_BATCH_SIZE', '32'))
+PREDICT_BATCH_WAIT_MS = float(os.environ.get('PREDICT_BATCH_WAIT_MS', '2'))
+
+# Loaded by the lifespan hook (or lazily on first use) - nothing heavy at import time.
+# _services is swapped as ONE tuple by a reload, so a request never sees a new model with an
+# old roster; requests that already hold the old pair finish on it.
+_services: Optional[Tuple[PredictorService, FighterService]] = None
+predictor: Optional[PredictorService] = None
+fighter_service: Optional[FighterService] = None
+matchup_matrices: Optional[MatchupMatrices] = None
+_load_lock = threading.Lock()
+_reload_lock = threading.Lock()
+# Matchup matrices are built by a background job (startup, after a reload), never inside a
+# request and never under _load_lock, so a slow build can't hold up a service swap
+_matrices_lock = threading.Lock()
+_matrices_job: Optional[threading.Thread] = None
+MATRICES_RETRY_AFTER = 5
+service_info = {'loaded_at': None, 'reloads': 0, 'last_reload': None}
+
+def _load_services(current: Optional[Tuple[PredictorService, FighterService]] = None
+                   ) -> Tuple[PredictorService, FighterService]:
+    """Load the model + fighter DB (artifacts whose version didn't change are reused from current)"""
+    current_predictor, current_fighters = current or (None, None)
+    if current_predictor is not None and file_version(MODEL_PATH) == current_predictor.model_version:
+        new_predictor = current_predictor
+    else:
+        engine = os.environ.get('PREDICTOR_ENGINE', 'flat')
+        n_threads = int(os.environ.get('PREDICTOR_THREADS', '1'))
+        model, model_version = load_model(MODEL_PATH, SNAPSHOT_DIR, engine=engine, n_threads=n_threads)
+        new_predictor = PredictorService(
+            model,
+            engine=engine,
+            n_threads=n_threads,
+            cache=prediction_cache,
+            model_version=model_version
+        )
+    new_fighters = load_fighter_service(FIGHTER_DB_PATH, SNAPSHOT_DIR)
+    if current_fighters is not None and new_fighters.version == current_fighters.version:
+        new_fighters = current_fighters
+    entities = _load_entities(current_fighters.entities if current_fighters is not None else None)
+    if entities is not None and new_fighters.entities is not entities:
+        # Never mutate the served roster: a copy gets the new index and is validated + swapped in
+        new_fighters = new_fighters.with_entities(entities)
+    return new_predictor, new_fighters
+
+def _load_entities(current: Optional[EntityIndex] = None) -> Optional[EntityIndex]:
+    """Fighter_Id / event index over the data CSVs (None when they aren't deployed - names resolve as before)"""
+    if not os.path.isfile(os.path.join(DATA_DIR, 'Fights.csv')):
+        logger.warning("⚠️ No fight data in %s - name resolution without Fighter_Ids", DATA_DIR)
+        return None
+    _, versions = entities_path(SNAPSHOT_DIR, DATA_DIR)
+    if current is not None and current.versions == versions:
+        return current
+    return load_entity_index(DATA_DIR, SNAPSHOT_DIR)
+
+def _swap_services(services: Tuple[PredictorService, FighterService]):
+    global _services, predictor, fighter_service
+    with _load_lock:
+        _services = services
+        predictor, fighter_service = services
+        service_info['loaded_at'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+def get_services() -> Tuple[PredictorService, FighterService]:
+    """REBALANCED predictor and fighter database, loaded once per process (swapped by a reload)"""
+    services = _services
+    if services is None:
+        with _reload_lock:
+            if _services is None:
+                _swap_services(_load_services())
+            services = _services
+    return services
+
+def reload_services() -> dict:
+    """
+    Load changed artifacts, validate them, then swap them in atomically
+    
+    Runs off the event loop; requests keep being served by the current
+    versions meanwhile. A model or roster that fails validation is never
+    served (ValueError, old versions stay).
+    """
+    if not _reload_lock.acquire(blocking=False):
+        raise RuntimeError("A reload is already in progress")
+    try:
+        start = time.perf_counter()
+        current = _services
+        previous = _versions(current) if current is not None else None
+        try:
+            services = _load_services(current)
+            if services != current:
+                validate_services(*services)
+        except Exception as e:
+            service_info['last_reload'] = {'status': 'failed', 'error': str(e),
+                                           'at': datetime.now(timezone.utc).isoformat(timespec='seconds')}
+            logger.error("❌ Reload rejected, still serving %s: %s", previous, e)
+            raise ValueError(f"Reload rejected: {e}") from e
+        
+        status = 'unchanged' if services == current else 'reloaded'
+        if status == 'reloaded':
+            _swap_services(services)
+            if current is not None and current[0] is not services[0]:
+                # Tree threads stop once in-flight requests drop the old model
+                current[0].retire()
+            service_info['reloads'] += 1
+            logger.info("🔄 Reloaded %s -> %s", previous, _versions(services))
+            start_matrices_job(services)
+        result = {'status': status, 'versions': _versions(services), 'previous': previous,
+                  'seconds': round(time.perf_counter() - start, 3)}
+        service_info['last_reload'] = {'status': status, 'at': datetime.now(timezone.utc).isoformat(timespec='seconds')}
+        return result
+    finally:
+        _reload_lock.release()
+
+def _versions(services: Tuple[PredictorService, FighterService]) -> dict:
+    return {'model': services[0].model_version, 'fighter_db': services[1].version}
+
+def _artifact_fingerprint() -> Tuple:
+    """Cheap change detector for the watcher (mtime + size; reload_services compares content hashes)"""
+    fingerprint = []
+    for path in (MODEL_PATH, FIGHTER_DB_PATH):
+        try:
+            stat = os.stat(path)
+            fingerprint.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            fingerprint.append(None)
+    return tuple(fingerprint)
+
+async def watch_artifacts(interval: float):
+    """Reload when the model or fighter DB changes (after the files stop changing for one interval)"""
+    loaded = _artifact_fingerprint()
+    previous = loaded
+    while True:
+        await asyncio.sleep(interval)
+        current = _artifact_fingerprint()
+        # A file still being written shows a different fingerprint on the next poll
+        if current != loaded and current == previous:
+            loaded = current
+            try:
+                await asyncio.to_thread(reload_services)
+            except (ValueError, RuntimeError):
+                pass  # logged; keep serving the current versions
+        previous = current
+
+def _matrices_current(matrices: Optional[MatchupMatrices], services: Tuple[PredictorService, FighterService]) -> bool:
+    return matrices is not None and all(matrices.versions.get(key) == value
+                                        for key, value in _versions(services).items())
+
+def _build_matrices(services: Tuple[PredictorService, FighterService], data_dir: str, snapshot_dir: str):
+    """Matrices job: open (or build) the matrices for services, then publish them"""
+    global matchup_matrices
+    predictor, fighter_service = services
+    try:
+        matrices = load_matrices(predictor, fighter_service, os.path.join(data_dir, 'Fights.csv'),
+                                 os.path.join(data_dir, 'Events.csv'), snapshot_dir)
+    except Exception:
+        logger.exception("❌ Building matchup matrices failed for %s", _versions(services))
+        return
+    with _matrices_lock:
+        # A job for a pair that was swapped out meanwhile doesn't replace newer matrices
+        if _services is services or matchup_matrices is None:
+            matchup_matrices = matrices
+
+def start_matrices_job(services: Optional[Tuple[PredictorService, FighterService]] = None) -> threading.Thread:
+    """Build the matrices for services (default: the served pair) in a background thread, once per pair"""
+    global _matrices_job
+    services = services or get_services()
+    with _matrices_lock:
+        job = _matrices_job
+        running_or_done = job is not None and job.services is services and \
+            (job.is_alive() or _matrices_current(matchup_matrices, services))
+        if not running_or_done:
+            job = threading.Thread(target=_build_matrices, args=(services, DATA_DIR, SNAPSHOT_DIR),
+                                   name='matchup-matrices', daemon=True)
+            job.services = services
+            _matrices_job = job
+            job.start()
+    return job
+
+def get_matrices() -> MatchupMatrices:
+    """Per-division matchup matrices for the served model + roster (503 + Retry-After while they are built)"""
+    services = get_services()
+    matrices = matchup_matrices
+    if not _matrices_current(matrices, services):
+        start_matrices_job(services)
+        raise HTTPException(status_code=503, detail="Matchup matrices are being built, retry shortly",
+                            headers={"Retry-After": str(MATRICES_RETRY_AFTER)})
+    return matrices
+
+def _predict_fight_batch(items: List[Tuple[PredictorService, FighterService, int, int]]) -> List[dict]:
+    """Score a micro-batch of resolved (predictor, fighter_service, red_row, blue_row) matchups with ONE model call"""
+    results = [None] * len(items)
+    # Normally one group; across a reload, each request is scored by the versions it started on
+    groups = {}
+    for index, (predictor, service, _, _) in enumerate(items):
+        groups.setdefault((id(predictor), id(service)), (predictor, service, []))[2].append(index)
+    for predictor, service, indices in groups.values():
+        predictions = predictor.predict_matchups_rows(
+            service.table, [items[i][2] for i in indices], [items[i][3] for i in indices], service.version
+        )
+        for index, prediction in zip(indices, predictions):
+            results[index] = prediction
+    return results
+
+predict_fight_batcher = MicroBatcher(
+    _predict_fight_batch, max_batch_size=PREDICT_BATCH_SIZE, max_wait_ms=PREDICT_BATCH_WAIT_MS,
+    executor=inference, name='predict_fight'
+)
+
+def _resolve_rows(fighter_service: FighterService, names: List[str]) -> List[int]:
+    """Fighter table rows for names (ValueError for an unknown fighter)"""
+    return [fighter_service.get_fighter_row(name) for name in names]
+
+async def resolve_rows(fighter_service: FighterService, names: List[str]) -> List[int]:
+    """Exact names resolve on the event loop; anything needing a roster scan runs on the inference pool"""
+    with span('resolve'):
+        rows = [fighter_service.exact_row(name) for name in names]
+        if None in rows:
+            rows = await inference.run(_resolve_rows, fighter_service, names)
+        return rows
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_matrices_job(get_services())
+    watcher = asyncio.create_task(watch_artifacts(HOT_RELOAD_INTERVAL)) if HOT_RELOAD_INTERVAL > 0 else None
+    yield
+    if watcher is not None:
+        watcher.cancel()
+    inference.shutdown(wait=False)
+    if _services is not None:
+        _services[0].close()
 
 app = FastAPI(
     title="UFC Predictor API", 
     version="2.0",
-    description="REBALANCED API for predicting UFC fights with fight stats emphasis"
+    description="REBALANCED API for predicting UFC fights with fight stats emphasis",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -29,16 +320,15 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
-# Load REBALANCED model
-model = joblib.load('models/ufc_predictor.joblib')
-predictor = PredictorService(model)
-
-# Load REBALANCED fighter database
-fighter_service = FighterService('fighter_database_REBALANCED.json')
+@app.exception_handler(Overloaded)
+async def overloaded(request, exc: Overloaded):
+    """Full worker queue: shed load instead of letting latency grow"""
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": str(exc.retry_after)})
 
 @app.get("/")
-def home():
+async def home():
     return {
         "message": "UFC Predictor API 🥊",
         "version": "2.0",
@@ -48,14 +338,25 @@ def home():
             "GET /": "This page",
             "GET /predict": "Predict with raw features",
             "GET /predict-fight": "Predict with fighter names (red_name, blue_name)",
+            "POST /predict-batch": "Predict a whole fight card in one model call",
+            "POST /simulate": "Monte Carlo a bracket or a run of title fights",
+            "GET /matrix/{weight_class}": "Precomputed P(row beats column) for a division's active fighters",
+            "GET /matrix/{weight_class}/{fighter}/opponents": "Top-N most (or least) favorable opponents",
             "GET /search/{query}": "Search fighters by name",
-            "GET /model-info": "Get REBALANCED model information"
+            "GET /fighters/{name}/fights": "A fighter's bouts, newest first (one entry per Fighter_Id with that name)",
+            "GET /export/fighters": "Stream the roster as NDJSON or CSV (weight_class, min_fights filters)",
+            "POST /export/predictions": "Stream predictions for pairs streamed in the body (NDJSON or CSV lines)",
+            "GET /model-info": "Get REBALANCED model information and the versions being served",
+            "GET /cache-stats": "Prediction cache hits, misses and size",
+            "GET /metrics": "Prometheus metrics: requests, errors, cache, per-stage latency",
+            "POST /admin/reload": "Hot-reload a new model / fighter database (validated, no restart)"
         }
     }
 
 @app.get("/model-info")
-def model_info():
+async def model_info():
     """Get REBALANCED model information"""
+    predictor, fighter_service = get_services()
     return {
         "model": "REBALANCED UFC Predictor v2.0",
         "emphasis": "Fight Statistics > Recent Form > Career",
@@ -71,18 +372,28 @@ def model_info():
         "files_used": [
             "ufc_predictor.joblib",
             "fighter_database_REBALANCED.json"
-        ]
+        ],
+        "inference_engine": predictor.engine,
+        "versions": {
+            "model": predictor.model_version,
+            "fighter_db": fighter_service.version
+        },
+        "fighters": len(fighter_service.table),
+        "loaded_at": service_info['loaded_at'],
+        "reloads": service_info['reloads'],
+        "last_reload": service_info['last_reload']
     }
 
 @app.get("/predict")
-def predict(
+async def predict(
     str_diff: float, kd_diff: float, td_diff: float, sub_diff: float,
     streak_diff: float, win_rate_diff: float, exp_diff: float
 ):
     """Predict using REBALANCED features (fight stats first!)"""
+    predictor, _ = get_services()
     try:
-        # Create features with REBALANCED priority order
-        features = pd.DataFrame([{
+        # Same feature code as training, in the model's column order
+        prediction_result = await inference.run(predictor.predict_from_diffs, {
             'str_diff': str_diff,
             'kd_diff': kd_diff,
             'td_diff': td_diff,
@@ -90,73 +401,395 @@ def predict(
             'streak_diff': streak_diff,
             'win_rate_diff': win_rate_diff,
             'exp_diff': exp_diff
-        }])
-        
-        probability = predictor.model.predict_proba(features)[0, 1]
-        
-        # Create a simple prediction result - MATCHES NEW PREDICTOR FORMAT
-        prediction_result = {
-            'probability_fighter1_wins': float(probability),
-            'probability_fighter2_wins': float(1 - probability),
-            'predicted_winner_id': 'fighter1' if probability > 0.5 else 'fighter2',  # FIXED: Use 'predicted_winner_id'
-            'confidence': predictor.calculate_confidence(probability),
-            'fighter1': 'Fighter 1',
-            'fighter2': 'Fighter 2',
-            'fight': 'Fighter 1 vs Fighter 2',
-            'feature_impacts': {'fight_stats': 0, 'recent_form': 0, 'career': 0},
-            'key_advantages': []
-        }
+        })
         
         return predictor.format_prediction_response(prediction_result)
         
+    except Overloaded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Prediction failed: {str(e)}")
 
 @app.get("/predict-fight")
-def predict_fight(red_name: str, blue_name: str):
-    """Predict fight outcome using fighter names (REBALANCED)"""
+async def predict_fight(red_name: str, blue_name: str):
+    """Predict fight outcome using fighter names (REBALANCED), micro-batched with concurrent requests"""
+    predictor, fighter_service = get_services()
     try:
-        # Get fighter stats from REBALANCED database
-        red_stats = fighter_service.get_fighter(red_name)
-        blue_stats = fighter_service.get_fighter(blue_name)
+        # Resolve fighters to rows of the REBALANCED fighter table
+        red_row, blue_row = await resolve_rows(fighter_service, [red_name, blue_name])
         
-        # Use REBALANCED prediction - returns a dictionary
-        prediction_result = predictor.predict_from_fighters(red_stats, blue_stats)
+        # Queued with other in-flight requests (identical matchups share one result)
+        with span('batch'):
+            prediction_result = await predict_fight_batcher.submit(
+                (predictor.model_version, fighter_service.version, red_row, blue_row),
+                (predictor, fighter_service, red_row, blue_row)
+            )
         
-        # Add fighter names to the prediction result
+        # Add fighter names to the prediction result (a copy - coalesced requests share it)
+        prediction_result = dict(prediction_result)
         prediction_result['fighter1'] = red_name
         prediction_result['fighter2'] = blue_name
         prediction_result['fight'] = f"{red_name} vs {blue_name}"
         
         # Format the response
-        response = predictor.format_prediction_response(prediction_result)
+        with span('format'):
+            response = predictor.format_prediction_response(prediction_result)
         
         return response
         
+    except Overloaded:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+class FightPair(BaseModel):
+    red_name: str
+    blue_name: str
+
+class BatchPredictionRequest(BaseModel):
+    fights: List[FightPair]
+
+@app.post("/predict-batch")
+async def predict_batch(request: BatchPredictionRequest):
+    """Predict every fight on a card with ONE vectorized model call"""
+    return await inference.run(_predict_batch, request)
+
+def _predict_batch(request: BatchPredictionRequest):
+    """/predict-batch body (runs on the inference pool)"""
+    predictor, fighter_service = get_services()
+    resolved = []
+    errors = []
+    
+    # Resolve all fighter names first - bad names become per-fight errors
+    for index, fight in enumerate(request.fights):
+        try:
+            red_row = fighter_service.get_fighter_row(fight.red_name)
+            blue_row = fighter_service.get_fighter_row(fight.blue_name)
+            resolved.append((index, fight, red_row, blue_row))
+        except ValueError as e:
+            errors.append({
+                "index": index,
+                "fight": f"{fight.red_name} vs {fight.blue_name}",
+                "detail": str(e)
+            })
+    
+    try:
+        prediction_results = predictor.predict_rows(
+            fighter_service.table,
+            [red_row for _, _, red_row, _ in resolved],
+            [blue_row for _, _, _, blue_row in resolved]
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    
+    predictions = []
+    for (index, fight, _, _), prediction_result in zip(resolved, prediction_results):
+        prediction_result['fighter1'] = fight.red_name
+        prediction_result['fighter2'] = fight.blue_name
+        prediction_result['fight'] = f"{fight.red_name} vs {fight.blue_name}"
+        
+        response = predictor.format_prediction_response(prediction_result)
+        response['index'] = index
+        predictions.append(response)
+    
+    return {
+        "count": len(request.fights),
+        "predictions": predictions,
+        "errors": errors
+    }
+
+class SimulationRequest(BaseModel):
+    fighters: List[str]
+    mode: str = "bracket"  # 'bracket' (seed order) or 'title' (fighters[0] defends against the rest in order)
+    samples: int = 100_000
+    time_budget_ms: float = 1000
+    seed: Optional[int] = None
+
+@app.post("/simulate")
+async def simulate(request: SimulationRequest):
+    """Monte Carlo a tournament from ONE batched win-probability matrix"""
+    return await inference.run(_simulate, request)
+
+def _simulate(request: SimulationRequest):
+    """/simulate body (runs on the inference pool)"""
+    predictor, fighter_service = get_services()
+    if request.mode not in ("bracket", "title"):
+        raise HTTPException(status_code=400, detail="mode must be 'bracket' or 'title'")
+    if not 2 <= len(request.fighters) <= MAX_SIMULATION_FIGHTERS:
+        raise HTTPException(status_code=400, detail=f"Simulate between 2 and {MAX_SIMULATION_FIGHTERS} fighters")
+    if not 1 <= request.samples <= MAX_SIMULATION_SAMPLES:
+        raise HTTPException(status_code=400, detail=f"samples must be between 1 and {MAX_SIMULATION_SAMPLES:,}")
+    
+    try:
+        rows = [fighter_service.get_fighter_row(name) for name in request.fighters]
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    names = [fighter_service.table.names[row] for row in rows]
+    if len(set(rows)) != len(rows):
+        raise HTTPException(status_code=400, detail="Each fighter can only be entered once")
+    
+    # Returned so any run can be reproduced exactly
+    seed = request.seed if request.seed is not None else secrets.randbits(32)
+    time_budget = min(max(request.time_budget_ms, 0) / 1000, MAX_SIMULATION_SECONDS)
+    try:
+        matrix = win_matrix(predictor, fighter_service.table, rows)
+        run = simulate_bracket if request.mode == "bracket" else simulate_title_defenses
+        result = run(matrix, n_samples=request.samples, time_budget=time_budget, seed=seed)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    errors = standard_error(result['champion'], result['samples'])
+    fighters = [
+        {
+            "name": names[i],
+            "win_probability": round(float(result['champion'][i]), 6),
+            "standard_error": round(float(errors[i]), 6),
+            "rounds": [round(float(p), 6) for p in result['rounds'][:, i]]
+        }
+        for i in range(len(names))
+    ]
+    fighters.sort(key=lambda fighter: -fighter["win_probability"])
+    
+    return {
+        "mode": request.mode,
+        "samples": result['samples'],
+        "elapsed_ms": round(result['seconds'] * 1000, 2),
+        "seed": seed,
+        "fighters": fighters,
+        "entrants": names,
+        "win_matrix": [[round(float(p), 4) for p in row] for row in matrix]
+    }
+
+def _matrix_division(matrices: MatchupMatrices, weight_class: str) -> str:
+    try:
+        return matrices.weight_class(weight_class)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown weight class '{weight_class}'. "
+                                                    f"Try: {', '.join(matrices.divisions)}")
+
+def _matrix_fighter(matrices: MatchupMatrices, division: str, name: str) -> str:
+    """Resolve a (possibly misspelled) name and check the fighter is active in the division"""
+    _, fighter_service = get_services()
+    try:
+        fighter_name = fighter_service.table.names[fighter_service.get_fighter_row(name)]
+        matrices.row(division, fighter_name)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"{name} is not an active {division} fighter")
+    return fighter_name
+
+@app.get("/matrix/{weight_class}")
+async def matchup_matrix(weight_class: str, fighters: Optional[str] = None, offset: int = 0, limit: int = 50):
+    """Rows of a division's win-probability matrix (comma-separated fighters, or offset/limit)"""
+    return await inference.run(_matchup_matrix, weight_class, fighters, offset, limit)
+
+def _matchup_matrix(weight_class: str, fighters: Optional[str] = None, offset: int = 0, limit: int = 50):
+    """/matrix/{weight_class} body (runs on the inference pool)"""
+    matrices = get_matrices()
+    division = _matrix_division(matrices, weight_class)
+    if fighters is not None:
+        names = [_matrix_fighter(matrices, division, name.strip()) for name in fighters.split(',') if name.strip()]
+        rows, columns, probabilities = matrices.slice(division, names)
+    else:
+        rows, columns, probabilities = matrices.slice(division, offset=max(offset, 0), limit=min(max(limit, 0), 200))
+    
+    return {
+        "weight_class": division,
+        "fighters": len(columns),
+        "rows": rows,
+        "columns": columns,
+        "win_probability": [[round(float(p), 4) for p in row] for row in probabilities]
+    }
+
+@app.get("/matrix/{weight_class}/{fighter}/opponents")
+async def matrix_opponents(weight_class: str, fighter: str, top: int = 10, favorable: bool = True):
+    """Opponents in the division the fighter is most likely (favorable=false: least likely) to beat"""
+    return await inference.run(_matrix_opponents, weight_class, fighter, top, favorable)
+
+def _matrix_opponents(weight_class: str, fighter: str, top: int = 10, favorable: bool = True):
+    """/matrix/{weight_class}/{fighter}/opponents body (runs on the inference pool)"""
+    matrices = get_matrices()
+    division = _matrix_division(matrices, weight_class)
+    fighter_name = _matrix_fighter(matrices, division, fighter)
+    opponents = matrices.top_opponents(division, fighter_name, top=min(max(top, 1), 200), favorable=favorable)
+    return {
+        "weight_class": division,
+        "fighter": fighter_name,
+        "favorable": favorable,
+        "opponents": [{"name": name, "win_probability": round(p, 4)} for name, p in opponents]
+    }
+
 @app.get("/search/{query}")
-def search_fighters(query: str, limit: int = 10):
-    """Search for fighters by name"""
+async def search_fighters(query: str, limit: int = 10, fuzzy: bool = True):
+    """Search for fighters by name (typo-tolerant unless fuzzy=false)"""
+    return await inference.run(_search_fighters, query, limit, fuzzy)
+
+def _search_fighters(query: str, limit: int = 10, fuzzy: bool = True):
+    """/search/{query} body (runs on the inference pool)"""
+    _, fighter_service = get_services()
     if len(query) < 2:
         raise HTTPException(
             status_code=400, 
             detail="Search query must be at least 2 characters"
         )
     
-    results = fighter_service.search_fighters(query, limit)
+    results = fighter_service.search_fighters(query, limit, fuzzy=fuzzy)
     return {
         "query": query,
         "count": len(results),
         "fighters": results
     }
 
+@app.get("/fighters/{name}/fights")
+async def fighter_fights(name: str, limit: int = 20):
+    """Fight history by name: name -> Fighter_Id(s) -> CSR slice of their bouts"""
+    return await inference.run(_fighter_fights, name, limit)
+
+def _fighter_fights(name: str, limit: int = 20):
+    """/fighters/{name}/fights body (runs on the inference pool)"""
+    _, fighter_service = get_services()
+    entities = fighter_service.entities
+    if entities is None:
+        raise HTTPException(status_code=503, detail="Fight history is not available (no fight data loaded)")
+    
+    # Exact names go straight to their ids; anything else resolves like /predict-fight first
+    fighter_ids = fighter_service.fighter_ids(name)
+    if not fighter_ids:
+        try:
+            row = fighter_service.get_fighter_row(name)
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        fighter_ids = fighter_service.fighter_ids(fighter_service.table.names[row])
+        if not fighter_ids:
+            raise HTTPException(status_code=404, detail=f"No fight history for '{fighter_service.table.names[row]}'")
+    
+    limit = min(max(limit, 1), 500)
+    return {
+        "query": name,
+        "fighters": [{
+            "fighter_id": fighter_id,
+            "name": entities.name_of(fighter_id),
+            "total_fights": len(entities.fights_of(fighter_id)),
+            "fights": entities.fight_records(fighter_id, limit)
+        } for fighter_id in fighter_ids]
+    }
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for a body that is still reading the request
+    
+    Below ASGI spec 2.4 StreamingResponse listens for a disconnect with
+    receive(), which would swallow the request body chunks the stream reads.
+    A disconnect still surfaces: request.stream() raises ClientDisconnect, and
+    a failed send is turned into ClientDisconnect as in ASGI 2.4 servers.
+    """
+    
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
+
+def _encoder(format: str, columns: List[str]) -> RecordEncoder:
+    try:
+        return RecordEncoder(format, columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _export_headers(name: str, encoder: RecordEncoder) -> dict:
+    return {"Content-Disposition": f'attachment; filename="{name}.{encoder.format}"'}
+
+@app.get("/export/fighters")
+async def export_fighters(format: str = "ndjson", weight_class: Optional[str] = None, min_fights: int = 0):
+    """Stream every fighter matching the filters, in chunks (memory doesn't grow with the roster)"""
+    _, fighter_service = get_services()
+    encoder = _encoder(format, FIGHTER_COLUMNS)
+    if weight_class is not None and fighter_service.entities is None:
+        raise HTTPException(status_code=503, detail="Weight classes are not available (no fight data loaded)")
+    
+    def stream():
+        # A sync generator: Starlette iterates it in a worker thread, off the event loop
+        yield encoder.header()
+        for records in fighter_records(fighter_service, weight_class, min_fights):
+            yield encoder.encode(records)
+    
+    return StreamingResponse(stream(), media_type=encoder.media_type,
+                             headers=_export_headers("fighters", encoder))
+
+@app.post("/export/predictions")
+async def export_predictions(request: Request, format: str = "ndjson", input_format: Optional[str] = None):
+    """
+    Score pairs streamed in the request body, streaming the results back as they are scored
+    
+    The body is one pair per line: {"red_name": ..., "blue_name": ...} objects
+    (NDJSON) or red_name,blue_name rows (CSV, input_format=csv or a text/csv
+    body). Pairs are read and scored one chunk at a time on the inference pool,
+    so memory stays flat however many pairs are sent. Bad lines and unknown
+    fighters become records with an error instead of failing the export.
+    """
+    predictor, fighter_service = get_services()
+    encoder = _encoder(format, PREDICTION_COLUMNS)
+    if input_format is None:
+        input_format = 'csv' if request.headers.get('content-type', '').startswith('text/csv') else 'ndjson'
+    if input_format not in ('ndjson', 'csv'):
+        raise HTTPException(status_code=400, detail="input_format must be 'ndjson' or 'csv'")
+    
+    async def score(pairs):
+        # Once streaming, a full pool slows the export down instead of failing it - up to a deadline
+        deadline = time.monotonic() + EXPORT_RETRY_SECONDS
+        while True:
+            try:
+                return await inference.run(score_pairs, predictor, fighter_service, pairs)
+            except Overloaded as e:
+                if time.monotonic() + e.retry_after > deadline:
+                    logger.warning("Export batch of %d pairs not scored: %s", len(pairs), e)
+                    return unscored_records(pairs, f"Not scored: {e}")
+                await asyncio.sleep(e.retry_after)
+    
+    batches = read_pairs(request.stream(), input_format)
+    # The first batch is scored before the response starts, so a full pool is still a 503
+    first = await anext(batches, None)
+    first_records = await inference.run(score_pairs, predictor, fighter_service, first) if first else []
+    
+    async def stream():
+        yield encoder.header() + encoder.encode(first_records)
+        async for pairs in batches:
+            yield encoder.encode(await score(pairs))
+    
+    return DuplexStreamingResponse(stream(), media_type=encoder.media_type,
+                                   headers=_export_headers("predictions", encoder))
+
+@app.post("/admin/reload")
+async def admin_reload(x_admin_token: Optional[str] = Header(default=None)):
+    """Load a new model / fighter DB in the background, validate it and swap it in without a restart"""
+    if ADMIN_TOKEN and not secrets.compare_digest(x_admin_token or '', ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    try:
+        return await asyncio.to_thread(reload_services)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@app.get("/cache-stats")
+async def cache_stats():
+    """Prediction cache hit/miss counters"""
+    return prediction_cache.stats()
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text exposition of the request, cache and stage-latency metrics"""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
 @app.get("/feature-importance")
-def feature_importance():
+async def feature_importance():
     """Get REBALANCED feature importance"""
+    predictor, _ = get_services()
     importance = predictor.get_feature_importance()
     
     # Categorize for REBALANCED model
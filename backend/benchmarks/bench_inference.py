@@ -0,0 +1,42 @@
+# benchmarks/bench_inference.py - sklearn vs FlatForest per-request latency
+# Run from backend/: python -m benchmarks.bench_inference
+import time
+import warnings
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.exceptions import InconsistentVersionWarning
+warnings.filterwarnings("ignore", category=InconsistentVersionWarning)
+
+from src.flat_forest import FlatForest
+
+def _time_per_call(fn, repeat: int) -> float:
+    """Median seconds per call"""
+    fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+def main():
+    model = joblib.load('models/ufc_predictor.joblib')
+    columns = list(model.feature_names_in_)
+    data = pd.read_csv('../data/ufc_processed_REBALANCED.csv')[columns]
+    flat = FlatForest(model)
+    
+    max_diff = np.abs(flat.predict_proba(data.to_numpy()) - model.predict_proba(data)).max()
+    print(f"📐 Max |FlatForest - sklearn| over {len(data)} rows: {max_diff:.2e}")
+    
+    print(f"\n{'rows':>6} {'sklearn':>12} {'flat':>12} {'speedup':>9}")
+    for rows in (1, 15, 1000):
+        batch = data.iloc[:rows]
+        batch_array = batch.to_numpy()
+        repeat = 50 if rows < 1000 else 10
+        sklearn_time = _time_per_call(lambda: model.predict_proba(batch), repeat)
+        flat_time = _time_per_call(lambda: flat.predict_proba(batch_array), repeat)
+        print(f"{rows:>6} {sklearn_time * 1e3:>10.2f}ms {flat_time * 1e3:>10.2f}ms {sklearn_time / flat_time:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
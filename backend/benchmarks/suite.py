@@ -0,0 +1,354 @@
+# benchmarks/suite.py - performance baseline for loading, inference, lookup, the DB build and the API
+# Run from backend/: python -m benchmarks.suite [--only predictor,lookup] [--quick] [--save-baseline]
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import warnings
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCHMARK_DIR)
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, 'baseline.json')
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, 'results')
+MODEL_PATH = os.path.join(BACKEND_DIR, 'models', 'ufc_predictor.joblib')
+FIGHTER_DB_PATH = os.path.join(BACKEND_DIR, 'fighter_database_REBALANCED.json')
+SNAPSHOT_DIR = os.path.join(BACKEND_DIR, 'snapshots')
+FIGHTS_PATH = os.path.join(BACKEND_DIR, '..', 'data', 'data', 'Fights.csv')
+
+# A benchmark is a regression when it is this much slower than the baseline
+DEFAULT_TOLERANCE = 0.25
+
+# Each timed sample runs the function enough times to take at least this long (like timeit's autorange)
+MIN_SAMPLE_SECONDS = 0.02
+
+# Query shapes for name lookup: exact, prefix, substring, misspelled and unknown
+LOOKUP_QUERIES = {
+    'exact': 'Jon Jones',
+    'prefix': 'israel ades',
+    'substring': 'nurmagomedov',
+    'typo': 'Jon Jnoes',
+    'miss': 'Zzyzx Qwerty'
+}
+
+
+def measure(fn: Callable, repeat: int = 7, min_sample_seconds: float = MIN_SAMPLE_SECONDS) -> Dict:
+    """
+    Milliseconds per call over `repeat` samples (after one warm-up call)
+
+    'ms' is the best sample - like timeit, the least noisy estimate on a shared
+    machine - and is what compare() checks; median and p90 show the spread.
+    """
+    fn()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_sample_seconds or number >= 1 << 16:
+            break
+        number *= 10
+
+    timings = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - start) / number)
+    best = min(timings)
+    return {
+        'ms': best * 1000,
+        'median_ms': float(np.median(timings)) * 1000,
+        'p90_ms': float(np.percentile(timings, 90)) * 1000,
+        'ops_per_s': 1.0 / best if best > 0 else float('inf'),
+        'samples': len(timings),
+        'calls_per_sample': number
+    }
+
+
+def _quiet(fn: Callable) -> Callable:
+    """Run fn with its console output swallowed (build scripts print progress)"""
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+    return run
+
+
+class Context:
+    """Services shared across benchmark groups, loaded on first use"""
+
+    def __init__(self, repeat: int):
+        self.repeat = repeat
+        self._services = {}
+
+    def fighter_service(self):
+        if 'fighters' not in self._services:
+            from src.snapshots import load_fighter_service
+            self._services['fighters'] = load_fighter_service(FIGHTER_DB_PATH, SNAPSHOT_DIR)
+        return self._services['fighters']
+
+    def predictor(self, engine: str):
+        if engine not in self._services:
+            from src.predictor import PredictorService
+            from src.snapshots import load_model
+            model, version = load_model(MODEL_PATH, SNAPSHOT_DIR, engine=engine)
+            self._services[engine] = PredictorService(model, engine=engine, model_version=version)
+        return self._services[engine]
+
+    def pairs(self, n: int, seed: int = 0):
+        """n random (row1, row2) fighter pairs"""
+        rng = np.random.default_rng(seed)
+        rows = rng.choice(len(self.fighter_service().table), size=(n, 2))
+        return rows[:, 0], rows[:, 1]
+
+
+def bench_load(ctx: Context) -> Dict[str, Dict]:
+    """Cold-start pieces: fighter JSON, sklearn joblib, compiled snapshots"""
+    from src.fighter_service import FighterService
+    from src.flat_forest import FlatForest
+    from src.prediction_cache import file_version
+    from src.snapshots import _load_joblib_model, load_fighter_service
+
+    ctx.predictor('flat')  # make sure the model snapshot exists
+    load_fighter_service(FIGHTER_DB_PATH, SNAPSHOT_DIR)
+    flat_snapshot = os.path.join(SNAPSHOT_DIR, f"ufc_predictor-{file_version(MODEL_PATH)}.flat")
+    repeat = max(ctx.repeat // 2, 1)
+    return {
+        'load.fighter_json': measure(lambda: FighterService(FIGHTER_DB_PATH), repeat),
+        'load.fighter_snapshot': measure(lambda: load_fighter_service(FIGHTER_DB_PATH, SNAPSHOT_DIR), repeat),
+        'load.model_joblib': measure(lambda: _load_joblib_model(MODEL_PATH), repeat),
+        'load.model_snapshot': measure(lambda: FlatForest.load(flat_snapshot, mmap_mode='r'), repeat)
+    }
+
+
+def bench_predictor(ctx: Context) -> Dict[str, Dict]:
+    """PredictorService inference, uncached, for one fight, a card and a large batch"""
+    table = ctx.fighter_service().table
+    results = {}
+    for engine in ('flat', 'sklearn'):
+        predictor = ctx.predictor(engine)
+        for size in (1, 15, 1000):
+            rows1, rows2 = ctx.pairs(size)
+            results[f'predictor.{engine}.rows_{size}'] = measure(
+                lambda: predictor.predict_rows(table, rows1, rows2), ctx.repeat)
+        rows1, rows2 = ctx.pairs(10_000)
+        results[f'predictor.{engine}.proba_10000'] = measure(
+            lambda: predictor.predict_proba_rows(table, rows1, rows2), ctx.repeat)
+    return results
+
+
+def bench_lookup(ctx: Context) -> Dict[str, Dict]:
+    """FighterService.get_fighter and search_fighters across query shapes"""
+    fighter_service = ctx.fighter_service()
+
+    def get_fighter(query):
+        def run():
+            try:
+                fighter_service.get_fighter(query)
+            except ValueError:
+                pass
+        return run
+
+    results = {}
+    for shape, query in LOOKUP_QUERIES.items():
+        results[f'lookup.get_fighter.{shape}'] = measure(get_fighter(query), ctx.repeat)
+        results[f'lookup.search.{shape}'] = measure(lambda: fighter_service.search_fighters(query), ctx.repeat)
+    return results
+
+
+def bench_build(ctx: Context) -> Dict[str, Dict]:
+    """Full fighter_db.py rebuild from Fights.csv (columnar cache warm)"""
+    import fighter_db
+    build = _quiet(lambda: fighter_db.build_fighter_db_for_REBALANCED_model(FIGHTS_PATH))
+    return {'build.fighter_db_full': measure(build, max(ctx.repeat // 2, 1))}
+
+
+async def _drive(client, pairs: List, concurrency: int) -> List[float]:
+    """Send GET /predict-fight for every pair with `concurrency` requests in flight"""
+    queue = asyncio.Queue()
+    for pair in pairs:
+        queue.put_nowait(pair)
+    latencies = []
+
+    async def worker():
+        while not queue.empty():
+            red, blue = queue.get_nowait()
+            start = time.perf_counter()
+            response = await client.get('/predict-fight', params={'red_name': red, 'blue_name': blue})
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+def bench_api(ctx: Context, n_requests: Optional[int] = None, concurrency: int = 8) -> Dict[str, Dict]:
+    """End-to-end GET /predict-fight through the ASGI app in-process (cold and warm prediction cache)"""
+    import httpx
+    import api
+
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    api.get_services()
+    names = api.fighter_service.table.names
+    n_requests = n_requests or 100 * ctx.repeat
+    rng = random.Random(0)
+    pairs = [tuple(rng.sample(names, 2)) for _ in range(n_requests)]
+
+    async def run(label):
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+            await _drive(client, pairs[:concurrency], concurrency)  # warm-up
+            if label == 'uncached':
+                api.prediction_cache.clear()
+            start = time.perf_counter()
+            latencies = await _drive(client, pairs, concurrency)
+            elapsed = time.perf_counter() - start
+        return {
+            'ms': elapsed / len(pairs) * 1000,
+            'p50_ms': float(np.percentile(latencies, 50)) * 1000,
+            'p99_ms': float(np.percentile(latencies, 99)) * 1000,
+            'ops_per_s': len(pairs) / elapsed,
+            'requests': len(pairs),
+            'concurrency': concurrency
+        }
+
+    # Second pass repeats the same pairs, so every request hits the prediction cache
+    return {f'api.predict_fight.{label}': asyncio.run(run(label)) for label in ('uncached', 'cached')}
+
+
+GROUPS = {
+    'load': bench_load,
+    'predictor': bench_predictor,
+    'lookup': bench_lookup,
+    'build': bench_build,
+    'api': bench_api
+}
+
+
+def environment() -> Dict:
+    """Where the numbers came from - only compare results from the same kind of machine"""
+    import pandas as pd
+    import sklearn
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                                capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count()
+    }
+
+
+def run_suite(groups: List[str], repeat: int = 7) -> Dict:
+    ctx = Context(repeat)
+    results = {}
+    for group in groups:
+        start = time.perf_counter()
+        results.update(GROUPS[group](ctx))
+        print(f"⏱️  {group}: {time.perf_counter() - start:.1f}s")
+    return {'environment': environment(), 'results': results}
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float = DEFAULT_TOLERANCE) -> List[Dict]:
+    """
+    Per-benchmark ms ratio against the baseline
+
+    Returns:
+        One row per benchmark present in both runs, with status
+        'regression' (slower by more than tolerance), 'faster' or 'ok'
+    """
+    rows = []
+    for name, result in sorted(current['results'].items()):
+        base = baseline['results'].get(name)
+        if base is None or not base['ms']:
+            continue
+        ratio = result['ms'] / base['ms']
+        if ratio > 1 + tolerance:
+            status = 'regression'
+        elif ratio < 1 / (1 + tolerance):
+            status = 'faster'
+        else:
+            status = 'ok'
+        rows.append({'name': name, 'baseline_ms': base['ms'], 'ms': result['ms'], 'ratio': ratio, 'status': status})
+    return rows
+
+
+def print_results(run: Dict, comparison: Optional[List[Dict]] = None):
+    ratios = {row['name']: row for row in comparison or []}
+    icons = {'regression': '❌', 'faster': '🚀', 'ok': '✅'}
+    print(f"\n{'benchmark':42s} {'ms':>11s} {'ops/s':>12s} {'baseline':>11s} {'ratio':>7s}")
+    for name, result in sorted(run['results'].items()):
+        row = ratios.get(name)
+        baseline = f"{row['baseline_ms']:11.4f} {row['ratio']:6.2f}x {icons[row['status']]}" if row else ''
+        print(f"{name:42s} {result['ms']:11.4f} {result['ops_per_s']:12.1f} {baseline}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and compare against the stored baseline")
+    parser.add_argument('--only', default=','.join(GROUPS), help=f"comma-separated groups ({', '.join(GROUPS)})")
+    parser.add_argument('--quick', action='store_true', help="fewer samples (noisier; for a smoke check)")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="baseline JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown before a benchmark counts as a regression (0.25 = 25%%)")
+    parser.add_argument('--save-baseline', action='store_true', help="write this run as the new baseline")
+    parser.add_argument('--output', help="results JSON path (default: benchmarks/results/<timestamp>.json)")
+    args = parser.parse_args(argv)
+
+    groups = [group.strip() for group in args.only.split(',') if group.strip()]
+    unknown = [group for group in groups if group not in GROUPS]
+    if unknown:
+        parser.error(f"unknown group(s): {', '.join(unknown)}")
+
+    warnings.filterwarnings('ignore')
+    logging.getLogger().setLevel(logging.WARNING)
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')  # read when api.py is imported
+    run = run_suite(groups, repeat=3 if args.quick else 7)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(run, f, indent=2)
+
+    comparison = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            comparison = compare(run, json.load(f), args.tolerance)
+    print_results(run, comparison)
+    print(f"\n💾 Results: {os.path.normpath(output)}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(run, f, indent=2)
+        print(f"📌 Baseline saved: {os.path.normpath(args.baseline)}")
+        return 0
+
+    regressions = [row for row in comparison or [] if row['status'] == 'regression']
+    if regressions:
+        print(f"❌ {len(regressions)} benchmark(s) slower than the baseline by more than {args.tolerance:.0%}:")
+        for row in regressions:
+            print(f"   • {row['name']}: {row['baseline_ms']:.4f}ms -> {row['ms']:.4f}ms ({row['ratio']:.2f}x)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,136 +1,272 @@
-import pandas as pd
 import json
-from collections import defaultdict
+import os
+import math
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+
+from src.columnar import load_csv
+from src.feature_store import (FIGHT_STAT_COLUMNS, RECENT_WINDOW, STREAK_WINDOW, FeatureStore,
+                               chronological_order, dated_fights)
+from src.prediction_cache import file_version
+from src.ratings import RatingEngine, days_since_epoch, fight_scores
+
+# The served database and the training set both come from src/feature_store.py;
+# these are the CSVs it reads (all in the Fights.csv directory)
+SOURCE_FILES = ['Fights.csv', 'Events.csv', 'Fighters.csv']
+
+# Incremental mode keeps every fighter's running state here
+STATE_PATH = 'fighter_db_state.json'
+# Bump when the state layout changes (older state files trigger a full replay)
+STATE_VERSION = 4
+
+# Running totals per fighter (FeatureStore appearance columns)
+RUNNING_STATS = ['kd', 'str', 'sub', 'td', 'win', 'finish']
+# Per-bout values kept for the last RECENT_WINDOW bouts (streak and recent averages)
+RECENT_STATS = ['win', 'kd', 'str']
+
+def source_versions(fights_path: str) -> Dict[str, str]:
+    """Content hash of every CSV the database is built from"""
+    data_dir = os.path.dirname(os.path.abspath(fights_path))
+    return {name: file_version(os.path.join(data_dir, name)) for name in SOURCE_FILES}
+
+def build_fighter_db_for_REBALANCED_model(fights_path: str = '../data/data/Fights.csv'):
+    """
+    Build fighter database with features YOUR REBALANCED model expects
+
+    The stats are the FeatureStore snapshot after every known fight, so
+    serving uses exactly the definitions the model was trained on. Keyed by
+    Fighter_Id (each record carries the display 'name'), so fighters sharing
+    a name keep separate entries. Events.csv and Fighters.csv must sit next
+    to fights_path.
+    """
 
-def build_fighter_db_for_REBALANCED_model():
-    """Build fighter database with features YOUR REBALANCED model expects"""
-    
     print("📊 Building database for REBALANCED 7-feature model...")
-    
-    # Load your fights CSV
-    df = pd.read_csv('../data/data/Fights.csv')
-    
-    # Track fighter career - ADD MORE STATS
-    fighters = defaultdict(lambda: {
-        'total_fights': 0,
-        'wins': 0,
-        'losses': 0,
-        'draws': 0,
-        
-        # FIGHT STATISTICS (MOST IMPORTANT)
-        'kd_total': 0,
-        'str_total': 0,
-        'sub_total': 0,
-        'td_total': 0,
-        
-        # NEW: Track for AVERAGES
-        'kd_history': [],
-        'str_history': [],
-        'sub_history': [],
-        'td_history': [],
-        
-        'fight_history': []  # Track recent fights for streak
-    })
-    
-    # Process each fight
-    for idx, row in df.iterrows():
-        f1 = row['Fighter_1']
-        f2 = row['Fighter_2']
-        result = row['Result_1']  # 'W', 'L', or 'D'
-        
-        # Update fighter 1
-        fighters[f1]['total_fights'] += 1
-        fighters[f1]['kd_total'] += row.get('KD_1', 0)
-        fighters[f1]['str_total'] += row.get('STR_1', 0)
-        fighters[f1]['sub_total'] += row.get('SUB_1', 0)
-        fighters[f1]['td_total'] += row.get('TD_1', 0)
-        
-        # Store individual fight stats for averaging
-        fighters[f1]['kd_history'].append(row.get('KD_1', 0))
-        fighters[f1]['str_history'].append(row.get('STR_1', 0))
-        fighters[f1]['sub_history'].append(row.get('SUB_1', 0))
-        fighters[f1]['td_history'].append(row.get('TD_1', 0))
-        
-        fighters[f1]['fight_history'].append(result)
-        
-        if result == 'W':
-            fighters[f1]['wins'] += 1
-        elif result == 'L':
-            fighters[f1]['losses'] += 1
-        else:
-            fighters[f1]['draws'] += 1
-        
-        # Update fighter 2  
-        fighters[f2]['total_fights'] += 1
-        fighters[f2]['kd_total'] += row.get('KD_2', 0)
-        fighters[f2]['str_total'] += row.get('STR_2', 0)
-        fighters[f2]['sub_total'] += row.get('SUB_2', 0)
-        fighters[f2]['td_total'] += row.get('TD_2', 0)
-        
-        fighters[f2]['kd_history'].append(row.get('KD_2', 0))
-        fighters[f2]['str_history'].append(row.get('STR_2', 0))
-        fighters[f2]['sub_history'].append(row.get('SUB_2', 0))
-        fighters[f2]['td_history'].append(row.get('TD_2', 0))
-        
-        fighters[f2]['fight_history'].append('W' if result == 'L' else 'L' if result == 'W' else 'D')
-        
-        if result == 'W':
-            fighters[f2]['losses'] += 1
-        elif result == 'L':
-            fighters[f2]['wins'] += 1
-        else:
-            fighters[f2]['draws'] += 1
-    
-    # Calculate final stats - MATCH YOUR REBALANCED MODEL
-    fighter_db = {}
-    for name, stats in fighters.items():
-        total = stats['total_fights']
-        wins = stats['wins']
-        
-        # Calculate win streak (last 3 fights)
-        recent = stats['fight_history'][-3:] if len(stats['fight_history']) >= 3 else stats['fight_history']
-        win_streak = sum(1 for r in recent if r == 'W')
-        
-        # FIGHT STATISTICS (MOST IMPORTANT for rebalanced model)
-        avg_strikes = stats['str_total'] / total if total > 0 else 0
-        avg_knockdowns = stats['kd_total'] / total if total > 0 else 0
-        avg_takedowns = stats['td_total'] / total if total > 0 else 0
-        avg_submissions = stats['sub_total'] / total if total > 0 else 0
-        
-        # YOUR REBALANCED MODEL EXPECTS THESE EXACT KEYS:
-        fighter_db[name] = {
-            # FIGHT STATS (PRIORITY 1 - 60% weight)
-            'avg_strikes': avg_strikes,
-            'avg_knockdowns': avg_knockdowns,
-            'avg_takedowns': avg_takedowns,
-            'avg_submissions': avg_submissions,
-            
-            # RECENT FORM (PRIORITY 2 - 30% weight)
-            'win_streak': win_streak,
-            
-            # CAREER (PRIORITY 3 - 10% weight)
-            'win_rate': wins / total if total > 0 else 0.5,
-            'total_fights': total,
-            
-            # Additional stats that might be useful
-            'recent_avg_strikes': sum(stats['str_history'][-5:]) / min(5, len(stats['str_history'])) if stats['str_history'] else 0,
-            'recent_avg_knockdowns': sum(stats['kd_history'][-5:]) / min(5, len(stats['kd_history'])) if stats['kd_history'] else 0,
-            'finish_rate': (sum(1 for kd in stats['kd_history'] if kd > 0) + 
-                           sum(1 for sub in stats['sub_history'] if sub > 0)) / total if total > 0 else 0
-        }
-    
+
+    store = FeatureStore.from_csv(os.path.dirname(os.path.abspath(fights_path)))
+    fighter_db = store.snapshot(key='Fighter_Id')
+
     print(f"✅ Built REBALANCED database with {len(fighter_db)} fighters")
     print(f"🎯 Keys match predict_ufc_fight_REBALANCED() function requirements")
-    
+
     # Verify keys match your model
     sample_fighter = next(iter(fighter_db.values()))
     print(f"📋 Sample fighter keys: {list(sample_fighter.keys())}")
-    
+
     return fighter_db
 
-# Build and save with REBALANCED name
-FIGHTER_DB_REBALANCED = build_fighter_db_for_REBALANCED_model()
-with open('fighter_database_REBALANCED.json', 'w') as f:
-    json.dump(FIGHTER_DB_REBALANCED, f, indent=2)
+def _save_json(data, path: str, indent=None):
+    """Write JSON atomically (write temp file, then rename)"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(data, f, indent=indent)
+    os.replace(temp_path, path)
+
+def load_dated_fights(fights_path: str) -> pd.DataFrame:
+    """Fights.csv rows with aligned Fighter_Ids and event dates (what the FeatureStore reads)"""
+    data_dir = os.path.dirname(os.path.abspath(fights_path))
+    fights, events, fighters = (load_csv(os.path.join(data_dir, name)) for name in SOURCE_FILES)
+    return dated_fights(fights, events, fighters)
+
+def _rows_hash(fights: pd.DataFrame) -> str:
+    """Content hash of fight rows (aligned ids and dates included, so any edit shows up)"""
+    hashes = pd.util.hash_pandas_object(fights, index=False).to_numpy()
+    return hashlib.sha256(hashes.tobytes()).hexdigest()[:16]
+
+def _apply_fights(state: Dict, fights: pd.DataFrame) -> List[str]:
+    """
+    Fold fights into the running state, oldest first
+
+    Returns:
+        Fighter_Ids that appear in fights
+    """
+    ordered = fights.iloc[chronological_order(fights)]
+    engine = RatingEngine.from_dict(state['ratings']) if 'ratings' in state else RatingEngine()
+    engine.rate_fights(
+        ordered['Fighter_Id_1'].to_numpy(), ordered['Fighter_Id_2'].to_numpy(),
+        fight_scores(ordered['Result_1']), events=ordered['Event_Id'].to_numpy(),
+        days=days_since_epoch(ordered['Date'].to_numpy())
+    )
+    state['ratings'] = engine.to_dict()
+
+    dates = ordered['Date'].dt.strftime('%Y-%m-%d').tolist()
+    sides = []
+    for side in (1, 2):
+        won = ordered['Result_1'] == ('W' if side == 1 else 'L')
+        stats = {short: ordered[f'{column}_{side}'].to_numpy(dtype=np.float64).tolist()
+                 for column, short in FIGHT_STAT_COLUMNS.items()}
+        stats['win'] = won.to_numpy(dtype=np.float64).tolist()
+        sides.append((ordered[f'Fighter_Id_{side}'].tolist(), ordered[f'Fighter_{side}'].tolist(), stats))
+
+    fighters = state['fighters']
+    affected = {}
+    for i, date in enumerate(dates):
+        for ids, names, stats in sides:
+            fighter = fighters.setdefault(ids[i], {'count': 0, **{stat: 0.0 for stat in RUNNING_STATS}, 'recent': []})
+            bout = {stat: values[i] for stat, values in stats.items()}
+            bout['finish'] = float(bout['kd'] > 0) + float(bout['sub'] > 0)
+            fighter['count'] += 1
+            for stat in RUNNING_STATS:
+                fighter[stat] += bout[stat]
+            fighter['recent'] = (fighter['recent'] + [[bout[stat] for stat in RECENT_STATS]])[-RECENT_WINDOW:]
+            fighter['name'] = names[i]
+            fighter['last_date'] = date
+            affected[ids[i]] = True
+    return list(affected)
+
+def _fighter_record(state: Dict, fighter_id: str, engine: RatingEngine) -> Dict:
+    """One database entry from a fighter's running state (same definitions as the FeatureStore)"""
+    fighter = state['fighters'][fighter_id]
+    count = fighter['count']
+    recent = {stat: [bout[i] for bout in fighter['recent']] for i, stat in enumerate(RECENT_STATS)}
+    window = min(count, RECENT_WINDOW)
+    rating, deviation = engine.get(fighter_id)
+    return {
+        'name': fighter['name'],
+        'avg_strikes': fighter['str'] / count,
+        'avg_knockdowns': fighter['kd'] / count,
+        'avg_takedowns': fighter['td'] / count,
+        'avg_submissions': fighter['sub'] / count,
+        'win_streak': int(sum(recent['win'][-STREAK_WINDOW:])),
+        'win_rate': fighter['win'] / count,
+        'total_fights': count,
+        'recent_avg_strikes': sum(recent['str']) / window,
+        'recent_avg_knockdowns': sum(recent['kd']) / window,
+        'finish_rate': fighter['finish'] / count,
+        'rating': rating,
+        'rating_deviation': deviation
+    }
+
+def _finish_state(state: Dict, fights: pd.DataFrame, versions: Dict[str, str]) -> Dict:
+    """Record what the running state has seen, so the next update can tell which events are new"""
+    state.update({
+        'version': STATE_VERSION,
+        'sources': versions,
+        'events': sorted(fights['Event_Id'].dropna().unique().tolist()),
+        'last_date': fights['Date'].max().strftime('%Y-%m-%d'),
+        'fights_hash': _rows_hash(fights)
+    })
+    return state
+
+def replay_state(fights_path: str = '../data/data/Fights.csv') -> Dict:
+    """Running state after every fight (what a full build leaves for --incremental)"""
+    fights = load_dated_fights(fights_path)
+    state = {'fighters': {}}
+    _apply_fights(state, fights)
+    return _finish_state(state, fights, source_versions(fights_path))
+
+def update_fighter_db_incremental(fights_path: str = '../data/data/Fights.csv',
+                                  db_path: str = 'fighter_database_REBALANCED.json',
+                                  state_path: str = STATE_PATH) -> List[str]:
+    """
+    Apply only the events the database has not seen yet
+
+    The state file keeps every fighter's running totals, their last 5 bouts
+    and the RatingEngine state, so new events are folded in with
+    RatingEngine.rate_event and only their fighters' entries are recomputed.
+    Anything else (no state yet, edited or back-dated rows, an old state
+    layout) replays every fight. check_consistency compares the result
+    against a full FeatureStore rebuild.
+
+    Returns:
+        Fighter_Ids of the fighters whose entries changed (empty when up to date)
+    """
+    versions = source_versions(fights_path)
+    state, fighter_db = {}, {}
+    if os.path.exists(state_path) and os.path.exists(db_path):
+        with open(state_path, 'r') as f:
+            state = json.load(f)
+        with open(db_path, 'r') as f:
+            fighter_db = json.load(f)
+    if state.get('version') == STATE_VERSION and state.get('sources') == versions:
+        print("✅ Fighter database already up to date")
+        return []
+
+    fights = load_dated_fights(fights_path)
+    new = ~fights['Event_Id'].isin(state.get('events', []))
+    incremental = (state.get('version') == STATE_VERSION and
+                   state.get('fights_hash') == _rows_hash(fights[~new]) and
+                   bool((fights.loc[new, 'Date'] > pd.Timestamp(state['last_date'])).all()))
+    old_db = dict(fighter_db)
+    if not incremental:
+        print("🔄 No usable state for the new fights - replaying every fight")
+        state, fighter_db = {'fighters': {}}, {}
+        new = pd.Series(True, index=fights.index)
+
+    affected = _apply_fights(state, fights[new])
+    engine = RatingEngine.from_dict(state['ratings'])
+    for fighter_id in affected:
+        fighter_db[fighter_id] = _fighter_record(state, fighter_id, engine)
+    changed = [fighter_id for fighter_id in affected if old_db.get(fighter_id) != fighter_db[fighter_id]]
+
+    # Most recently active first, ties by Fighter_Id (the FeatureStore snapshot order)
+    fighters = state['fighters']
+    order = sorted(sorted(fighters), key=lambda fighter_id: fighters[fighter_id]['last_date'], reverse=True)
+    fighter_db = {fighter_id: fighter_db[fighter_id] for fighter_id in order}
+
+    _save_json(fighter_db, db_path, indent=2)
+    _save_json(_finish_state(state, fights, versions), state_path)
+
+    print(f"✅ Applied {int(new.sum())} fights, updated {len(changed)} fighters ({len(fighter_db)} total)")
+    return changed
+
+def check_consistency(fighter_db: Dict, fights_path: str = '../data/data/Fights.csv',
+                      rel_tol: float = 1e-12) -> List[str]:
+    """
+    Compare a saved (e.g. incrementally updated) database against a full FeatureStore rebuild
+
+    Returns:
+        List of human-readable differences (empty when consistent)
+    """
+    expected = build_fighter_db_for_REBALANCED_model(fights_path)
+    problems = []
+
+    if list(fighter_db.keys()) != list(expected.keys()):
+        missing = set(expected) - set(fighter_db)
+        extra = set(fighter_db) - set(expected)
+        problems.append(f"fighter order differs ({len(missing)} missing, {len(extra)} extra)")
+
+    for fighter_id, expected_stats in expected.items():
+        stats = fighter_db.get(fighter_id)
+        if stats is None:
+            continue
+        for key, expected_value in expected_stats.items():
+            value = stats.get(key)
+            if isinstance(expected_value, str):
+                consistent = value == expected_value
+            else:
+                consistent = value is not None and math.isclose(value, expected_value, rel_tol=rel_tol, abs_tol=rel_tol)
+            if not consistent:
+                problems.append(f"{fighter_id}: {key} = {value}, full rebuild = {expected_value}")
+
+    return problems
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build fighter_database_REBALANCED.json from the fight data CSVs")
+    parser.add_argument('--incremental', action='store_true',
+                        help="apply only new events (running state in fighter_db_state.json)")
+    parser.add_argument('--check', action='store_true',
+                        help="compare the saved database against a full FeatureStore rebuild")
+    args = parser.parse_args()
+
+    if args.incremental:
+        update_fighter_db_incremental()
+    else:
+        # Build and save with REBALANCED name
+        FIGHTER_DB_REBALANCED = build_fighter_db_for_REBALANCED_model()
+        _save_json(FIGHTER_DB_REBALANCED, 'fighter_database_REBALANCED.json', indent=2)
+        _save_json(replay_state(), STATE_PATH)
+
+        print(f"\n💾 Saved to: fighter_database_REBALANCED.json")
 
-print(f"\n💾 Saved to: fighter_database_REBALANCED.json")
+    if args.check:
+        with open('fighter_database_REBALANCED.json', 'r') as f:
+            problems = check_consistency(json.load(f))
+        if problems:
+            print(f"❌ {len(problems)} differences from a full rebuild:")
+            for problem in problems[:20]:
+                print(f"   • {problem}")
+            raise SystemExit(1)
+        print("✅ Matches a full rebuild")
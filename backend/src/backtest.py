@@ -0,0 +1,236 @@
+# src/backtest.py
+import os
+import json
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+from src.columnar import load_csv
+from src.feature_store import DATA_DIR, FIGHTER_STAT_KEYS, FeatureStore
+from src.features import FEATURE_NAMES, compute_features
+from src.train import BASE_PARAMS, MODELS_DIR, _fit_forest
+
+BACKTEST_DIR = os.path.join(os.path.dirname(__file__), '..', 'backtests')
+
+# Retrain cadence -> pandas period of the fight date (one model per period)
+CADENCES = {'event': None, 'month': 'M', 'quarter': 'Q', 'year': 'Y'}
+
+# Reliability diagram bins over P(Fighter_1 wins)
+CALIBRATION_BINS = 10
+
+# Keeps log loss finite for a 0/1 probability (same clip as sklearn)
+EPSILON = np.finfo(np.float64).eps
+
+
+def backtest_frame(store: FeatureStore) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """
+    Decided fights oldest first, with point-in-time features for both corner orders
+
+    Returns:
+        (fights, features, swapped_features) - swapped has Fighter_2 in the red corner
+    """
+    frame = store.training_frame()
+    fighter1 = frame[[f'f1_{key}' for key in FIGHTER_STAT_KEYS]].to_numpy()
+    fighter2 = frame[[f'f2_{key}' for key in FIGHTER_STAT_KEYS]].to_numpy()
+    fights = frame[['Fight_Id', 'Event_Id', 'Date', 'Weight_Class', 'target']].copy()
+    return fights, compute_features(fighter1, fighter2), compute_features(fighter2, fighter1)
+
+
+def walk_forward_windows(dates: pd.Series, start, cadence: str = 'quarter', event_ids: Optional[pd.Series] = None,
+                         min_train_fights: int = 500) -> List[Tuple[int, int]]:
+    """
+    Split date-sorted fights into consecutive test windows (one retrain each)
+
+    Window i covers rows [begin, end) and its model sees only rows [0, begin),
+    i.e. fights on earlier dates. A window is one event (events sharing a date
+    are merged), month, quarter or year.
+    """
+    if cadence not in CADENCES:
+        raise ValueError(f"Unknown cadence {cadence!r} (choose from {', '.join(CADENCES)})")
+    dates = pd.to_datetime(dates).reset_index(drop=True)
+    if CADENCES[cadence] is None:
+        # Fights.csv lists a card's bouts together; fall back to the date when no ids are given
+        keys = (event_ids if event_ids is not None else dates).reset_index(drop=True)
+    else:
+        keys = dates.dt.to_period(CADENCES[cadence])
+    # A window only starts on a new date, so same-date bouts never train the model that scores them
+    new_date = dates.ne(dates.shift()).to_numpy()
+    boundaries = np.flatnonzero(keys.ne(keys.shift()).to_numpy() & new_date)
+    ends = np.append(boundaries[1:], len(dates))
+
+    windows = []
+    for begin, end in zip(boundaries, ends):
+        if dates.iloc[begin] >= pd.Timestamp(start) and begin >= min_train_fights:
+            windows.append((int(begin), int(end)))
+    return windows
+
+
+def _predict_window(features: np.ndarray, swapped: np.ndarray, target: np.ndarray, begin: int, end: int,
+                    params: Dict, seed: int, symmetric: bool) -> np.ndarray:
+    """Fit on every fight before the window, return P(Fighter_1 wins) for the window (worker process)"""
+    model = _fit_forest(features[:begin], target[:begin], params, seed)
+    proba = model.predict_proba(features[begin:end])[:, 1]
+    if symmetric:
+        proba = (proba + 1.0 - model.predict_proba(swapped[begin:end])[:, 1]) / 2.0
+    return proba
+
+
+def run_backtest(store: FeatureStore, start='2015-01-01', cadence: str = 'quarter', params: Optional[Dict] = None,
+                 seed: int = 42, n_jobs: int = -1, symmetric: bool = False, min_train_fights: int = 500) -> pd.DataFrame:
+    """
+    Walk forward through history, retraining once per window on everything before it
+
+    Windows are independent, so they run in parallel worker processes.
+
+    Returns:
+        One row per scored fight: Fight_Id, Event_Id, Date, Weight_Class, target,
+        proba (P(Fighter_1 wins)) and window (index of the model that scored it)
+    """
+    from joblib import Parallel, delayed
+
+    fights, features, swapped = backtest_frame(store)
+    target = fights['target'].to_numpy()
+    windows = walk_forward_windows(fights['Date'], start, cadence, fights['Event_Id'], min_train_fights)
+    params = BASE_PARAMS if params is None else params
+
+    # Largest training sets first, so the slowest fits don't start last
+    order = sorted(range(len(windows)), key=lambda i: -windows[i][0])
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_predict_window)(features, swapped, target, *windows[i], params, seed, symmetric) for i in order
+    )
+
+    scored = []
+    for i, proba in zip(order, results):
+        begin, end = windows[i]
+        window = fights.iloc[begin:end].copy()
+        window['proba'] = proba
+        window['window'] = i
+        scored.append(window)
+    if not scored:
+        return fights.iloc[:0].assign(proba=np.array([], dtype=np.float64), window=np.array([], dtype=np.int64))
+    return pd.concat(scored).sort_index().reset_index(drop=True)
+
+
+def _fight_scores(predictions: pd.DataFrame) -> pd.DataFrame:
+    """Per-fight correct / log loss / squared error / calibration bin"""
+    proba = predictions['proba'].to_numpy()
+    target = predictions['target'].to_numpy()
+    clipped = np.clip(proba, EPSILON, 1 - EPSILON)
+    return pd.DataFrame({
+        'proba': proba,
+        'target': target.astype(np.float64),
+        'correct': ((proba >= 0.5) == (target == 1)).astype(np.float64),
+        'log_loss': -(target * np.log(clipped) + (1 - target) * np.log(1 - clipped)),
+        'brier': (proba - target) ** 2,
+        'bin': np.minimum((proba * CALIBRATION_BINS).astype(np.int64), CALIBRATION_BINS - 1)
+    }, index=predictions.index)
+
+
+def score(predictions: pd.DataFrame, by=None) -> pd.DataFrame:
+    """
+    fights, accuracy, log_loss, brier and ece (expected calibration error), overall or per group
+
+    Args:
+        by: Column name or Series to group on (None = one overall row)
+    """
+    scores = _fight_scores(predictions)
+    keys = pd.Series(0, index=predictions.index, name='group') if by is None else (
+        predictions[by] if isinstance(by, str) else by)
+    scores['key'] = keys.to_numpy()
+    table = scores.groupby('key').agg(fights=('correct', 'size'), accuracy=('correct', 'mean'),
+                                      log_loss=('log_loss', 'mean'), brier=('brier', 'mean'))
+
+    # ECE: |mean predicted - observed win rate| per bin, weighted by the bin's share of fights
+    per_bin = scores.groupby(['key', 'bin']).agg(n=('proba', 'size'), predicted=('proba', 'mean'),
+                                                 observed=('target', 'mean'))
+    gaps = (per_bin['n'] * (per_bin['predicted'] - per_bin['observed']).abs()).groupby(level='key').sum()
+    table['ece'] = gaps.reindex(table.index).to_numpy() / table['fights'].to_numpy()
+    table.index.name = keys.name
+    return table if by is not None else table.reset_index(drop=True)
+
+
+def calibration_table(predictions: pd.DataFrame) -> pd.DataFrame:
+    """Reliability diagram: fights, mean predicted and observed Fighter_1 win rate per probability bin"""
+    scores = _fight_scores(predictions)
+    table = scores.groupby('bin').agg(fights=('proba', 'size'), predicted=('proba', 'mean'),
+                                      observed=('target', 'mean'))
+    table.index = [f'{b / CALIBRATION_BINS:.1f}-{(b + 1) / CALIBRATION_BINS:.1f}' for b in table.index]
+    return table
+
+
+def _records(table: pd.DataFrame, key: str) -> List[Dict]:
+    return json.loads(table.reset_index(names=key).to_json(orient='records', date_format='iso'))
+
+
+def report(predictions: pd.DataFrame, events: Optional[pd.DataFrame] = None) -> Dict:
+    """Overall, per-event, per-year and per-weight-class scores plus the overall reliability table"""
+    per_event = score(predictions, by='Event_Id')
+    first_dates = predictions.groupby('Event_Id')['Date'].min()
+    per_event.insert(0, 'date', first_dates.reindex(per_event.index).dt.strftime('%Y-%m-%d'))
+    if events is not None:
+        names = events.set_index('Event_Id')['Name']
+        per_event.insert(0, 'name', names.reindex(per_event.index).to_numpy())
+    per_event = per_event.sort_values('date', kind='stable')
+
+    overall = score(predictions).iloc[0].to_dict() if len(predictions) else {}
+    return {
+        'overall': {key: (int(value) if key == 'fights' else float(value)) for key, value in overall.items()},
+        'baseline_fighter_1_win_rate': float(predictions['target'].mean()) if len(predictions) else None,
+        'calibration': _records(calibration_table(predictions), 'bin'),
+        'per_year': _records(score(predictions, by=predictions['Date'].dt.year.rename('year')), 'year'),
+        'per_weight_class': _records(score(predictions, by='Weight_Class'), 'weight_class'),
+        'per_event': _records(per_event, 'event_id')
+    }
+
+
+def _model_params(models_dir: str = MODELS_DIR) -> Dict:
+    """Params of the promoted model's sidecar (src/train.py), else the notebook defaults"""
+    sidecar_path = os.path.join(models_dir, 'ufc_predictor.json')
+    if os.path.exists(sidecar_path):
+        with open(sidecar_path, 'r') as f:
+            return json.load(f)['params']
+    return BASE_PARAMS
+
+
+if __name__ == "__main__":
+    # Run from backend/: python -m src.backtest [--start 2015-01-01] [--cadence quarter] [--jobs -1]
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the REBALANCED model over past events")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--start', default='2015-01-01', help="First event date to score")
+    parser.add_argument('--cadence', default='quarter', help=f"Retrain once per: {', '.join(CADENCES)}")
+    parser.add_argument('--jobs', type=int, default=-1, help="Worker processes (-1 = all cores)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--symmetric', action='store_true', help="Average both corner orders, like PredictorService(symmetric=True)")
+    parser.add_argument('--params', help="JSON forest params (default: models/ufc_predictor.json, else the notebook's)")
+    parser.add_argument('--output-dir', default=BACKTEST_DIR)
+    args = parser.parse_args()
+    if args.cadence not in CADENCES:
+        parser.error(f"unknown cadence: {args.cadence}")
+
+    start_time = time.perf_counter()
+    store = FeatureStore.from_csv(args.data_dir)
+    params = json.loads(args.params) if args.params else _model_params()
+    predictions = run_backtest(store, args.start, args.cadence, params, seed=args.seed,
+                               n_jobs=args.jobs, symmetric=args.symmetric)
+    results = report(predictions, load_csv(os.path.join(args.data_dir, 'Events.csv'), columns=['Event_Id', 'Name']))
+    results['config'] = {'start': args.start, 'cadence': args.cadence, 'seed': args.seed,
+                         'symmetric': args.symmetric, 'params': params, 'features': FEATURE_NAMES}
+
+    overall = results['overall']
+    print(f"✅ Backtested {overall.get('fights', 0)} fights on {len(results['per_event'])} events "
+          f"({predictions['window'].nunique()} retrains, {time.perf_counter() - start_time:.1f}s)")
+    print(f"   Accuracy {overall.get('accuracy', float('nan')):.4f} | log loss {overall.get('log_loss', float('nan')):.4f} | "
+          f"Brier {overall.get('brier', float('nan')):.4f} | ECE {overall.get('ece', float('nan')):.4f} | "
+          f"always-Fighter_1 baseline {results['baseline_fighter_1_win_rate'] or float('nan'):.4f}")
+    for row in results['per_year']:
+        print(f"   {row['year']}: {row['fights']:4d} fights, accuracy {row['accuracy']:.3f}, log loss {row['log_loss']:.3f}")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    stem = os.path.join(args.output_dir, f"backtest-{args.start}-{args.cadence}")
+    with open(f'{stem}.json', 'w') as f:
+        json.dump(results, f, indent=2)
+    predictions.to_csv(f'{stem}.csv', index=False)
+    print(f"💾 Saved {os.path.normpath(stem)}.json and .csv")
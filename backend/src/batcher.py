@@ -0,0 +1,96 @@
+# src/batcher.py
+import asyncio
+import logging
+from concurrent.futures import Executor
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from src.metrics import REGISTRY
+from src.workers import Overloaded
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = REGISTRY.histogram('ufc_batch_size', 'Requests scored per micro-batch', ('batcher',),
+                                buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256))
+COALESCED = REGISTRY.counter('ufc_batch_coalesced_total', 'Requests that joined an identical in-flight request',
+                             ('batcher',))
+
+
+class MicroBatcher:
+    """
+    Aggregates concurrent requests into one batched call
+
+    submit() queues an item; the queue is flushed max_wait_ms after its first
+    item arrives, or as soon as it holds max_batch_size items. The flushed
+    batch runs process_batch(items) -> results in an executor thread (the event
+    loop keeps accepting requests meanwhile), and every caller's future is
+    resolved with its own result. A result that is an Exception is raised to
+    that caller only.
+
+    Requests with the same key while one is in flight share its future
+    (single-flight), so a burst of identical matchups costs one row.
+    """
+
+    def __init__(self, process_batch: Callable[[List], Sequence], max_batch_size: int = 32,
+                 max_wait_ms: float = 2.0, executor: Optional[Executor] = None, name: str = 'default'):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max(max_wait_ms, 0.0) / 1000
+        self.executor = executor
+        self.name = name
+        self._pending: List[Tuple[Hashable, object, asyncio.Future]] = []
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def submit(self, key: Hashable, item) -> object:
+        """Queue item (or join the in-flight request with the same key) and wait for its result"""
+        future = self._inflight.get(key)
+        if future is not None:
+            COALESCED.inc(self.name)
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._inflight[key] = future
+            self._pending.append((key, item, future))
+            if len(self._pending) >= self.max_batch_size:
+                self._flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.max_wait, self._flush)
+        # A cancelled caller (client went away) must not cancel the shared future
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.get_running_loop().create_task(self._run(batch))
+
+    async def _run(self, batch: List[Tuple[Hashable, object, asyncio.Future]]):
+        BATCH_SIZE.observe(len(batch), self.name)
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.process_batch, [item for _, item, _ in batch]
+            )
+            if len(results) != len(batch):
+                raise RuntimeError(f"process_batch returned {len(results)} results for {len(batch)} items")
+        except Overloaded as e:
+            # Load shedding is expected under overload: no traceback per batch
+            logger.warning("Micro-batch of %d shed: %s", len(batch), e)
+            results = [e] * len(batch)
+        except Exception as e:
+            logger.exception("Micro-batch of %d failed", len(batch))
+            results = [e] * len(batch)
+        finally:
+            for key, _, _ in batch:
+                self._inflight.pop(key, None)
+
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,239 @@
+# src/columnar.py
+import os
+import json
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+from src.fighter_table import FighterTable, STAT_KEYS
+from src.prediction_cache import file_version
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'data')
+
+# Low-cardinality text columns: dictionary-encoded on disk, pandas categoricals when read back
+CATEGORY_COLUMNS = {
+    'Weight_Class', 'Method', 'Stance', 'Referee', 'Result_1', 'Result_2',
+    'Time Format', 'Gender', 'Fighting Style'
+}
+
+# Columnar copies of a CSV live next to it in this directory (rebuilt when the CSV changes)
+STORE_DIRNAME = '.columnar'
+
+# Bump when the on-disk layout changes (old snapshots are then rebuilt)
+FORMAT_VERSION = 2
+
+# Tables converted by `python -m src.columnar`
+TABLES = ['Fights', 'Fighters', 'Fighters Stats', 'Events']
+
+
+def write_table(frame: pd.DataFrame, path: str, category_columns=CATEGORY_COLUMNS, source: Optional[Dict] = None):
+    """
+    Write a DataFrame as memory-mappable column blocks + meta.json
+
+    Columns of the same dtype share one 2-D .npy block (one row per column),
+    so a read parses a handful of headers instead of one per column.
+    category_columns are dictionary-encoded: int32 codes in a block, the
+    distinct values in their own JSON file. Other text columns (ids, names -
+    mostly unique) are stored as a plain JSON list of values. Either file is
+    read only when that column is. Written to a temp dir, then renamed.
+    """
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    temp_dir = tempfile.mkdtemp(dir=parent, prefix='.table-')
+    try:
+        columns, blocks = [], {}
+        for i, (name, values) in enumerate(frame.items()):
+            entry = {'name': name}
+            array = None
+            if pd.api.types.is_numeric_dtype(values.dtype) or pd.api.types.is_bool_dtype(values.dtype):
+                array = values.to_numpy()
+                entry['kind'] = 'numeric'
+            elif pd.api.types.is_datetime64_dtype(values.dtype):
+                array = values.to_numpy().view(np.int64)
+                entry['kind'] = 'datetime'
+                entry['dtype'] = str(values.dtype)
+            elif name in category_columns:
+                codes, distinct = pd.factorize(values, sort=True)
+                array = codes.astype(np.int32)
+                entry['kind'] = 'category'
+                entry['values'] = f'values-{i}.json'
+                with open(os.path.join(temp_dir, entry['values']), 'w') as f:
+                    json.dump([str(value) for value in distinct], f)
+            else:
+                entry['kind'] = 'string'
+                entry['values'] = f'values-{i}.json'
+                with open(os.path.join(temp_dir, entry['values']), 'w') as f:
+                    json.dump([None if pd.isna(value) else str(value) for value in values], f)
+            if array is not None:
+                block = blocks.setdefault(array.dtype.str, [])
+                entry['block'] = array.dtype.str
+                entry['index'] = len(block)
+                block.append(array)
+            columns.append(entry)
+
+        block_files = {}
+        for i, (dtype, arrays) in enumerate(blocks.items()):
+            block_files[dtype] = f'block-{i}.npy'
+            np.save(os.path.join(temp_dir, block_files[dtype]), np.vstack(arrays))
+        meta = {'format_version': FORMAT_VERSION, 'rows': len(frame), 'columns': columns,
+                'blocks': block_files, 'source': source or {}}
+        with open(os.path.join(temp_dir, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.replace(temp_dir, path)
+    except OSError:
+        # Another process wrote the same table first
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        if not os.path.isdir(path):
+            raise
+
+
+def _read_meta(path: str) -> Dict:
+    with open(os.path.join(path, 'meta.json'), 'r') as f:
+        return json.load(f)
+
+
+def _write_meta(path: str, meta: Dict):
+    """Replace meta.json atomically (readers see the old or the new file, never half of one)"""
+    temp_path = os.path.join(path, f'.meta-{os.getpid()}.json')
+    with open(temp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(temp_path, os.path.join(path, 'meta.json'))
+
+
+def table_columns(path: str) -> List[str]:
+    """Column names of a stored table"""
+    return [entry['name'] for entry in _read_meta(path)['columns']]
+
+
+def read_table(path: str, columns: Optional[List[str]] = None, mmap_mode: Optional[str] = 'r',
+               categorical: bool = True) -> pd.DataFrame:
+    """
+    Read a table written by write_table - only the blocks holding the requested columns are touched
+
+    Text columns come back as their original strings, or as pandas
+    categoricals for CATEGORY_COLUMNS when categorical=True.
+    """
+    meta = _read_meta(path)
+    entries = {entry['name']: entry for entry in meta['columns']}
+    names = list(entries) if columns is None else list(columns)
+    missing = [name for name in names if name not in entries]
+    if missing:
+        raise KeyError(f"Columns not in {path}: {missing}")
+
+    blocks = {}
+    data = {}
+    for name in names:
+        entry = entries[name]
+        if entry['kind'] == 'string':
+            with open(os.path.join(path, entry['values']), 'r') as f:
+                data[name] = pd.array(json.load(f), dtype='str')
+            continue
+        if entry['block'] not in blocks:
+            blocks[entry['block']] = np.load(os.path.join(path, meta['blocks'][entry['block']]), mmap_mode=mmap_mode)
+        array = blocks[entry['block']][entry['index']]
+
+        if entry['kind'] == 'numeric':
+            data[name] = array
+        elif entry['kind'] == 'datetime':
+            data[name] = np.asarray(array).view(entry['dtype'])
+        else:
+            with open(os.path.join(path, entry['values']), 'r') as f:
+                distinct = json.load(f)
+            if categorical:
+                data[name] = pd.Categorical.from_codes(np.asarray(array), categories=distinct)
+            else:
+                # Code -1 (missing) becomes NaN
+                data[name] = pd.array(distinct, dtype='str').take(np.asarray(array), allow_fill=True)
+    return pd.DataFrame(data, index=pd.RangeIndex(meta['rows']))
+
+
+def store_path(csv_path: str, store_dir: Optional[str] = None) -> str:
+    """Where the columnar copy of csv_path lives"""
+    store_dir = store_dir or os.path.join(os.path.dirname(os.path.abspath(csv_path)), STORE_DIRNAME)
+    stem = os.path.splitext(os.path.basename(csv_path))[0].replace(' ', '_')
+    return os.path.join(store_dir, f'{stem}-v{FORMAT_VERSION}')
+
+
+def _is_fresh(path: str, csv_path: str) -> bool:
+    """
+    Does the columnar copy still match the CSV? (size + mtime first, content hash if those moved)
+
+    A touched but unchanged CSV gets its new size/mtime recorded, so it is hashed only once.
+    """
+    if not os.path.isdir(path):
+        return False
+    meta = _read_meta(path)
+    source = meta.get('source', {})
+    stat = os.stat(csv_path)
+    if source.get('size') == stat.st_size and source.get('mtime_ns') == stat.st_mtime_ns:
+        return True
+    if source.get('hash') != file_version(csv_path):
+        return False
+    meta['source'] = {**source, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    _write_meta(path, meta)
+    return True
+
+
+def columnar_copy(csv_path: str, store_dir: Optional[str] = None) -> str:
+    """Path of an up-to-date columnar copy of csv_path (parses the CSV only if it changed)"""
+    path = store_path(csv_path, store_dir)
+    if not _is_fresh(path, csv_path):
+        stat = os.stat(csv_path)
+        source = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': file_version(csv_path)}
+        write_table(pd.read_csv(csv_path), path, source=source)
+    return path
+
+
+def load_csv(csv_path: str, columns: Optional[List[str]] = None, store_dir: Optional[str] = None,
+             skip_missing: bool = False, categorical: bool = False) -> pd.DataFrame:
+    """
+    pd.read_csv(csv_path, usecols=columns), served from a columnar copy
+
+    The first load of a CSV (or of a changed CSV) parses it once and writes the
+    columnar copy; every later load reads only the requested columns. Dtypes
+    match pd.read_csv unless categorical=True (CATEGORY_COLUMNS as categoricals).
+    skip_missing=True drops requested columns the CSV doesn't have.
+    """
+    path = columnar_copy(csv_path, store_dir)
+    if columns is not None and skip_missing:
+        available = set(table_columns(path))
+        columns = [column for column in columns if column in available]
+    return read_table(path, columns, categorical=categorical)
+
+
+def write_fighter_db(json_path: str, path: str):
+    """Columnar copy of fighter_database_REBALANCED.json (id + name + one column per stat)"""
+    with open(json_path, 'r') as f:
+        table = FighterTable.from_dict(json.load(f))
+    frame = pd.DataFrame({'name': table.names, **table.columns})
+    if table.keyed_by_id:
+        frame.insert(0, 'id', table.ids)
+    write_table(frame, path)
+
+
+def read_fighter_db(path: str) -> FighterTable:
+    """FighterTable straight from the columnar copy (no JSON parsing)"""
+    keyed_by_id = 'id' in table_columns(path)
+    frame = read_table(path, (['id'] if keyed_by_id else []) + ['name'] + STAT_KEYS)
+    return FighterTable(frame['name'].tolist(), {key: frame[key].to_numpy() for key in STAT_KEYS},
+                        ids=frame['id'].tolist() if keyed_by_id else None)
+
+
+if __name__ == "__main__":
+    # Run from backend/: python -m src.columnar
+    import time
+
+    for table in TABLES:
+        csv_path = os.path.join(DATA_DIR, f'{table}.csv')
+        start = time.perf_counter()
+        frame = load_csv(csv_path)
+        print(f"✅ {table}: {len(frame)} rows x {len(frame.columns)} columns ({time.perf_counter() - start:.2f}s)")
+
+    db_path = os.path.join(os.path.dirname(__file__), '..', 'fighter_database_REBALANCED.json')
+    db_store = os.path.join(os.path.dirname(os.path.abspath(db_path)), 'snapshots', f'fighter_db-{file_version(db_path)}-v{FORMAT_VERSION}')
+    write_fighter_db(db_path, db_store)
+    print(f"💾 Columnar tables in {os.path.normpath(os.path.join(DATA_DIR, STORE_DIRNAME))} and {os.path.normpath(db_store)}")
@@ -0,0 +1,332 @@
+# src/entity_index.py
+import os
+import json
+import logging
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+from src.columnar import load_csv
+from src.feature_store import align_fighter_ids
+from src.prediction_cache import file_version
+
+logger = logging.getLogger(__name__)
+
+# CSVs the index is built from (under data/data)
+SOURCES = {'fights': 'Fights.csv', 'events': 'Events.csv', 'fighters': 'Fighters.csv',
+           'fighter_stats': 'Fighters Stats.csv'}
+
+# Integer arrays saved as <name>.npy (memory-mapped on load)
+ARRAYS = ('fight_fighter_1', 'fight_fighter_2', 'fight_event', 'event_days', 'profile_row', 'stats_row',
+          'fighter_offsets', 'fighter_fights', 'event_offsets', 'event_fights')
+
+# Fights.csv columns fight_records() reports (read lazily, only when asked for)
+DETAIL_COLUMNS = ['Weight_Class', 'Method', 'Round', 'Fight_Time', 'Result_1', 'Result_2']
+
+# Bump when the on-disk layout changes
+FORMAT_VERSION = 1
+
+
+def csr(owners: np.ndarray, n_owners: int, order: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Group item positions by owner (CSR): items[offsets[k]:offsets[k + 1]] are owner k's items
+
+    owners[i] is the owner key of item i (-1 = no owner, dropped); within an
+    owner, items are sorted by order (stable).
+
+    Returns:
+        (offsets int64 (n_owners + 1,), item positions int32)
+    """
+    owners = np.asarray(owners, dtype=np.int64)
+    keep = np.flatnonzero(owners >= 0)
+    owners, order = owners[keep], np.asarray(order)[keep]
+    items = keep[np.lexsort((order, owners))].astype(np.int32)
+    offsets = np.zeros(n_owners + 1, dtype=np.int64)
+    np.cumsum(np.bincount(owners, minlength=n_owners), out=offsets[1:])
+    return offsets, items
+
+
+class EntityIndex:
+    """
+    Integer keys for fighters, events and fights, joined once
+
+    Fighters are keyed by Fighter_Id (so two fighters sharing a name stay two
+    fighters), events by Event_Id and fights by their row in Fights.csv. The
+    CSR offset arrays turn "all fights of X" and "all bouts at event Y" into
+    O(k) slices instead of filters over the whole fights table.
+    """
+
+    def __init__(self, meta: Dict, arrays: Dict[str, np.ndarray], path: Optional[str] = None,
+                 data_dir: Optional[str] = None):
+        self.path = path
+        # Where profile() reads Fighters.csv / Fighters Stats.csv from
+        self.data_dir = data_dir
+        self._profiles: Optional[Tuple[pd.DataFrame, pd.DataFrame]] = None
+        self._details: Optional[Dict[str, np.ndarray]] = None
+        self.versions = meta['versions']
+        self.fighter_ids: List[str] = meta['fighter_ids']
+        self.fighter_names: List[str] = meta['fighter_names']
+        self.event_ids: List[str] = meta['event_ids']
+        self.fight_ids: List[str] = meta['fight_ids']
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+
+        self._fighter_key = {fighter_id: key for key, fighter_id in enumerate(self.fighter_ids)}
+        self._event_key = {event_id: key for key, event_id in enumerate(self.event_ids)}
+        # Case-folded name -> fighter keys, most recently active first
+        last_days = self._last_fight_days()
+        name_keys: Dict[str, List[int]] = {}
+        for key, name in enumerate(self.fighter_names):
+            name_keys.setdefault(' '.join(name.lower().split()), []).append(key)
+        for keys in name_keys.values():
+            keys.sort(key=lambda key: int(last_days[key]), reverse=True)
+        self._name_keys = name_keys
+
+    def _last_fight_days(self) -> np.ndarray:
+        """Days since epoch of each fighter's last bout (minimum int64 if none)"""
+        last = np.full(len(self.fighter_ids), np.iinfo(np.int64).min, dtype=np.int64)
+        ends = np.asarray(self.fighter_offsets[1:])
+        has_fights = ends > np.asarray(self.fighter_offsets[:-1])
+        # Fights are oldest first, so the last item of each slice is the latest bout
+        last_fights = np.asarray(self.fighter_fights)[ends[has_fights] - 1]
+        last[has_fights] = np.asarray(self.event_days)[np.asarray(self.fight_event)[last_fights]]
+        return last
+
+    @classmethod
+    def build(cls, data_dir: str, versions: Optional[Dict] = None) -> 'EntityIndex':
+        """Join Fights, Events, Fighters and Fighters Stats into integer keys + CSR arrays"""
+        paths = {source: os.path.join(data_dir, file_name) for source, file_name in SOURCES.items()}
+        fighters = load_csv(paths['fighters'], columns=['Fighter_Id', 'Full Name'])
+        stats = load_csv(paths['fighter_stats'], columns=['Fighter_Id'])
+        events = load_csv(paths['events'], columns=['Event_Id', 'Date'])
+        fights = align_fighter_ids(
+            load_csv(paths['fights'], columns=['Fight_Id', 'Fighter_Id_1', 'Fighter_Id_2',
+                                               'Fighter_1', 'Fighter_2', 'Event_Id']),
+            fighters
+        )
+
+        # Fighter keys: Fighters.csv order, then ids that only appear in Fights.csv
+        fighter_ids, fighter_names, profile_row, seen = [], [], [], {}
+        for row, (fighter_id, name) in enumerate(zip(fighters['Fighter_Id'], fighters['Full Name'])):
+            if fighter_id not in seen:
+                seen[fighter_id] = len(fighter_ids)
+                fighter_ids.append(fighter_id)
+                fighter_names.append(name)
+                profile_row.append(row)
+        for id_column, name_column in (('Fighter_Id_1', 'Fighter_1'), ('Fighter_Id_2', 'Fighter_2')):
+            for fighter_id, name in zip(fights[id_column], fights[name_column]):
+                if fighter_id not in seen:
+                    seen[fighter_id] = len(fighter_ids)
+                    fighter_ids.append(fighter_id)
+                    fighter_names.append(name)
+                    profile_row.append(-1)
+        stats_row = np.full(len(fighter_ids), -1, dtype=np.int32)
+        for row, fighter_id in enumerate(stats['Fighter_Id']):
+            key = seen.get(fighter_id)
+            if key is not None and stats_row[key] < 0:
+                stats_row[key] = row
+
+        # Event keys: Events.csv order, then events only referenced by fights
+        event_ids = list(dict.fromkeys(list(events['Event_Id']) + list(fights['Event_Id'])))
+        event_key = {event_id: key for key, event_id in enumerate(event_ids)}
+        dates = pd.to_datetime(pd.Series(event_ids).map(events.set_index('Event_Id')['Date']))
+        event_days = dates.to_numpy().astype('datetime64[D]').astype(np.int64)
+        event_days[dates.isna().to_numpy()] = np.iinfo(np.int64).min
+
+        fight_fighter_1 = np.array([seen[fighter_id] for fighter_id in fights['Fighter_Id_1']], dtype=np.int32)
+        fight_fighter_2 = np.array([seen[fighter_id] for fighter_id in fights['Fighter_Id_2']], dtype=np.int32)
+        fight_event = np.array([event_key[event_id] for event_id in fights['Event_Id']], dtype=np.int32)
+
+        # Fights.csv is newest first: chronological order is (event date, reversed row)
+        n = len(fights)
+        chronological = np.lexsort((-np.arange(n), event_days[fight_event]))
+        position = np.empty(n, dtype=np.int64)
+        position[chronological] = np.arange(n)
+
+        fighter_offsets, fighter_fights = csr(np.concatenate([fight_fighter_1, fight_fighter_2]),
+                                              len(fighter_ids), np.tile(position, 2))
+        fighter_fights = np.where(fighter_fights >= n, fighter_fights - n, fighter_fights).astype(np.int32)
+        # Bouts keep their Fights.csv (card) order
+        event_offsets, event_fights = csr(fight_event, len(event_ids), np.arange(n))
+
+        meta = {'versions': versions or {}, 'fighter_ids': fighter_ids, 'fighter_names': fighter_names,
+                'event_ids': event_ids, 'fight_ids': list(fights['Fight_Id'])}
+        arrays = {'fight_fighter_1': fight_fighter_1, 'fight_fighter_2': fight_fighter_2,
+                  'fight_event': fight_event, 'event_days': event_days,
+                  'profile_row': np.array(profile_row, dtype=np.int32), 'stats_row': stats_row,
+                  'fighter_offsets': fighter_offsets, 'fighter_fights': fighter_fights,
+                  'event_offsets': event_offsets, 'event_fights': event_fights}
+        return cls(meta, arrays, data_dir=data_dir)
+
+    def save(self, path: str):
+        """Write index.json + one .npy per array (temp dir, then rename)"""
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        temp_dir = tempfile.mkdtemp(dir=parent, prefix='.entities-')
+        try:
+            for name in ARRAYS:
+                np.save(os.path.join(temp_dir, f'{name}.npy'), np.asarray(getattr(self, name)))
+            with open(os.path.join(temp_dir, 'index.json'), 'w') as f:
+                json.dump({'format_version': FORMAT_VERSION, 'versions': self.versions,
+                           'fighter_ids': self.fighter_ids, 'fighter_names': self.fighter_names,
+                           'event_ids': self.event_ids, 'fight_ids': self.fight_ids}, f)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            os.replace(temp_dir, path)
+        except OSError:
+            # Another worker saved the same index first
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            if not os.path.isdir(path):
+                raise
+        self.path = path
+
+    @classmethod
+    def load(cls, path: str, data_dir: Optional[str] = None, mmap_mode: Optional[str] = 'r') -> 'EntityIndex':
+        with open(os.path.join(path, 'index.json'), 'r') as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode) for name in ARRAYS}
+        return cls(meta, arrays, path, data_dir)
+
+    @property
+    def n_fighters(self) -> int:
+        return len(self.fighter_ids)
+
+    @property
+    def n_fights(self) -> int:
+        return len(self.fight_ids)
+
+    def fighter_key(self, fighter_id: str) -> int:
+        """Integer key of a Fighter_Id (KeyError if unknown)"""
+        return self._fighter_key[fighter_id]
+
+    def event_key(self, event_id: str) -> int:
+        """Integer key of an Event_Id (KeyError if unknown)"""
+        return self._event_key[event_id]
+
+    def ids_for_name(self, name: str) -> List[str]:
+        """Fighter_Ids with exactly this (case-insensitive) name, most recently active first"""
+        return [self.fighter_ids[key] for key in self._name_keys.get(' '.join(name.lower().split()), [])]
+
+    def name_of(self, fighter_id: str) -> str:
+        return self.fighter_names[self.fighter_key(fighter_id)]
+
+    def fights_of(self, fighter_id: str) -> np.ndarray:
+        """Fights.csv rows of every bout of the fighter, oldest first (a view - O(k))"""
+        key = self.fighter_key(fighter_id)
+        return self.fighter_fights[self.fighter_offsets[key]:self.fighter_offsets[key + 1]]
+
+    def bouts_at(self, event_id: str) -> np.ndarray:
+        """Fights.csv rows of every bout at the event, in card order (a view - O(k))"""
+        key = self.event_key(event_id)
+        return self.event_fights[self.event_offsets[key]:self.event_offsets[key + 1]]
+
+    def opponents_of(self, fighter_id: str) -> List[str]:
+        """Opponent Fighter_Id of each bout in fights_of(fighter_id)"""
+        key = self.fighter_key(fighter_id)
+        rows = self.fights_of(fighter_id)
+        first, second = np.asarray(self.fight_fighter_1[rows]), np.asarray(self.fight_fighter_2[rows])
+        return [self.fighter_ids[opponent] for opponent in np.where(first == key, second, first).tolist()]
+
+    def profile(self, fighter_id: str) -> Dict:
+        """The fighter's Fighters.csv row joined with their Fighters Stats.csv row (by Fighter_Id, not name)"""
+        key = self.fighter_key(fighter_id)
+        if self._profiles is None:
+            self._profiles = (self._read_source('fighters'), self._read_source('fighter_stats'))
+        fighters, stats = self._profiles
+        profile = {'Fighter_Id': fighter_id, 'Full Name': self.fighter_names[key]}
+        if self.stats_row[key] >= 0:
+            profile.update(stats.iloc[int(self.stats_row[key])].to_dict())
+        if self.profile_row[key] >= 0:
+            profile.update(fighters.iloc[int(self.profile_row[key])].to_dict())
+        return {column: (None if pd.isna(value) else value.item() if hasattr(value, 'item') else value)
+                for column, value in profile.items()}
+
+    def _read_source(self, source: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        if self.data_dir is None:
+            raise ValueError("EntityIndex has no data_dir to read CSVs from")
+        return load_csv(os.path.join(self.data_dir, SOURCES[source]), columns=columns)
+
+    def stats_values(self, column: str) -> List:
+        """A Fighters Stats.csv column per fighter key (None for fighters without a stats row)"""
+        values = self._read_source('fighter_stats', [column])[column]
+        values = values.astype(object).where(values.notna(), None).to_numpy()
+        return [values[row] if row >= 0 else None for row in np.asarray(self.stats_row).tolist()]
+
+    def fight_records(self, fighter_id: str, limit: Optional[int] = None) -> List[Dict]:
+        """The fighter's bouts, newest first, from their side (result, opponent)"""
+        if self._details is None:
+            details = self._read_source('fights', DETAIL_COLUMNS)
+            # Missing values become None (JSON null)
+            self._details = {column: details[column].astype(object).where(details[column].notna(), None).to_numpy()
+                             for column in DETAIL_COLUMNS}
+        key = self.fighter_key(fighter_id)
+        rows = self.fights_of(fighter_id)[::-1]
+        if limit is not None:
+            rows = rows[:max(limit, 0)]
+        rows = np.asarray(rows)
+        details = {column: values[rows].tolist() for column, values in self._details.items()}
+        first = np.asarray(self.fight_fighter_1[rows]) == key
+        opponents = np.where(first, np.asarray(self.fight_fighter_2[rows]), np.asarray(self.fight_fighter_1[rows]))
+
+        records = []
+        for i, row in enumerate(rows.tolist()):
+            event = int(self.fight_event[row])
+            records.append({
+                'fight_id': self.fight_ids[row],
+                'date': self.fight_date(row),
+                'event_id': self.event_ids[event],
+                'opponent_id': self.fighter_ids[opponents[i]],
+                'opponent': self.fighter_names[opponents[i]],
+                'result': details['Result_1' if first[i] else 'Result_2'][i],
+                'method': details['Method'][i],
+                'round': details['Round'][i],
+                'time': details['Fight_Time'][i],
+                'weight_class': details['Weight_Class'][i]
+            })
+        return records
+
+    def fight_date(self, row: int) -> Optional[str]:
+        """ISO date of the event a Fights.csv row belongs to (None if the event has no date)"""
+        days = int(self.event_days[self.fight_event[row]])
+        if days == np.iinfo(np.int64).min:
+            return None
+        return str(np.datetime64(days, 'D'))
+
+
+def entities_path(snapshot_dir: str, data_dir: str) -> Tuple[str, Dict]:
+    """The index is keyed by the content of all four CSVs (rebuilt only when one changes)"""
+    versions = {source: file_version(os.path.join(data_dir, file_name)) for source, file_name in SOURCES.items()}
+    key = '-'.join(versions[source] for source in SOURCES)
+    return os.path.join(snapshot_dir, 'entities', f'{key}-v{FORMAT_VERSION}'), versions
+
+
+def load_entity_index(data_dir: str, snapshot_dir: str) -> EntityIndex:
+    """Open the entity index snapshot, building it first if a CSV changed"""
+    path, versions = entities_path(snapshot_dir, data_dir)
+    if os.path.isdir(path):
+        return EntityIndex.load(path, data_dir)
+    logger.info("🔧 Building entity index: %s", path)
+    index = EntityIndex.build(data_dir, versions)
+    index.save(path)
+    return index
+
+
+if __name__ == "__main__":
+    # Run from backend/: python -m src.entity_index [fighter name]
+    import sys
+    import time
+    from src.feature_store import DATA_DIR
+
+    snapshot_dir = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'snapshots'))
+    start = time.perf_counter()
+    index = load_entity_index(DATA_DIR, snapshot_dir)
+    print(f"✅ {index.n_fighters} fighters, {len(index.event_ids)} events, {index.n_fights} fights "
+          f"({time.perf_counter() - start:.2f}s)")
+    name = ' '.join(sys.argv[1:]) or 'Jon Jones'
+    for fighter_id in index.ids_for_name(name):
+        rows = index.fights_of(fighter_id)
+        print(f"   {name} [{fighter_id}]: {len(rows)} fights")
+        for row, opponent in list(zip(rows.tolist(), index.opponents_of(fighter_id)))[-5:]:
+            print(f"      {index.fight_date(row)}  vs {index.name_of(opponent)}")
@@ -0,0 +1,216 @@
+# src/export.py
+import io
+import csv
+import json
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.fighter_table import STAT_KEYS
+from src.matchup_matrix import division_key
+
+# format -> media type
+EXPORT_FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv; charset=utf-8'}
+
+# Records encoded per yielded chunk, and pairs scored per model call
+CHUNK_RECORDS = 500
+SCORE_CHUNK = 1024
+
+# An input line longer than this is rejected instead of buffered (keeps memory bounded)
+MAX_LINE_BYTES = 4096
+
+FIGHTER_COLUMNS = ['name', 'fighter_id', 'weight_class'] + STAT_KEYS
+PREDICTION_COLUMNS = ['index', 'red_name', 'blue_name', 'red_fighter', 'blue_fighter', 'probability_red_wins',
+                      'probability_blue_wins', 'predicted_winner', 'confidence', 'error']
+
+
+class RecordEncoder:
+    """Records (dicts) -> NDJSON lines or CSV rows, one bytes chunk per batch of records"""
+
+    def __init__(self, format: str, columns: List[str]):
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown format '{format}' (use {' or '.join(EXPORT_FORMATS)})")
+        self.format = format
+        self.columns = columns
+        self.media_type = EXPORT_FORMATS[format]
+
+    def header(self) -> bytes:
+        return self._csv_rows([self.columns]) if self.format == 'csv' else b''
+
+    def encode(self, records: List[Dict]) -> bytes:
+        if self.format == 'ndjson':
+            return ''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in records).encode()
+        return self._csv_rows([[self._csv_value(record.get(column)) for column in self.columns] for record in records])
+
+    @staticmethod
+    def _csv_value(value):
+        if value is None:
+            return ''
+        if isinstance(value, list):
+            return ';'.join(str(item) for item in value)
+        return value
+
+    @staticmethod
+    def _csv_rows(rows: List[List]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='\n').writerows(rows)
+        return buffer.getvalue().encode()
+
+
+def fighter_weight_classes(fighter_service) -> List[Optional[str]]:
+    """Weight class per fighter table row (Fighters Stats.csv via the entity index; None if unknown)"""
+    entities = fighter_service.entities
+    if entities is None:
+        return [None] * len(fighter_service.table)
+    by_id = dict(zip(entities.fighter_ids, entities.stats_values('Weight_Class')))
+    return [by_id.get(fighter_service.fighter_id(row)) for row in range(len(fighter_service.table))]
+
+
+def fighter_records(fighter_service, weight_class: Optional[str] = None,
+                    min_fights: int = 0) -> Iterator[List[Dict]]:
+    """
+    Roster records matching the filters, CHUNK_RECORDS at a time
+
+    weight_class matches like /matrix ('Lightweight', 'womens-strawweight');
+    min_fights filters on total_fights.
+    """
+    table = fighter_service.table
+    keep = table.columns['total_fights'] >= min_fights
+    weight_classes = None
+    if weight_class is not None or fighter_service.entities is not None:
+        weight_classes = fighter_weight_classes(fighter_service)
+    if weight_class is not None:
+        wanted = division_key(weight_class)
+        keep &= np.array([value is not None and division_key(value) == wanted for value in weight_classes], dtype=bool)
+
+    rows = np.flatnonzero(keep)
+    for begin in range(0, len(rows), CHUNK_RECORDS):
+        chunk = rows[begin:begin + CHUNK_RECORDS]
+        stats = {key: table.columns[key][chunk].tolist() for key in STAT_KEYS}
+        records = []
+        for i, row in enumerate(chunk.tolist()):
+            record = {'name': table.names[row], 'fighter_id': fighter_service.fighter_id(row),
+                      'weight_class': weight_classes[row] if weight_classes is not None else None}
+            record.update({key: values[i] for key, values in stats.items()})
+            records.append(record)
+        yield records
+
+
+def _parse_pair(line: str, format: str) -> Tuple[str, str]:
+    """One input line -> (red_name, blue_name) (ValueError if malformed)"""
+    if format == 'ndjson':
+        try:
+            pair = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e.msg}")
+        if not isinstance(pair, dict) or not isinstance(pair.get('red_name'), str) \
+                or not isinstance(pair.get('blue_name'), str):
+            raise ValueError("Expected {\"red_name\": ..., \"blue_name\": ...}")
+        return pair['red_name'], pair['blue_name']
+    fields = next(csv.reader([line]), [])
+    if len(fields) != 2:
+        raise ValueError("Expected red_name,blue_name")
+    return fields[0], fields[1]
+
+
+async def read_pairs(body: AsyncIterator[bytes], format: str = 'ndjson',
+                     batch_size: int = SCORE_CHUNK) -> AsyncIterator[List[Tuple[int, str, str, Optional[str]]]]:
+    """
+    Stream (index, red_name, blue_name, error) pairs out of a request body, batch_size at a time
+
+    The body is one pair per line: NDJSON objects or 'red_name,blue_name' CSV
+    rows (an optional 'red_name,blue_name' header is skipped). Only one
+    partial line is ever buffered; bad lines become pairs with an error.
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown input format '{format}' (use {' or '.join(EXPORT_FORMATS)})")
+    batch: List[Tuple[int, str, str, Optional[str]]] = []
+    buffer = b''
+    index = 0
+    skipping = False
+
+    def parse(line: bytes):
+        nonlocal index
+        text = line.decode('utf-8', errors='replace').strip()
+        if not text or (index == 0 and format == 'csv' and text.replace(' ', '').lower() == 'red_name,blue_name'):
+            return
+        try:
+            red_name, blue_name = _parse_pair(text, format)
+            batch.append((index, red_name, blue_name, None))
+        except ValueError as e:
+            batch.append((index, '', '', str(e)))
+        index += 1
+
+    async for data in body:
+        lines = (buffer + data).split(b'\n')
+        buffer = lines.pop()
+        for line in lines:
+            if skipping:
+                skipping = False
+                continue
+            parse(line)
+        if len(buffer) > MAX_LINE_BYTES:
+            # Drop the rest of an over-long line
+            if not skipping:
+                batch.append((index, '', '', f"Line longer than {MAX_LINE_BYTES} bytes"))
+                index += 1
+            buffer, skipping = b'', True
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if buffer and not skipping:
+        parse(buffer)
+    if batch:
+        yield batch
+
+
+def unscored_records(pairs: List[Tuple[int, str, str, Optional[str]]], error: str) -> List[Dict]:
+    """Records for a batch of pairs that could not be scored (each keeps its own error, if any)"""
+    records = []
+    for index, red_name, blue_name, pair_error in pairs:
+        record = dict.fromkeys(PREDICTION_COLUMNS)
+        record.update(index=index, red_name=red_name, blue_name=blue_name, error=pair_error or error)
+        records.append(record)
+    return records
+
+
+def score_pairs(predictor, fighter_service, pairs: List[Tuple[int, str, str, Optional[str]]]) -> List[Dict]:
+    """Prediction records for a batch of pairs - names resolved once per batch, ONE model call"""
+    resolved: Dict[str, object] = {}
+
+    def resolve(name: str):
+        if name not in resolved:
+            try:
+                resolved[name] = fighter_service.get_fighter_row(name)
+            except ValueError as e:
+                resolved[name] = e
+        return resolved[name]
+
+    records, scored = [], []
+    for index, red_name, blue_name, error in pairs:
+        # Every record has every column (null when not scored)
+        record = dict.fromkeys(PREDICTION_COLUMNS)
+        record.update(index=index, red_name=red_name, blue_name=blue_name, error=error)
+        records.append(record)
+        if error is None:
+            red_row, blue_row = resolve(red_name), resolve(blue_name)
+            for row in (red_row, blue_row):
+                if isinstance(row, ValueError):
+                    record['error'] = str(row)
+                    break
+            else:
+                scored.append((record, red_row, blue_row))
+
+    table = fighter_service.table
+    probabilities = predictor.predict_proba_rows(table, [red_row for _, red_row, _ in scored],
+                                                 [blue_row for _, _, blue_row in scored])
+    for (record, red_row, blue_row), probability in zip(scored, probabilities.tolist()):
+        record.update({
+            'red_fighter': table.names[red_row],
+            'blue_fighter': table.names[blue_row],
+            'probability_red_wins': round(probability, 4),
+            'probability_blue_wins': round(1 - probability, 4),
+            'predicted_winner': table.names[red_row] if probability > 0.5 else table.names[blue_row],
+            'confidence': predictor.calculate_confidence(probability)
+        })
+    return records
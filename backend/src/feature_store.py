@@ -0,0 +1,275 @@
+# src/feature_store.py
+import os
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+from src.columnar import load_csv
+from src.features import FEATURE_NAMES, compute_features
+from src.fighter_table import STAT_COLUMNS, STAT_KEYS
+from src.ratings import RatingEngine, days_since_epoch, fight_scores
+
+logger = logging.getLogger(__name__)
+
+# Same keys (and order) as fighter_database_REBALANCED.json and the fighter table,
+# so FighterService/PredictorService and compute_features can use them
+FIGHTER_STAT_KEYS = STAT_KEYS
+
+# Stats tracked per fight (CSV column prefix -> short name)
+FIGHT_STAT_COLUMNS = {'KD': 'kd', 'STR': 'str', 'SUB': 'sub', 'TD': 'td'}
+
+# Stats of a fighter with no earlier fights
+STAT_DEFAULTS = {key: float(default) for key, (_, default) in STAT_COLUMNS.items()}
+
+STREAK_WINDOW = 3
+RECENT_WINDOW = 5
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'data')
+
+
+def align_fighter_ids(fights: pd.DataFrame, fighters: pd.DataFrame) -> pd.DataFrame:
+    """
+    Put each bout's Fighter_Id_1/Fighter_Id_2 on the right side
+
+    In Fights.csv about a third of the rows have the two ids swapped relative
+    to Fighter_1/Fighter_2. Fighters.csv says which id belongs to which name.
+    """
+    id_to_name = dict(zip(fighters['Fighter_Id'], fighters['Full Name']))
+    name_of_id_1 = fights['Fighter_Id_1'].map(id_to_name)
+    name_of_id_2 = fights['Fighter_Id_2'].map(id_to_name)
+
+    swapped = ((name_of_id_1 == fights['Fighter_2']) | (name_of_id_2 == fights['Fighter_1'])) & \
+              (name_of_id_1 != fights['Fighter_1'])
+
+    aligned = fights.copy()
+    aligned.loc[swapped, 'Fighter_Id_1'] = fights.loc[swapped, 'Fighter_Id_2']
+    aligned.loc[swapped, 'Fighter_Id_2'] = fights.loc[swapped, 'Fighter_Id_1']
+    return aligned
+
+
+def dated_fights(fights: pd.DataFrame, events: pd.DataFrame, fighters: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Fights.csv rows with aligned Fighter_Ids and the event Date (Fights.csv row order kept)"""
+    if fighters is not None:
+        fights = align_fighter_ids(fights, fighters)
+    fights = fights.merge(events[['Event_Id', 'Date']], on='Event_Id', how='left')
+    fights['Date'] = pd.to_datetime(fights['Date'])
+    return fights
+
+
+def chronological_order(fights: pd.DataFrame) -> np.ndarray:
+    """Row order oldest fight first (Fights.csv is newest-first: a higher row is an earlier bout on a date)"""
+    return np.lexsort((-np.arange(len(fights)), fights['Date'].to_numpy()))
+
+
+class FeatureStore:
+    """
+    Point-in-time fighter stats keyed by (Fighter_Id, event Date)
+
+    Every row holds what was known about a fighter BEFORE that event: career
+    totals, last-3 streak and last-5 averages over earlier events only.
+    Training rows and serving snapshots come from the same definitions, so
+    offline accuracy is no longer inflated by future fights.
+    """
+
+    def __init__(self, fights: pd.DataFrame, events: pd.DataFrame, fighters: Optional[pd.DataFrame] = None):
+        self.fights = dated_fights(fights, events, fighters)
+        self.appearances = self._build_appearances(self.fights)
+
+    @classmethod
+    def from_csv(cls, data_dir: str = DATA_DIR) -> 'FeatureStore':
+        """Load Fights.csv and Events.csv and build the store"""
+        fights = load_csv(os.path.join(data_dir, 'Fights.csv'))
+        events = load_csv(os.path.join(data_dir, 'Events.csv'))
+        fighters = load_csv(os.path.join(data_dir, 'Fighters.csv'))
+        return cls(fights, events, fighters)
+
+    @staticmethod
+    def _rate(fights: pd.DataFrame) -> pd.DataFrame:
+        """Glicko ratings before/after every fight (src/ratings.py), one chronological pass"""
+        chronological = chronological_order(fights)
+        ordered = fights.iloc[chronological]
+        rated = RatingEngine().rate_fights(
+            ordered['Fighter_Id_1'].to_numpy(), ordered['Fighter_Id_2'].to_numpy(),
+            fight_scores(ordered['Result_1']), events=ordered['Event_Id'].to_numpy(),
+            days=days_since_epoch(ordered['Date'].to_numpy())
+        )
+        ratings = pd.DataFrame(index=np.arange(len(fights)), columns=rated.columns, dtype=np.float64)
+        ratings.iloc[chronological] = rated.to_numpy()
+        return ratings
+
+    @staticmethod
+    def _build_appearances(fights: pd.DataFrame) -> pd.DataFrame:
+        """One chronological sweep: pre-fight and post-fight stats for every fighter appearance"""
+        # Fights.csv is newest-first: a higher row number is an earlier bout on the same date
+        row = np.arange(len(fights))
+        result_1 = fights['Result_1']
+        ratings = FeatureStore._rate(fights)
+
+        sides = []
+        for side in (1, 2):
+            appearance = pd.DataFrame({
+                'Fighter_Id': fights[f'Fighter_Id_{side}'].to_numpy(),
+                'name': fights[f'Fighter_{side}'].to_numpy(),
+                'Fight_Id': fights['Fight_Id'].to_numpy(),
+                'Date': fights['Date'].to_numpy(),
+                'seq': -row
+            })
+            for column, short in FIGHT_STAT_COLUMNS.items():
+                appearance[short] = fights[f'{column}_{side}'].to_numpy(dtype=np.float64)
+            won = result_1 == ('W' if side == 1 else 'L')
+            appearance['win'] = won.to_numpy(dtype=np.float64)
+            for stage in ('pre', 'post'):
+                appearance[f'{stage}_rating'] = ratings[f'{stage}_rating_{side}'].to_numpy()
+                appearance[f'{stage}_rating_deviation'] = ratings[f'{stage}_deviation_{side}'].to_numpy()
+            sides.append(appearance)
+
+        apps = pd.concat(sides, ignore_index=True)
+        apps = apps.sort_values(['Fighter_Id', 'Date', 'seq'], kind='stable').reset_index(drop=True)
+        apps['finish'] = (apps['kd'] > 0).astype(np.float64) + (apps['sub'] > 0).astype(np.float64)
+
+        by_fighter = apps.groupby('Fighter_Id', sort=False)
+        count = by_fighter.cumcount().to_numpy(dtype=np.float64) + 1
+
+        # Inclusive running sums (stats AFTER this fight)
+        cumulative = {}
+        for column in ['kd', 'str', 'sub', 'td', 'win', 'finish']:
+            cumulative[column] = by_fighter[column].cumsum()
+        apps['cum_count'] = count
+        for column, values in cumulative.items():
+            apps[f'cum_{column}'] = values
+
+        # Windowed sums as differences of running sums (no per-group Python)
+        def window_sum(column, n):
+            lagged = by_fighter[f'cum_{column}'].shift(n).fillna(0.0)
+            return apps[f'cum_{column}'] - lagged
+
+        window = np.minimum(count, RECENT_WINDOW)
+        post = pd.DataFrame({
+            'avg_strikes': apps['cum_str'] / count,
+            'avg_knockdowns': apps['cum_kd'] / count,
+            'avg_takedowns': apps['cum_td'] / count,
+            'avg_submissions': apps['cum_sub'] / count,
+            'win_streak': window_sum('win', STREAK_WINDOW),
+            'win_rate': apps['cum_win'] / count,
+            'total_fights': count,
+            'recent_avg_strikes': window_sum('str', RECENT_WINDOW) / window,
+            'recent_avg_knockdowns': window_sum('kd', RECENT_WINDOW) / window,
+            'finish_rate': apps['cum_finish'] / count,
+            'rating': apps['post_rating'],
+            'rating_deviation': apps['post_rating_deviation']
+        })
+
+        # Pre-fight = post-fight stats of the previous appearance...
+        pre = post.groupby(apps['Fighter_Id'], sort=False).shift(1)
+        # ...taken at the FIRST bout of that date, so same-night fights never leak
+        # (rows are sorted, so each fighter's bouts on one date are contiguous)
+        first_of_day = np.arange(len(apps)) - apps.groupby(['Fighter_Id', 'Date'], sort=False).cumcount().to_numpy()
+        pre = pre.iloc[first_of_day].reset_index(drop=True)
+        pre = pre.fillna(STAT_DEFAULTS)
+        # Ratings come straight from the engine, which rates a whole event from pre-event values
+        pre['rating'] = apps['pre_rating'].to_numpy()
+        pre['rating_deviation'] = apps['pre_rating_deviation'].to_numpy()
+
+        result = apps[['Fighter_Id', 'name', 'Fight_Id', 'Date']].copy()
+        for key in FIGHTER_STAT_KEYS:
+            result[f'pre_{key}'] = pre[key].to_numpy()
+            result[f'post_{key}'] = post[key].to_numpy()
+        return result
+
+    def stats_before(self, fighter_id: str, date) -> Dict:
+        """Stats for one fighter using only fights strictly before date"""
+        date = pd.Timestamp(date)
+        rows = self.appearances[(self.appearances['Fighter_Id'] == fighter_id) &
+                                (self.appearances['Date'] < date)]
+        if rows.empty:
+            return dict(STAT_DEFAULTS)
+        last = rows.iloc[-1]
+        stats = {key: float(last[f'post_{key}']) for key in FIGHTER_STAT_KEYS}
+        stats['win_streak'] = int(stats['win_streak'])
+        stats['total_fights'] = int(stats['total_fights'])
+        return stats
+
+    def snapshot(self, as_of=None, key: str = 'name') -> Dict[str, Dict]:
+        """
+        Every fighter's stats as of a date (default: after all known fights)
+
+        Args:
+            as_of: Only fights strictly before this date count
+            key: 'Fighter_Id' (fighter_database_REBALANCED.json layout - every record
+                 also carries the fighter's 'name') or 'name'
+
+        Returns:
+            Dictionary of fighter -> stats, most recently active fighters first
+            (name collisions are logged and keep the most recently active fighter)
+        """
+        apps = self.appearances
+        if as_of is not None:
+            apps = apps[apps['Date'] < pd.Timestamp(as_of)]
+
+        latest = apps.groupby('Fighter_Id', sort=False).tail(1).sort_values('Date', ascending=False, kind='stable')
+        columns = {stat: latest[f'post_{stat}'].tolist() for stat in FIGHTER_STAT_KEYS}
+        names = latest['name'].tolist()
+        snapshot = {}
+        collisions = []
+        for i, fighter_key in enumerate(latest[key].tolist()):
+            # Fighters sharing a display name: a name key keeps the most recently active one
+            if fighter_key in snapshot:
+                collisions.append(fighter_key)
+                continue
+            stats = {'name': names[i]} if key != 'name' else {}
+            stats.update({stat: values[i] for stat, values in columns.items()})
+            stats['win_streak'] = int(stats['win_streak'])
+            stats['total_fights'] = int(stats['total_fights'])
+            snapshot[fighter_key] = stats
+        if collisions:
+            logger.warning("⚠️ %d fighter(s) left out of the %s-keyed snapshot - they share a name with a more "
+                           "recently active fighter (%s); use key='Fighter_Id' to keep every fighter",
+                           len(collisions), key, ', '.join(collisions[:5]))
+        return snapshot
+
+    def training_frame(self) -> pd.DataFrame:
+        """
+        One row per decided fight with BOTH fighters' pre-fight stats
+
+        Columns: Fight_Id, Event_Id, Date, Weight_Class, target (1 = Fighter_1 won),
+        f1_<stat> and f2_<stat> for every stat in FIGHTER_STAT_KEYS. Oldest fight first.
+        """
+        pre_columns = [f'pre_{key}' for key in FIGHTER_STAT_KEYS]
+        pre = self.appearances.set_index(['Fight_Id', 'Fighter_Id'])[pre_columns]
+
+        fights = self.fights[self.fights['Result_1'].isin(['W', 'L'])]
+        frame = fights[['Fight_Id', 'Event_Id', 'Date', 'Weight_Class']].copy()
+        frame['target'] = (fights['Result_1'] == 'W').astype(int).to_numpy()
+        for side in (1, 2):
+            keys = pd.MultiIndex.from_arrays([fights['Fight_Id'], fights[f'Fighter_Id_{side}']])
+            side_stats = pre.reindex(keys).to_numpy()
+            for i, key in enumerate(FIGHTER_STAT_KEYS):
+                frame[f'f{side}_{key}'] = side_stats[:, i]
+
+        return frame.iloc[::-1].sort_values('Date', kind='stable').reset_index(drop=True)
+
+    def training_set(self, feature_names=None) -> pd.DataFrame:
+        """Model features + target for every decided fight, built from pre-fight stats only"""
+        frame = self.training_frame()
+        fighter1 = frame[[f'f1_{key}' for key in FIGHTER_STAT_KEYS]].to_numpy()
+        fighter2 = frame[[f'f2_{key}' for key in FIGHTER_STAT_KEYS]].to_numpy()
+
+        # Same feature code as serving (src/features.py), all fights in one call
+        feature_names = FEATURE_NAMES if feature_names is None else list(feature_names)
+        features = pd.DataFrame(compute_features(fighter1, fighter2, feature_names), columns=feature_names)
+        features.insert(0, 'target', frame['target'].to_numpy())
+        return features
+
+
+if __name__ == "__main__":
+    # Run from backend/: python -m src.feature_store
+    import time
+
+    start = time.perf_counter()
+    store = FeatureStore.from_csv()
+    training = store.training_set()
+    output_path = os.path.join(DATA_DIR, '..', 'ufc_processed_POINT_IN_TIME.csv')
+    training.to_csv(output_path, index=False)
+    print(f"✅ Point-in-time training set: {len(training)} fights in {time.perf_counter() - start:.2f}s")
+    print(f"💾 Saved to: {os.path.normpath(output_path)}")
@@ -0,0 +1,130 @@
+# src/features.py
+import numpy as np
+from typing import Dict, List, Optional
+
+from src.fighter_table import STAT_COLUMNS, STAT_KEYS
+
+# REBALANCED model features, in the order the notebook trained them
+# (kd, str, td, sub blocks, then the weighted extras, form and career),
+# then rating_diff (models trained before it simply don't ask for it)
+FEATURE_NAMES = [
+    'kd_diff', 'kd_ratio', 'kd_dominance',
+    'str_diff', 'str_ratio', 'str_dominance',
+    'td_diff', 'td_ratio', 'td_dominance',
+    'sub_diff', 'sub_ratio', 'sub_dominance',
+    'striking_volume_advantage', 'striking_dominance', 'knockdown_power', 'submission_threat',
+    'streak_diff', 'win_rate_diff', 'exp_diff',
+    'rating_diff'
+]
+
+# Feature prefix -> fighter stat it compares
+FIGHT_STATS = {'kd': 'avg_knockdowns', 'str': 'avg_strikes', 'td': 'avg_takedowns', 'sub': 'avg_submissions'}
+
+# Added to the denominator of every *_ratio (same as the training notebook)
+RATIO_SMOOTHING = 0.1
+
+STAT_INDEX = {key: i for i, key in enumerate(STAT_KEYS)}
+STAT_DEFAULTS = np.array([STAT_COLUMNS[key][1] for key in STAT_KEYS], dtype=np.float64)
+
+
+def stats_matrix(fighters: List[Dict]) -> np.ndarray:
+    """Stats dicts -> array of shape (n, len(STAT_KEYS)); missing stats get the fighter table defaults"""
+    matrix = np.tile(STAT_DEFAULTS, (len(fighters), 1))
+    for i, fighter_stats in enumerate(fighters):
+        for key, value in fighter_stats.items():
+            column = STAT_INDEX.get(key)
+            if column is not None and value is not None:
+                matrix[i, column] = value
+    return matrix
+
+
+def _weighted_features(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Dominance flags and the REBALANCED weighted features, from the *_diff columns"""
+    for prefix in FIGHT_STATS:
+        columns[f'{prefix}_dominance'] = (columns[f'{prefix}_diff'] > 0).astype(np.float64)
+
+    # Enhanced striking (weighted)
+    columns['striking_volume_advantage'] = columns['str_diff'] * 1.5
+    columns['striking_dominance'] = columns['str_dominance'] * 2
+    # Finishing stats
+    columns['knockdown_power'] = columns['kd_diff'] * 2  # Double weight
+    columns['submission_threat'] = columns['sub_diff'] * 1.8  # Higher weight
+    return columns
+
+
+def _to_matrix(columns: Dict[str, np.ndarray], n: int, feature_names: Optional[List[str]] = None) -> np.ndarray:
+    """Columns -> (n, n_features) array in feature_names order (unknown features -> 0)"""
+    feature_names = FEATURE_NAMES if feature_names is None else list(feature_names)
+    matrix = np.zeros((n, len(feature_names)))
+    for i, name in enumerate(feature_names):
+        if name in columns:
+            matrix[:, i] = columns[name]
+    return matrix
+
+
+def compute_features(fighter1: np.ndarray, fighter2: np.ndarray,
+                     feature_names: Optional[List[str]] = None) -> np.ndarray:
+    """
+    REBALANCED features for many fights at once
+
+    Args:
+        fighter1: Stats of fighter 1 per fight, shape (n_pairs, len(STAT_KEYS))
+        fighter2: Stats of fighter 2 per fight, same shape
+        feature_names: Output column order (default FEATURE_NAMES; pass model.feature_names_in_)
+
+    Returns:
+        Array of shape (n_pairs, len(feature_names))
+    """
+    fighter1 = np.asarray(fighter1, dtype=np.float64).reshape(-1, len(STAT_KEYS))
+    fighter2 = np.asarray(fighter2, dtype=np.float64).reshape(-1, len(STAT_KEYS))
+    diffs = fighter1 - fighter2
+
+    # 1. FIGHT STATISTICS FEATURES (MOST IMPORTANT)
+    columns = {}
+    for prefix, stat in FIGHT_STATS.items():
+        column = STAT_INDEX[stat]
+        columns[f'{prefix}_diff'] = diffs[:, column]
+        columns[f'{prefix}_ratio'] = fighter1[:, column] / (fighter2[:, column] + RATIO_SMOOTHING)
+    _weighted_features(columns)
+
+    # 2. RECENT FORM FEATURES
+    columns['streak_diff'] = diffs[:, STAT_INDEX['win_streak']]
+
+    # 3. CAREER FEATURES (LEAST IMPORTANT)
+    columns['win_rate_diff'] = diffs[:, STAT_INDEX['win_rate']]
+    columns['exp_diff'] = diffs[:, STAT_INDEX['total_fights']]
+
+    # 4. STRENGTH OF RECORD (Glicko rating)
+    columns['rating_diff'] = diffs[:, STAT_INDEX['rating']]
+
+    features = _to_matrix(columns, len(diffs), feature_names)
+    # Same as training's fillna(0)
+    features[np.isnan(features)] = 0.0
+    return features
+
+
+def select_features(features: np.ndarray, feature_names: List[str]) -> np.ndarray:
+    """Reorder a FEATURE_NAMES-ordered array to feature_names (unknown features -> 0)"""
+    if list(feature_names) == FEATURE_NAMES:
+        return features
+    return _to_matrix(dict(zip(FEATURE_NAMES, features.T)), len(features), feature_names)
+
+
+def features_from_diffs(diffs: Dict[str, float], feature_names: Optional[List[str]] = None) -> np.ndarray:
+    """
+    Features for ONE fight when only stat differences are known (the raw /predict endpoint)
+
+    Dominance and weighted features are derived from the diffs; ratios can't be,
+    so they are 0 like any other missing feature.
+    """
+    columns = {name: np.array([float(value)]) for name, value in diffs.items()}
+    for prefix in FIGHT_STATS:
+        columns.setdefault(f'{prefix}_diff', np.zeros(1))
+    _weighted_features(columns)
+    return _to_matrix(columns, 1, feature_names)
+
+
+def build_features(fighter1_stats: Dict, fighter2_stats: Dict) -> Dict:
+    """Calculate ALL feature differences for REBALANCED model (one fight, as a dict)"""
+    features = compute_features(stats_matrix([fighter1_stats]), stats_matrix([fighter2_stats]))
+    return dict(zip(FEATURE_NAMES, features[0].tolist()))
@@ -1,134 +1,327 @@
 # src/fighter_service.py
+import os
+import copy
 import json
-import pandas as pd
-from typing import Dict, List
+import bisect
+import hashlib
+import logging
+import numpy as np
+import pickle
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from src.fighter_table import FighterTable
+
+logger = logging.getLogger(__name__)
+
+# Fuzzy matching: how many trigram candidates get the (expensive) edit distance check,
+# and how similar a name must be before we treat it as the fighter the user meant
+FUZZY_CANDIDATES = 12
+FUZZY_MIN_SIMILARITY = 0.75
+
+def _padded_trigrams(text: str) -> set:
+    """Character trigrams of ' text ' (padding lets first/last letters count)"""
+    padded = f" {' '.join(text.split())} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance (bit-parallel Myers/Hyyro - one pass over b)"""
+    if not a:
+        return len(b)
+    m = len(a)
+    full = (1 << m) - 1
+    high_bit = 1 << (m - 1)
+    
+    # Bitmask of positions in a for each character
+    peq = {}
+    for i, char in enumerate(a):
+        peq[char] = peq.get(char, 0) | (1 << i)
+    
+    pv, mv, score = full, 0, m
+    for char in b:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & high_bit:
+            score += 1
+        elif mh & high_bit:
+            score -= 1
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+    return score
+
+def _name_similarity(query_lower: str, fighter_lower: str) -> float:
+    """1 - normalized edit distance, against the full name or its best run of tokens"""
+    query_tokens = query_lower.split()
+    fighter_tokens = fighter_lower.split()
+    windows = {' '.join(fighter_tokens)}
+    n = len(query_tokens)
+    for i in range(len(fighter_tokens) - n + 1):
+        windows.add(' '.join(fighter_tokens[i:i + n]))
+    
+    query = ' '.join(query_tokens)
+    return max(1 - _edit_distance(query, window) / max(len(query), len(window))
+               for window in windows)
 
 class FighterService:
     """Fighter lookup service for REBALANCED UFC JSON data"""
     
-    def __init__(self, json_path: str = 'fighter_database_REBALANCED.json'):
-        print("📊 Loading REBALANCED fighter database from JSON...")
+    # Bump when the attributes pickled by save_snapshot change
+    SNAPSHOT_FORMAT = 4
+    
+    # Set by attach_entities() (not part of the snapshot): Fighter_Ids and fight history per name
+    entities = None
+    
+    def __init__(self, json_path: str = 'fighter_database_REBALANCED.json',
+                 fighters_dict: Optional[Dict] = None):
+        """
+        Args:
+            json_path: fighter_database_REBALANCED.json to load
+            fighters_dict: Already-built {Fighter_Id: {'name': ..., stats}} or {name: stats}
+                           (e.g. FeatureStore.snapshot(key='Fighter_Id')) - skips the JSON
+        """
+        if fighters_dict is None:
+            logger.info("📊 Loading REBALANCED fighter database from %s", json_path)
+            
+            # Load REBALANCED UFC JSON data
+            with open(json_path, 'rb') as f:
+                raw = f.read()
+            fighters_dict = json.loads(raw)
+        else:
+            raw = json.dumps(fighters_dict, sort_keys=True).encode()
         
-        # Load REBALANCED UFC JSON data
-        with open(json_path, 'r') as f:
-            fighters_dict = json.load(f)
+        # Content hash - part of every prediction cache key
+        self.version = hashlib.sha256(raw).hexdigest()[:12]
         
         # Convert to the format your REBALANCED model expects
-        self.fighters = self._create_fighter_dict(fighters_dict)
-        print(f"✅ Loaded {len(self.fighters)} fighters from REBALANCED JSON dataset")
-        print(f"🎯 Model type: REBALANCED (fight stats emphasis)")
-    
-    def _create_fighter_dict(self, fighters_dict: Dict) -> Dict:
-        """Create fighter dictionary from REBALANCED JSON"""
-        fighters = {}
-        
-        # Convert from REBALANCED JSON structure to what PredictorService expects
-        for fighter_name, stats in fighters_dict.items():
-            # REBALANCED JSON has: avg_strikes, avg_knockdowns, avg_takedowns, avg_submissions
-            # Create a fighter entry for REBALANCED model
-            fighters[fighter_name] = {
-                'id': fighter_name,  # Use name as ID
-                'name': fighter_name,
-                
-                # FIGHT STATISTICS (MOST IMPORTANT - PRIORITY 1)
-                'avg_strikes': stats.get('avg_strikes', 0),
-                'avg_knockdowns': stats.get('avg_knockdowns', 0),
-                'avg_takedowns': stats.get('avg_takedowns', 0),
-                'avg_submissions': stats.get('avg_submissions', 0),
-                
-                # RECENT FORM (PRIORITY 2)
-                'win_streak': stats.get('win_streak', 0),
-                
-                # CAREER STATS (LEAST IMPORTANT - PRIORITY 3)
-                'win_rate': stats.get('win_rate', 0.5),
-                'total_fights': stats.get('total_fights', 0),
-                
-                # Additional metrics from new JSON
-                'recent_avg_strikes': stats.get('recent_avg_strikes', 0),
-                'recent_avg_knockdowns': stats.get('recent_avg_knockdowns', 0),
-                'finish_rate': stats.get('finish_rate', 0)
-            }
-        
-        # Print sample fighter to verify
-        sample_name = list(fighters.keys())[0]
-        print(f"📋 Sample fighter ({sample_name}):")
-        print(f"   • Fight Stats: {fighters[sample_name]['avg_strikes']:.1f} strikes, "
-              f"{fighters[sample_name]['avg_knockdowns']:.1f} KDs")
-        print(f"   • Recent: {fighters[sample_name]['win_streak']}-fight streak")
-        print(f"   • Career: {fighters[sample_name]['win_rate']*100:.1f}% win rate")
-        
-        return fighters
+        self.table = self._create_fighter_table(fighters_dict)
+        # Dict-style access (name -> stats dict) for older callers
+        self.fighters = self.table
+        self._build_name_indexes()
+        logger.info("✅ Loaded %d fighters from REBALANCED JSON dataset", len(self.fighters))
     
-    def get_fighter(self, name: str) -> Dict:
-        """Find fighter by name (case-insensitive) - UPDATED for rebalanced"""
-        name_lower = name.strip().lower()
+    def _create_fighter_table(self, fighters_dict: Dict) -> FighterTable:
+        """Create the columnar fighter table from REBALANCED JSON"""
+        # REBALANCED JSON has: avg_strikes, avg_knockdowns, avg_takedowns, avg_submissions, ...
+        # stored as one NumPy column per stat instead of a dict per fighter
+        return FighterTable.from_dict(fighters_dict)
+    
+    def save_snapshot(self, path: str):
+        """Write the loaded roster AND its name indexes as one binary snapshot"""
+        temp_path = f"{path}.tmp.{os.getpid()}"
+        with open(temp_path, 'wb') as f:
+            pickle.dump(self.__dict__, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+    
+    @classmethod
+    def from_snapshot(cls, path: str) -> 'FighterService':
+        """Load a snapshot written by save_snapshot (no JSON parsing, no index building)"""
+        service = cls.__new__(cls)
+        with open(path, 'rb') as f:
+            service.__dict__.update(pickle.load(f))
+        return service
+    
+    def _build_name_indexes(self):
+        """Build name lookup indexes ONCE so lookups never scan the whole roster"""
+        # Roster order matters: ties are always broken by first fighter in the JSON
+        self._names = self.table.names
+        self._lower_names = [fighter_name.lower() for fighter_name in self._names]
         
-        exact_matches = []
-        partial_matches = []
+        # 1. Exact match: case-folded name -> first fighter with that name
+        self._exact_index = {}
+        for row, fighter_lower in enumerate(self._lower_names):
+            self._exact_index.setdefault(fighter_lower, row)
         
-        # Search through all fighters
-        for fighter_name, fighter in self.fighters.items():
-            fighter_lower = fighter_name.lower()
-            
-            # Check for exact match
-            if fighter_lower == name_lower:
-                exact_matches.append((fighter_name, fighter))
-            
-            # Check for partial match
-            elif name_lower in fighter_lower:
-                partial_matches.append((fighter_name, fighter))
+        # 2. Prefix match: sorted (name, row) pairs searched with bisect
+        self._prefix_index = sorted((fighter_lower, row) for row, fighter_lower in enumerate(self._lower_names))
+        self._prefix_keys = [fighter_lower for fighter_lower, _ in self._prefix_index]
+        
+        # 3. Substring match: every 1-3 character gram -> rows containing it (in roster order)
+        ngram_index = defaultdict(list)
+        for row, fighter_lower in enumerate(self._lower_names):
+            grams = set()
+            for n in (1, 2, 3):
+                for i in range(len(fighter_lower) - n + 1):
+                    grams.add(fighter_lower[i:i + n])
+            for gram in grams:
+                ngram_index[gram].append(row)
+        self._ngram_index = dict(ngram_index)
+        
+        # 4. Fuzzy match: padded trigram -> rows (numpy) for typo-tolerant search
+        fuzzy_index = defaultdict(list)
+        for row, fighter_lower in enumerate(self._lower_names):
+            for gram in _padded_trigrams(fighter_lower):
+                fuzzy_index[gram].append(row)
+        self._fuzzy_index = {gram: np.array(rows, dtype=np.int32) for gram, rows in fuzzy_index.items()}
+    
+    def find_similar(self, query: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """
+        Typo-tolerant name search
+        
+        Trigram overlap picks a few candidates, then edit distance ranks only those.
+        
+        Returns:
+            List of (fighter_name, similarity) pairs, best first
+        """
+        query_lower = ' '.join(query.lower().split())
+        postings = [self._fuzzy_index[gram] for gram in _padded_trigrams(query_lower)
+                    if gram in self._fuzzy_index]
+        if not postings:
+            return []
+        
+        # Count shared trigrams per fighter in one pass
+        overlap = np.bincount(np.concatenate(postings), minlength=len(self._names))
+        k = min(FUZZY_CANDIDATES, int(np.count_nonzero(overlap)))
+        candidates = np.argpartition(-overlap, k - 1)[:k]
+        
+        scored = [(self._names[row], _name_similarity(query_lower, self._lower_names[row]), int(row))
+                  for row in candidates]
+        scored.sort(key=lambda item: (-item[1], item[2]))
+        return [(fighter_name, similarity) for fighter_name, similarity, _ in scored[:limit]]
+    
+    def _substring_rows(self, query_lower: str, limit: Optional[int] = None) -> List[int]:
+        """Rows whose name contains query_lower, in roster order"""
+        if not query_lower:
+            rows = range(len(self._names))
+            return list(rows if limit is None else rows[:limit])
+        
+        # Short queries are answered straight from the index
+        if len(query_lower) <= 3:
+            rows = self._ngram_index.get(query_lower, [])
+            return list(rows if limit is None else rows[:limit])
+        
+        # Longer queries: start from the rarest trigram, then verify
+        trigrams = {query_lower[i:i + 3] for i in range(len(query_lower) - 2)}
+        postings = [self._ngram_index.get(gram, []) for gram in trigrams]
+        candidates = min(postings, key=len)
+        
+        rows = []
+        for row in candidates:
+            if query_lower in self._lower_names[row]:
+                rows.append(row)
+                if limit is not None and len(rows) >= limit:
+                    break
+        return rows
+    
+    def _first_prefix_row(self, query_lower: str) -> Optional[int]:
+        """First fighter (in roster order) whose name starts with query_lower"""
+        lo = bisect.bisect_left(self._prefix_keys, query_lower)
+        hi = bisect.bisect_right(self._prefix_keys, query_lower + '\U0010ffff')
+        if lo == hi:
+            return None
+        return min(row for _, row in self._prefix_index[lo:hi])
+    
+    def attach_entities(self, entities):
+        """
+        Attach an EntityIndex: Fighter_Ids per name and fight history
+        
+        The table itself is keyed by Fighter_Id, so fighters sharing a name keep
+        their own rows; the name resolves to the most recently active of them.
+        """
+        self.entities = entities
+    
+    def with_entities(self, entities) -> 'FighterService':
+        """A copy sharing this roster with another EntityIndex attached (self is left untouched)"""
+        service = copy.copy(self)
+        service.attach_entities(entities)
+        return service
+    
+    def fighter_ids(self, name: str) -> List[str]:
+        """Fighter_Ids for an exact (case-insensitive) name, most recently active first ([] without entities)"""
+        entities = self.entities
+        return entities.ids_for_name(name) if entities is not None else []
+    
+    def fighter_id(self, row: int) -> Optional[str]:
+        """Fighter_Id of a row in self.table (a name-keyed roster uses the name's most recently active id)"""
+        if self.table.keyed_by_id:
+            return self.table.ids[row]
+        fighter_ids = self.fighter_ids(self.table.names[row])
+        return fighter_ids[0] if fighter_ids else None
+    
+    def row_of_id(self, fighter_id: str) -> int:
+        """Row in self.table for a Fighter_Id (KeyError if unknown or not in the fighter DB)"""
+        return self.table.row_of_id[fighter_id]
+    
+    def exact_row(self, name: str) -> Optional[int]:
+        """Row for a Fighter_Id or an exact (case-insensitive) name, or None - dict lookups, no roster scans"""
+        table = self.table
+        if table.keyed_by_id and name.strip() in table.row_of_id:
+            return table.row_of_id[name.strip()]
+        # A shared name: its most recently active fighter
+        for fighter_id in self.fighter_ids(name):
+            row = table.row_of_id.get(fighter_id)
+            if row is not None:
+                return row
+        return self._exact_index.get(name.strip().lower())
+    
+    def get_fighter_row(self, name: str) -> int:
+        """Resolve a name (case-insensitive, partial or misspelled) to its row in self.table"""
+        name_lower = name.strip().lower()
         
         # Return exact match if found
-        if exact_matches:
-            fighter = exact_matches[0][1]
-            print(f"🔍 Found: {fighter['name']} "
-                  f"({fighter['avg_strikes']:.1f} avg strikes, "
-                  f"{fighter['win_rate']*100:.1f}% win rate)")
-            return fighter
+        exact_row = self.exact_row(name_lower)
+        if exact_row is not None:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("🔍 Found: %s (%.1f avg strikes, %.1f%% win rate)", self._names[exact_row],
+                             self.table.columns['avg_strikes'][exact_row], self.table.columns['win_rate'][exact_row] * 100)
+            return exact_row
         
         # Handle partial matches
-        if partial_matches:
+        partial_rows = self._substring_rows(name_lower, limit=2)
+        if partial_rows:
             # If only one match, return it
-            if len(partial_matches) == 1:
-                fighter = partial_matches[0][1]
-                print(f"🔍 Found (partial): {fighter['name']}")
-                return fighter
+            if len(partial_rows) == 1:
+                logger.debug("🔍 Found (partial): %s", self._names[partial_rows[0]])
+                return partial_rows[0]
             
             # If multiple matches, try to find best one
-            for match_name, match_fighter in partial_matches:
-                if match_name.lower().startswith(name_lower):
-                    print(f"🔍 Found (best match): {match_fighter['name']}")
-                    return match_fighter
+            prefix_row = self._first_prefix_row(name_lower)
+            if prefix_row is not None:
+                logger.debug("🔍 Found (best match): %s", self._names[prefix_row])
+                return prefix_row
             
             # Otherwise return first match
-            fighter = partial_matches[0][1]
-            print(f"🔍 Found (first match): {fighter['name']}")
-            return fighter
+            logger.debug("🔍 Found (first match): %s", self._names[partial_rows[0]])
+            return partial_rows[0]
         
-        # No matches found - show suggestions
-        suggestions = []
-        for fighter_name in self.fighters.keys():
-            if name_lower in fighter_name.lower():
-                suggestions.append(fighter_name)
+        # Typo-tolerant match
+        similar = self.find_similar(name_lower)
+        if similar and similar[0][1] >= FUZZY_MIN_SIMILARITY:
+            logger.debug("🔍 Found (fuzzy): %s", similar[0][0])
+            return self.table.row(similar[0][0])
         
-        if suggestions:
-            raise ValueError(f"Did you mean: {', '.join(suggestions[:3])}?")
+        # No matches found - show suggestions
+        if similar:
+            suggestions = [fighter_name for fighter_name, _ in similar[:3]]
+            raise ValueError(f"Fighter '{name}' not found. Did you mean: {', '.join(suggestions)}?")
         
-        raise ValueError(f"Fighter '{name}' not found. Try: {list(self.fighters.keys())[:5]}")
+        raise ValueError(f"Fighter '{name}' not found. Try: {self._names[:5]}")
     
-    def search_fighters(self, query: str, limit: int = 10) -> List[Dict]:
-        """Search fighters by name"""
+    def get_fighter(self, name: str) -> Dict:
+        """Find fighter by name (case-insensitive) - UPDATED for rebalanced"""
+        return self.table.record(self.get_fighter_row(name))
+    
+    def search_fighters(self, query: str, limit: int = 10, fuzzy: bool = True) -> List[Dict]:
+        """Search fighters by name (substring matches first, then close spellings)"""
         if len(query) < 2:
             return []
         
-        query_lower = query.lower()
-        results = []
+        limit = max(limit, 1)
+        rows = self._substring_rows(query.lower(), limit=limit)
+        results = [self.table.record(row) for row in rows]
         
-        for fighter_name, fighter in self.fighters.items():
-            if query_lower in fighter_name.lower():
-                results.append(fighter)
-                if len(results) >= limit:
+        # Top up with typo-tolerant matches
+        if fuzzy and len(results) < limit and len(query.strip()) >= 3:
+            found = {fighter['name'] for fighter in results}
+            for fighter_name, similarity in self.find_similar(query, limit=limit):
+                if similarity < FUZZY_MIN_SIMILARITY or len(results) >= limit:
                     break
+                if fighter_name not in found:
+                    results.append(self.table[fighter_name])
         
         return results
     
@@ -144,5 +337,21 @@ class FighterService:
             'avg_submissions': fighter['avg_submissions'],
             'win_streak': fighter['win_streak'],
             'win_rate': fighter['win_rate'],
-            'total_fights': fighter['total_fights']
+            'total_fights': fighter['total_fights'],
+            'rating': fighter['rating']
+        }
+    
+    def get_rating(self, name: str) -> Dict:
+        """Glicko rating of one fighter (src/ratings.py)"""
+        row = self.get_fighter_row(name)
+        return {
+            'name': self.table.names[row],
+            'rating': self.table.columns['rating'][row].item(),
+            'rating_deviation': self.table.columns['rating_deviation'][row].item()
         }
+    
+    def top_rated(self, limit: int = 10, min_fights: int = 1) -> List[Dict]:
+        """Highest-rated fighters with at least min_fights, best first"""
+        eligible = np.flatnonzero(self.table.columns['total_fights'] >= min_fights)
+        order = np.argsort(-self.table.columns['rating'][eligible], kind='stable')[:max(limit, 0)]
+        return [self.table.record(row) for row in eligible[order].tolist()]
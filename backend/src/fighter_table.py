@@ -0,0 +1,118 @@
+# src/fighter_table.py
+import numpy as np
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from src.ratings import INITIAL_DEVIATION, INITIAL_RATING
+
+# REBALANCED fighter stats: column -> (dtype, default when missing from the JSON)
+# Averages stay float64: the model's split thresholds were learned on float64
+# stats, and float32 rounding flips a few predictions near a threshold.
+STAT_COLUMNS = {
+    # FIGHT STATISTICS (MOST IMPORTANT - PRIORITY 1)
+    'avg_strikes': (np.float64, 0),
+    'avg_knockdowns': (np.float64, 0),
+    'avg_takedowns': (np.float64, 0),
+    'avg_submissions': (np.float64, 0),
+    # RECENT FORM (PRIORITY 2)
+    'win_streak': (np.int32, 0),
+    # CAREER STATS (LEAST IMPORTANT - PRIORITY 3)
+    'win_rate': (np.float64, 0.5),
+    'total_fights': (np.int32, 0),
+    # Additional metrics
+    'recent_avg_strikes': (np.float64, 0),
+    'recent_avg_knockdowns': (np.float64, 0),
+    'finish_rate': (np.float64, 0),
+    # STRENGTH: Glicko rating and its uncertainty (src/ratings.py)
+    'rating': (np.float64, INITIAL_RATING),
+    'rating_deviation': (np.float64, INITIAL_DEVIATION)
+}
+STAT_KEYS = list(STAT_COLUMNS)
+
+
+class FighterTable(Mapping):
+    """
+    Fighter roster stored as columns (structure of arrays)
+
+    One float64/int32 NumPy array per stat plus id -> row and name -> row
+    indexes, instead of a dict of boxed fields per fighter. gather()/matrix()
+    return the stats of many fighters at once, so feature differences for N
+    matchups are plain array subtraction. Mapping access (table[name] -> dict)
+    is kept for compatibility and builds the record on demand; a name shared
+    by several fighters resolves to the first (most recently active) one.
+    """
+
+    def __init__(self, names: List[str], columns: Dict[str, np.ndarray], ids: Optional[List[str]] = None):
+        self.names = list(names)
+        # Fighter_Id per row (a roster keyed by name uses the names as ids)
+        self.keyed_by_id = ids is not None
+        self.ids = list(ids) if ids is not None else list(self.names)
+        self.columns = {key: np.ascontiguousarray(columns[key], dtype=STAT_COLUMNS[key][0]) for key in STAT_KEYS}
+        self.row_of_id = {fighter_id: row for row, fighter_id in enumerate(self.ids)}
+        self.row_of = {}
+        for row, fighter_name in enumerate(self.names):
+            self.row_of.setdefault(fighter_name, row)
+
+    @classmethod
+    def from_dict(cls, fighters_dict: Dict[str, Dict]) -> 'FighterTable':
+        """
+        Build from fighter_database_REBALANCED.json
+
+        Either {Fighter_Id: {'name': ..., stats}} (what fighter_db.py writes)
+        or the older {name: stats} layout.
+        """
+        keys = list(fighters_dict.keys())
+        stats = list(fighters_dict.values())
+        keyed_by_id = bool(stats) and all('name' in fighter_stats for fighter_stats in stats)
+        names = [fighter_stats['name'] for fighter_stats in stats] if keyed_by_id else keys
+        columns = {
+            key: np.array([fighter_stats.get(key, default) for fighter_stats in stats], dtype=dtype)
+            for key, (dtype, default) in STAT_COLUMNS.items()
+        }
+        return cls(names, columns, ids=keys if keyed_by_id else None)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __contains__(self, fighter_name) -> bool:
+        return fighter_name in self.row_of
+
+    def __getitem__(self, fighter_name: str) -> Dict:
+        return self.record(self.row_of[fighter_name])
+
+    def row(self, fighter_name: str) -> int:
+        """Row of an exact fighter name (KeyError if unknown; shared names give the most recently active)"""
+        return self.row_of[fighter_name]
+
+    def rows(self, fighter_names: Iterable[str]) -> np.ndarray:
+        """Rows of many exact fighter names"""
+        return np.array([self.row_of[fighter_name] for fighter_name in fighter_names], dtype=np.intp)
+
+    def record(self, row: int) -> Dict:
+        """One fighter as a dict (the format PredictorService and the API return)"""
+        record = {'id': self.ids[row], 'name': self.names[row]}
+        for key in STAT_KEYS:
+            record[key] = self.columns[key][row].item()
+        return record
+
+    def gather(self, rows, keys: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """{stat: values for rows} - one fancy-index per column"""
+        rows = np.asarray(rows, dtype=np.intp)
+        return {key: self.columns[key].take(rows) for key in (keys or STAT_KEYS)}
+
+    def matrix(self, rows, keys: Optional[List[str]] = None) -> np.ndarray:
+        """Stats of many fighters as a float64 array of shape (len(rows), len(keys))"""
+        rows = np.asarray(rows, dtype=np.intp)
+        keys = keys or STAT_KEYS
+        matrix = np.empty((len(rows), len(keys)))
+        for i, key in enumerate(keys):
+            matrix[:, i] = self.columns[key].take(rows)
+        return matrix
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the stat columns"""
+        return sum(column.nbytes for column in self.columns.values())
@@ -0,0 +1,176 @@
+# src/flat_forest.py
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+# Arrays written by FlatForest.save (one .npy each, so they can be memory-mapped)
+ARRAY_NAMES = ['feature', 'threshold', 'left', 'right', 'children', 'value', 'roots', 'feature_importances_']
+
+# Rows scored together per traversal step (keeps the node-index block in cache)
+ROW_CHUNK = 256
+
+
+class FlatForest:
+    """
+    RandomForestClassifier exported ONCE into flat NumPy arrays
+
+    All trees share contiguous feature / threshold / left / right / value
+    arrays. Scoring walks every (tree, row) pair together, one depth level per
+    step, so a single request costs max_depth vectorized steps instead of
+    sklearn's input validation and per-tree Python dispatch.
+    """
+
+    def __init__(self, model, n_threads: int = 1):
+        if not hasattr(model, 'estimators_') or not all(hasattr(tree, 'tree_') for tree in model.estimators_):
+            raise ValueError("FlatForest needs a fitted tree ensemble (e.g. RandomForestClassifier)")
+
+        self.classes_ = model.classes_
+        self.n_features_in_ = model.n_features_in_
+        if hasattr(model, 'feature_names_in_'):
+            self.feature_names_in_ = model.feature_names_in_
+        self.feature_importances_ = np.asarray(model.feature_importances_, dtype=np.float64)
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left == -1
+            node_ids = np.arange(tree.node_count)
+
+            # Leaves point to themselves and always "go left", so extra steps are no-ops
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+
+            # Leaf class probabilities, exactly like DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0] = 1.0
+            values.append(value / normalizer)
+
+            roots.append(offset)
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        self.feature = np.ascontiguousarray(np.concatenate(features), dtype=np.intp)
+        self.threshold = np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64)
+        self.left = np.ascontiguousarray(np.concatenate(lefts), dtype=np.intp)
+        self.right = np.ascontiguousarray(np.concatenate(rights), dtype=np.intp)
+        # Interleaved [left, right] pairs: child = children[2 * node + went_right]
+        self.children = np.ascontiguousarray(np.column_stack([self.left, self.right]).ravel())
+        self.value = np.ascontiguousarray(np.concatenate(values), dtype=np.float64)
+        self.roots = np.array(roots, dtype=np.intp)
+        self.max_depth = max_depth
+        self._start_threads(n_threads)
+
+    def _start_threads(self, n_threads: int):
+        self.n_threads = max(1, n_threads)
+        self._executor: Optional[ThreadPoolExecutor] = (
+            ThreadPoolExecutor(max_workers=self.n_threads) if self.n_threads > 1 else None
+        )
+
+    def close(self):
+        """Shut down the tree threads (later calls score on the calling thread)"""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            # Work already submitted still finishes; idle threads exit
+            executor.shutdown(wait=False)
+
+    def save(self, path: str):
+        """Write the arrays as a directory of .npy files (atomically: temp dir, then rename)"""
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        temp_dir = tempfile.mkdtemp(dir=parent, prefix='.flat-')
+        try:
+            for name in ARRAY_NAMES:
+                np.save(os.path.join(temp_dir, f'{name}.npy'), getattr(self, name))
+            meta = {
+                'classes': self.classes_.tolist(),
+                'n_features_in': int(self.n_features_in_),
+                'feature_names_in': [str(name) for name in getattr(self, 'feature_names_in_', [])],
+                'max_depth': int(self.max_depth)
+            }
+            with open(os.path.join(temp_dir, 'meta.json'), 'w') as f:
+                json.dump(meta, f)
+            os.replace(temp_dir, path)
+        except OSError:
+            # Another worker saved the same snapshot first
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            if not os.path.isdir(path):
+                raise
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = 'r', n_threads: int = 1) -> 'FlatForest':
+        """
+        Load a saved forest without sklearn
+
+        With mmap_mode='r' the arrays are shared between worker processes through the page cache.
+        """
+        forest = cls.__new__(cls)
+        for name in ARRAY_NAMES:
+            setattr(forest, name, np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode))
+        with open(os.path.join(path, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        forest.classes_ = np.array(meta['classes'])
+        forest.n_features_in_ = meta['n_features_in']
+        if meta['feature_names_in']:
+            forest.feature_names_in_ = np.array(meta['feature_names_in'], dtype=object)
+        forest.max_depth = meta['max_depth']
+        forest._start_threads(n_threads)
+        return forest
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def _leaf_sum(self, X: np.ndarray, roots: np.ndarray) -> np.ndarray:
+        """Sum of leaf probabilities over the given trees, shape (n_rows, n_classes)"""
+        n_rows, n_features = X.shape
+        total = np.zeros((n_rows, self.value.shape[1]))
+        flat_x = X.ravel()
+
+        # Rows in cache-sized chunks: (n_trees x chunk) node indices per step
+        for start in range(0, n_rows, ROW_CHUNK):
+            stop = min(start + ROW_CHUNK, n_rows)
+            row_base = (np.arange(start, stop) * n_features)[None, :]
+            nodes = np.repeat(roots[:, None], stop - start, axis=1)
+
+            for _ in range(self.max_depth):
+                x = flat_x.take(row_base + self.feature.take(nodes))
+                go_right = x > self.threshold.take(nodes)
+                nodes = self.children.take(nodes * 2 + go_right)
+
+            total[start:stop] = self.value.take(nodes, axis=0).sum(axis=0)
+        return total
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Class probabilities, same columns and values as the sklearn forest"""
+        # sklearn trees compare float32 inputs against float64 thresholds
+        X = np.ascontiguousarray(np.asarray(X, dtype=np.float32), dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[1]} features, but FlatForest expects {self.n_features_in_}")
+
+        executor = self._executor
+        total = None
+        if executor is not None:
+            chunks = np.array_split(self.roots, self.n_threads)
+            try:
+                total = sum(executor.map(lambda roots: self._leaf_sum(X, roots), chunks))
+            except RuntimeError:
+                # close() raced this call
+                total = None
+        if total is None:
+            total = self._leaf_sum(X, self.roots)
+
+        return total / self.n_trees
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
@@ -0,0 +1,272 @@
+# src/ingest.py
+import os
+import json
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+from src.prediction_cache import file_version
+
+RAW_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'raw_data')
+INGESTED_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'ingested')
+
+# Rows parsed per chunk (memory stays flat however big the raw files get)
+CHUNK_ROWS = 2000
+
+# Bump when parsing changes, so unchanged raw files are re-ingested anyway
+PARSER_VERSION = 1
+
+MANIFEST_NAME = 'manifest.json'
+
+# Per-fighter stat columns in the detailed fight files (<name>_1 / <name>_2)
+LANDED_OF_ATTEMPTED = ['Sig. Str.', 'Total Str.', 'Td', 'Head', 'Body', 'Leg', 'Distance', 'Clinch', 'Ground']
+PERCENTS = ['Sig. Str. %', 'Td %']
+COUNTS = ['KD', 'STR', 'TD', 'SUB', 'Kd', 'Sub. Att', 'Rev.']
+CLOCKS = ['Ctrl']
+
+
+# ---------------------------------------------------------------------------
+# Vectorized parsers (one pandas string op per column, never per row)
+# ---------------------------------------------------------------------------
+
+def _numbers(values: pd.Series) -> pd.Series:
+    return pd.to_numeric(values, errors='coerce').astype(np.float64)
+
+def parse_int(values: pd.Series) -> pd.Series:
+    """'12' -> 12, '' -> <NA>"""
+    return pd.to_numeric(values, errors='coerce').astype('Int64')
+
+def parse_of(values: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """'134 of 383' -> (134, 383)"""
+    parts = values.str.extract(r'^\s*(\d+)\s+of\s+(\d+)\s*$')
+    return parse_int(parts[0]), parse_int(parts[1])
+
+def parse_clock(values: pd.Series) -> pd.Series:
+    """'5:12' -> 312.0 seconds, '--' -> NaN"""
+    parts = values.str.extract(r'^\s*(\d+):(\d{2})\s*$')
+    return _numbers(parts[0]) * 60 + _numbers(parts[1])
+
+def parse_percent(values: pd.Series) -> pd.Series:
+    """'34%' -> 0.34, '---' -> NaN"""
+    return _numbers(values.str.extract(r'^\s*([\d.]+)\s*%\s*$')[0]) / 100
+
+def parse_weight(values: pd.Series) -> pd.Series:
+    """'155 lbs.' -> 155.0"""
+    return _numbers(values.str.extract(r'([\d.]+)\s*lbs')[0])
+
+def parse_height(values: pd.Series) -> pd.Series:
+    """'5\\' 11"' -> 71.0 inches"""
+    parts = values.str.extract(r'^\s*(\d+)\'\s*(\d+)"')
+    return _numbers(parts[0]) * 12 + _numbers(parts[1])
+
+def parse_reach(values: pd.Series) -> pd.Series:
+    """'72.0"' -> 72.0 inches"""
+    return _numbers(values.str.extract(r'^\s*([\d.]+)\s*"')[0])
+
+def parse_date(values: pd.Series) -> pd.Series:
+    """'December 06, 2025' -> 2025-12-06"""
+    return pd.to_datetime(values.str.strip(), format='%B %d, %Y', errors='coerce')
+
+def parse_rounds(values: pd.Series) -> pd.Series:
+    """'5 Rnd (5-5-5-5-5)' -> 5 scheduled rounds, 'No Time Limit' -> <NA>"""
+    return parse_int(values.str.extract(r'^\s*(\d+)\s+Rnd')[0])
+
+def parse_bool(values: pd.Series) -> pd.Series:
+    return values.str.strip().str.lower() == 'true'
+
+
+def _parse_fight_columns(chunk: pd.DataFrame) -> Dict[str, pd.Series]:
+    """Typed columns shared by the detailed fight files"""
+    out = {}
+    for column in chunk.columns:
+        name, _, side = column.rpartition('_')
+        if side in ('1', '2') and name in LANDED_OF_ATTEMPTED:
+            out[f'{name} Landed_{side}'], out[f'{name} Attempted_{side}'] = parse_of(chunk[column])
+        elif side in ('1', '2') and name in PERCENTS:
+            out[column] = parse_percent(chunk[column])
+        elif side in ('1', '2') and name in COUNTS:
+            out[column] = parse_int(chunk[column])
+        elif side in ('1', '2') and name in CLOCKS:
+            out[f'{name}_Seconds_{side}'] = parse_clock(chunk[column])
+        elif column == 'Round':
+            out[column] = parse_int(chunk[column])
+        elif column == 'Fight_Time':
+            out['Fight_Time_Seconds'] = parse_clock(chunk[column])
+        elif column == 'Time Format':
+            out[column] = chunk[column]
+            out['Scheduled_Rounds'] = parse_rounds(chunk[column])
+        elif column == 'Event_Id_x':
+            out['Event_Id'] = chunk[column]
+        elif column == 'Event_Id_y':
+            continue  # duplicate of Event_Id_x from the notebook merge
+        else:
+            out[column] = chunk[column]
+    return out
+
+def _parse_fighters(chunk: pd.DataFrame) -> Dict[str, pd.Series]:
+    full_name = (chunk['First'].str.strip() + ' ' + chunk['Last'].str.strip()).str.strip()
+    return {
+        'Fighter_Id': chunk['Fighter_Id'],
+        'Full Name': full_name,
+        'Nickname': chunk['Nickname'],
+        'Height_In': parse_height(chunk['Ht.']),
+        'Weight_Lbs': parse_weight(chunk['Wt.']),
+        'Reach_In': parse_reach(chunk['Reach']),
+        'Stance': chunk['Stance'],
+        'W': parse_int(chunk['W']),
+        'L': parse_int(chunk['L']),
+        'D': parse_int(chunk['D']),
+        'Belt': parse_bool(chunk['Belt'])
+    }
+
+def _parse_events(chunk: pd.DataFrame) -> Dict[str, pd.Series]:
+    return {
+        'Event_Id': chunk['Event_Id'],
+        'Name': chunk['Name'],
+        'Date': parse_date(chunk['Date']),
+        'Location': chunk['Location']
+    }
+
+# Output table -> (raw file, chunk parser)
+TABLES = {
+    'fights': ('raw_fights_detailed.csv', _parse_fight_columns),
+    'details': ('raw_details.csv', _parse_fight_columns),
+    'fighters': ('raw_fighters.csv', _parse_fighters),
+    'events': ('raw_events.csv', _parse_events)
+}
+
+
+def parse_chunk(table: str, chunk: pd.DataFrame) -> pd.DataFrame:
+    """Raw string chunk -> typed DataFrame (strings keep '' as missing)"""
+    _, parser = TABLES[table]
+    columns = parser(chunk)
+    typed = pd.DataFrame(columns, index=chunk.index)
+    for column, values in columns.items():
+        if values.dtype == object or pd.api.types.is_string_dtype(values.dtype):
+            typed[column] = values.replace('', pd.NA).astype('string')
+    return typed
+
+
+def _schema(frame: pd.DataFrame) -> List[List[str]]:
+    """[[column, dtype], ...] in column order"""
+    return [[column, str(dtype)] for column, dtype in frame.dtypes.items()]
+
+
+def ingest_table(table: str, source_path: str, output_path: str, chunk_rows: int = CHUNK_ROWS) -> Dict:
+    """
+    Stream one raw CSV through parse_chunk into a typed CSV (written to a temp file, then renamed)
+
+    Returns:
+        {'rows': ..., 'schema': [[column, dtype], ...]}
+    """
+    temp_path = f"{output_path}.tmp.{os.getpid()}"
+    rows = 0
+    schema = None
+    try:
+        with open(temp_path, 'w', newline='') as out:
+            reader = pd.read_csv(source_path, dtype=str, keep_default_na=False, chunksize=chunk_rows)
+            for chunk in reader:
+                typed = parse_chunk(table, chunk)
+                if schema is None:
+                    schema = _schema(typed)
+                typed.to_csv(out, header=rows == 0, index=False, date_format='%Y-%m-%d')
+                rows += len(typed)
+        os.replace(temp_path, output_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return {'rows': rows, 'schema': schema or []}
+
+
+def _load_manifest(out_dir: str) -> Dict:
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def _save_manifest(out_dir: str, manifest: Dict):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    temp_path = f"{path}.tmp.{os.getpid()}"
+    with open(temp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def ingest_all(raw_dir: str = RAW_DIR, out_dir: str = INGESTED_DIR, tables: Optional[List[str]] = None,
+               force: bool = False, chunk_rows: int = CHUNK_ROWS) -> Dict[str, str]:
+    """
+    Ingest every raw table whose content changed since the last run
+
+    A table is skipped when its raw file hash and PARSER_VERSION match the
+    manifest and its output still exists, so a nightly refresh only
+    reprocesses what changed.
+
+    Returns:
+        {table: 'ingested' | 'skipped' | 'missing'}
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = _load_manifest(out_dir)
+    status = {}
+
+    for table in (tables or list(TABLES)):
+        source_name, _ = TABLES[table]
+        source_path = os.path.join(raw_dir, source_name)
+        output_path = os.path.join(out_dir, f'{table}.csv')
+        if not os.path.exists(source_path):
+            status[table] = 'missing'
+            continue
+
+        source_hash = file_version(source_path)
+        previous = manifest.get(table, {})
+        if (not force and previous.get('source_hash') == source_hash
+                and previous.get('parser_version') == PARSER_VERSION and os.path.exists(output_path)):
+            status[table] = 'skipped'
+            continue
+
+        result = ingest_table(table, source_path, output_path, chunk_rows)
+        manifest[table] = {
+            'source': source_name,
+            'source_hash': source_hash,
+            'parser_version': PARSER_VERSION,
+            'rows': result['rows'],
+            'schema': result['schema']
+        }
+        _save_manifest(out_dir, manifest)
+        status[table] = 'ingested'
+
+    return status
+
+
+def read_ingested(table: str, out_dir: str = INGESTED_DIR, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Read an ingested table back with the dtypes recorded in the manifest"""
+    schema = dict(_load_manifest(out_dir)[table]['schema'])
+    if columns is not None:
+        schema = {column: schema[column] for column in columns}
+    dates = [column for column, dtype in schema.items() if dtype.startswith('datetime')]
+    dtypes = {column: dtype for column, dtype in schema.items() if column not in dates}
+    return pd.read_csv(os.path.join(out_dir, f'{table}.csv'), usecols=list(schema),
+                       dtype=dtypes, parse_dates=dates)[list(schema)]
+
+
+if __name__ == "__main__":
+    # Run from backend/: python -m src.ingest [--force] [table ...]
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Parse data/raw_data into typed tables under data/ingested")
+    parser.add_argument('tables', nargs='*', help=f"Tables to ingest: {', '.join(TABLES)} (default: all)")
+    parser.add_argument('--raw-dir', default=RAW_DIR)
+    parser.add_argument('--out-dir', default=INGESTED_DIR)
+    parser.add_argument('--force', action='store_true', help="Re-ingest even if the raw files are unchanged")
+    args = parser.parse_args()
+    unknown = set(args.tables) - set(TABLES)
+    if unknown:
+        parser.error(f"unknown tables: {', '.join(sorted(unknown))}")
+
+    start = time.perf_counter()
+    status = ingest_all(args.raw_dir, args.out_dir, tables=args.tables or None, force=args.force)
+    for table, result in status.items():
+        icon = {'ingested': '✅', 'skipped': '⏭️ ', 'missing': '⚠️ '}[result]
+        print(f"{icon} {table}: {result}")
+    print(f"💾 Ingested tables in {os.path.normpath(args.out_dir)} ({time.perf_counter() - start:.2f}s)")
@@ -0,0 +1,228 @@
+# src/matchup_matrix.py
+import os
+import re
+import json
+import logging
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+from src.columnar import load_csv
+from src.fighter_table import FighterTable
+from src.prediction_cache import file_version
+
+logger = logging.getLogger(__name__)
+
+# Bouts at these weights don't say which division a fighter belongs to
+NON_DIVISIONS = {'Catch Weight', 'Open Weight', 'Super Heavyweight'}
+
+# A fighter is active if their last bout is this recent (relative to the newest event in the data)
+ACTIVE_YEARS = 2.0
+
+# Fighter pairs scored per model call (x2: both corner orders)
+CHUNK_PAIRS = 50_000
+
+# Bump when the on-disk layout changes
+FORMAT_VERSION = 1
+
+
+def division_key(weight_class: str) -> str:
+    """'Women's Strawweight' / 'womens-strawweight' -> 'womens-strawweight'"""
+    return re.sub(r'[^a-z0-9]+', '-', weight_class.lower().replace("'", '')).strip('-')
+
+
+def division_rosters(fights_path: str, events_path: str, table: FighterTable,
+                     active_years: Optional[float] = ACTIVE_YEARS) -> Dict[str, List[int]]:
+    """
+    Active fighters per weight class, as FighterTable rows
+
+    A fighter's division is the weight class of their most recent bout at a
+    real division weight (catch weight and open weight bouts are skipped).
+    """
+    fights = load_csv(fights_path, columns=['Event_Id', 'Fighter_1', 'Fighter_2', 'Weight_Class'])
+    events = load_csv(events_path, columns=['Event_Id', 'Date'])
+    dates = pd.to_datetime(fights['Event_Id'].map(events.set_index('Event_Id')['Date']))
+
+    appearances = pd.DataFrame({
+        'name': np.concatenate([fights['Fighter_1'].to_numpy(), fights['Fighter_2'].to_numpy()]),
+        'weight_class': np.tile(fights['Weight_Class'].to_numpy(), 2),
+        'date': np.tile(dates.to_numpy(), 2)
+    })
+    last_fight = appearances.groupby('name')['date'].max()
+    divisional = appearances[~appearances['weight_class'].isin(NON_DIVISIONS)]
+    # Newest first; Fights.csv order breaks same-date ties (it is newest-first too)
+    latest = divisional.sort_values('date', ascending=False, kind='stable').drop_duplicates('name')
+
+    if active_years is not None:
+        cutoff = dates.max() - pd.Timedelta(days=365.25 * active_years)
+        latest = latest[latest['name'].map(last_fight) >= cutoff]
+
+    rosters = {}
+    for weight_class, names in latest.groupby('weight_class', sort=True)['name']:
+        rows = [table.row_of[name] for name in names if name in table.row_of]
+        if len(rows) >= 2:
+            rosters[weight_class] = sorted(rows, key=lambda row: table.names[row])
+    return rosters
+
+
+def build_matrix(predictor, table: FighterTable, rows: List[int], out: np.ndarray,
+                 chunk_pairs: int = CHUNK_PAIRS) -> np.ndarray:
+    """
+    Fill out[i, j] = P(rows[i] beats rows[j]) with chunked, batched model calls
+
+    Like simulation.win_matrix, each pair is scored in both corner orders and
+    averaged, so out[i, j] + out[j, i] == 1 and the diagonal is 0.5.
+    """
+    n = len(rows)
+    rows = np.asarray(rows, dtype=np.intp)
+    first, second = np.triu_indices(n, k=1)
+    out[np.arange(n), np.arange(n)] = 0.5
+    for begin in range(0, len(first), chunk_pairs):
+        i, j = first[begin:begin + chunk_pairs], second[begin:begin + chunk_pairs]
+        probabilities = predictor.predict_proba_rows(
+            table, np.concatenate([rows[i], rows[j]]), np.concatenate([rows[j], rows[i]])
+        )
+        forward = (probabilities[:len(i)] + 1.0 - probabilities[len(i):]) / 2.0
+        out[i, j] = forward
+        out[j, i] = 1.0 - forward
+    return out
+
+
+class MatchupMatrices:
+    """
+    Precomputed P(A beats B) for every pair of active fighters, one float32 matrix per division
+
+    Each division is a memory-mapped .npy (n x n) plus its sorted name index,
+    so a slice or a top-N query reads only the rows it needs.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, 'index.json'), 'r') as f:
+            index = json.load(f)
+        self.versions = index['versions']
+        self.divisions = index['divisions']
+        self._keys = {division_key(weight_class): weight_class for weight_class in self.divisions}
+        self._matrices: Dict[str, np.ndarray] = {}
+        self._row_of = {weight_class: {name: row for row, name in enumerate(entry['names'])}
+                        for weight_class, entry in self.divisions.items()}
+
+    @classmethod
+    def build(cls, predictor, fighter_service, fights_path: str, events_path: str, path: str,
+              versions: Optional[Dict] = None, active_years: Optional[float] = ACTIVE_YEARS) -> 'MatchupMatrices':
+        """Compute every division's matrix into path (temp dir, then rename)"""
+        table = fighter_service.table
+        rosters = division_rosters(fights_path, events_path, table, active_years)
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        temp_dir = tempfile.mkdtemp(dir=parent, prefix='.matrices-')
+        try:
+            divisions = {}
+            for weight_class, rows in rosters.items():
+                file_name = f'{division_key(weight_class)}.npy'
+                out = np.lib.format.open_memmap(os.path.join(temp_dir, file_name), mode='w+',
+                                                dtype=np.float32, shape=(len(rows), len(rows)))
+                build_matrix(predictor, table, rows, out)
+                out.flush()
+                del out
+                divisions[weight_class] = {'file': file_name, 'names': [table.names[row] for row in rows]}
+            with open(os.path.join(temp_dir, 'index.json'), 'w') as f:
+                json.dump({'format_version': FORMAT_VERSION, 'versions': versions or {},
+                           'active_years': active_years, 'divisions': divisions}, f)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            os.replace(temp_dir, path)
+        except OSError:
+            # Another worker built the same matrices first
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            if not os.path.isdir(path):
+                raise
+        return cls(path)
+
+    def weight_class(self, name: str) -> str:
+        """Canonical weight class for 'Lightweight', 'lightweight' or 'womens-strawweight' (KeyError if unknown)"""
+        return self._keys[division_key(name)]
+
+    def matrix(self, weight_class: str) -> np.ndarray:
+        """The division's (n, n) float32 matrix, memory-mapped on first use"""
+        weight_class = self.weight_class(weight_class)
+        if weight_class not in self._matrices:
+            file_name = self.divisions[weight_class]['file']
+            self._matrices[weight_class] = np.load(os.path.join(self.path, file_name), mmap_mode='r')
+        return self._matrices[weight_class]
+
+    def names(self, weight_class: str) -> List[str]:
+        return self.divisions[self.weight_class(weight_class)]['names']
+
+    def row(self, weight_class: str, fighter_name: str) -> int:
+        """Row of a fighter in the division's matrix (KeyError if not active in it)"""
+        return self._row_of[self.weight_class(weight_class)][fighter_name]
+
+    def slice(self, weight_class: str, fighter_names: Optional[List[str]] = None,
+              offset: int = 0, limit: int = 50) -> Tuple[List[str], List[str], np.ndarray]:
+        """
+        Sub-matrix for some fighters (rows) against the whole division (columns)
+
+        Returns:
+            (row names, column names, float32 array of shape (len(rows), n))
+        """
+        names = self.names(weight_class)
+        if fighter_names is None:
+            rows = list(range(offset, min(offset + limit, len(names))))
+        else:
+            rows = [self.row(weight_class, fighter_name) for fighter_name in fighter_names]
+        return [names[row] for row in rows], names, np.asarray(self.matrix(weight_class)[rows])
+
+    def top_opponents(self, weight_class: str, fighter_name: str, top: int = 10,
+                      favorable: bool = True) -> List[Tuple[str, float]]:
+        """Opponents the fighter is most (or least) likely to beat: [(name, P(fighter wins)), ...]"""
+        row = self.row(weight_class, fighter_name)
+        probabilities = np.asarray(self.matrix(weight_class)[row], dtype=np.float64)
+        probabilities[row] = -np.inf if favorable else np.inf
+        order = np.argsort(-probabilities if favorable else probabilities, kind='stable')[:max(top, 0)]
+        order = order[order != row]
+        names = self.names(weight_class)
+        return [(names[i], float(probabilities[i])) for i in order.tolist()]
+
+
+def matrices_path(snapshot_dir: str, model_version: str, db_version: str, fights_path: str,
+                  active_years: Optional[float] = ACTIVE_YEARS) -> str:
+    """Matrices are keyed by model, fighter DB and Fights.csv versions (so they rebuild only when one changes)"""
+    key = f"{model_version}-{db_version}-{file_version(fights_path)}-a{active_years}-v{FORMAT_VERSION}"
+    return os.path.join(snapshot_dir, 'matrices', key)
+
+
+def load_matrices(predictor, fighter_service, fights_path: str, events_path: str, snapshot_dir: str,
+                  active_years: Optional[float] = ACTIVE_YEARS) -> MatchupMatrices:
+    """Open the current matrices, building them first if the model or roster changed"""
+    path = matrices_path(snapshot_dir, predictor.model_version, fighter_service.version, fights_path, active_years)
+    if os.path.isdir(path):
+        return MatchupMatrices(path)
+    logger.info("🔧 Building matchup matrices: %s", path)
+    versions = {'model': predictor.model_version, 'fighter_db': fighter_service.version,
+                'fights': file_version(fights_path)}
+    return MatchupMatrices.build(predictor, fighter_service, fights_path, events_path, path, versions, active_years)
+
+
+if __name__ == "__main__":
+    # Run from backend/: python -m src.matchup_matrix
+    import time
+    from src.feature_store import DATA_DIR
+    from src.predictor import PredictorService
+    from src.snapshots import load_model, load_fighter_service
+
+    backend_dir = os.path.normpath(os.path.join(os.path.dirname(__file__), '..'))
+    snapshot_dir = os.path.join(backend_dir, 'snapshots')
+    model, model_version = load_model(os.path.join(backend_dir, 'models', 'ufc_predictor.joblib'), snapshot_dir)
+    predictor = PredictorService(model, engine='flat', model_version=model_version)
+    fighter_service = load_fighter_service(os.path.join(backend_dir, 'fighter_database_REBALANCED.json'), snapshot_dir)
+
+    start = time.perf_counter()
+    matrices = load_matrices(predictor, fighter_service, os.path.join(DATA_DIR, 'Fights.csv'),
+                             os.path.join(DATA_DIR, 'Events.csv'), snapshot_dir)
+    pairs = sum(len(entry['names']) * (len(entry['names']) - 1) // 2 for entry in matrices.divisions.values())
+    print(f"✅ {len(matrices.divisions)} divisions, {pairs:,} pairs ({time.perf_counter() - start:.2f}s)")
+    for weight_class, entry in matrices.divisions.items():
+        print(f"   {weight_class:24s} {len(entry['names']):4d} fighters")
@@ -0,0 +1,212 @@
+# src/metrics.py
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds (0.1 ms .. 10 s)
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _label_text(names: Sequence[str], values: Tuple) -> str:
+    if not names:
+        return ''
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{escaped}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+class Counter:
+    """Monotonic counter per label set (Prometheus 'counter')"""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1.0):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            items = sorted(self._values.items())
+        lines += [f'{self.name}{_label_text(self.labels, key)} {value:g}' for key, value in items]
+        return lines
+
+
+class Histogram:
+    """Bucketed observations per label set (Prometheus 'histogram', cumulative buckets)"""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last one is +Inf), sum]
+        self._values: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def count(self, *label_values) -> int:
+        entry = self._values.get(label_values)
+        return sum(entry[0]) if entry else 0
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else f'{bound:g}'
+                lines.append(f'{self.name}_bucket{_label_text(self.labels + ("le",), key + (le,))} {cumulative}')
+            lines.append(f'{self.name}_sum{_label_text(self.labels, key)} {total:.9g}')
+            lines.append(f'{self.name}_count{_label_text(self.labels, key)} {cumulative}')
+        return lines
+
+
+class Registry:
+    """Metrics rendered together on /metrics (plus callback values read at scrape time)"""
+
+    def __init__(self):
+        self._metrics: List = []
+        self._callbacks: List[Tuple[str, str, str, Callable[[], float]]] = []
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def callback(self, name: str, documentation: str, read: Callable[[], float], kind: str = 'gauge'):
+        """A value owned elsewhere (e.g. PredictionCache counters), read on every scrape"""
+        self._callbacks.append((name, documentation, kind, read))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines += metric.render()
+        for name, documentation, kind, read in self._callbacks:
+            lines += [f'# HELP {name} {documentation}', f'# TYPE {name} {kind}', f'{name} {read():g}']
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+REQUESTS = REGISTRY.counter('ufc_http_requests_total', 'HTTP requests handled', ('method', 'route', 'status'))
+ERRORS = REGISTRY.counter('ufc_http_errors_total', 'HTTP responses with status >= 400', ('route', 'status'))
+REQUEST_SECONDS = REGISTRY.histogram('ufc_http_request_seconds', 'Time to first response byte', ('method', 'route'))
+STAGE_SECONDS = REGISTRY.histogram('ufc_stage_seconds', 'Time spent per request stage', ('stage',))
+
+# Spans recorded by the request being handled (None outside a request)
+_request_spans: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = \
+    contextvars.ContextVar('request_spans', default=None)
+
+
+class Span:
+    """Times one stage: observed in ufc_stage_seconds{stage=...} and, inside a request, in Server-Timing"""
+    __slots__ = ('stage', 'start')
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        STAGE_SECONDS.observe(elapsed, self.stage)
+        spans = _request_spans.get()
+        if spans is not None:
+            spans.append((self.stage, elapsed))
+        return False
+
+
+def span(stage: str) -> Span:
+    """
+    with span('resolve'):
+        row = fighter_service.get_fighter_row(name)
+    """
+    return Span(stage)
+
+
+def _server_timing(spans: List[Tuple[str, float]], total: float) -> bytes:
+    parts = [f'{stage};dur={seconds * 1000:.3f}' for stage, seconds in spans]
+    parts.append(f'total;dur={total * 1000:.3f}')
+    return ', '.join(parts).encode('latin-1')
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: request counters, latency histogram, Server-Timing header
+
+    Routes are labelled by their template (/matrix/{weight_class}), so label
+    cardinality stays bounded. Per-request span breakdowns go to DEBUG logging.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        spans: List[Tuple[str, float]] = []
+        token = _request_spans.set(spans)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                elapsed = time.perf_counter() - start
+                message.setdefault('headers', [])
+                message['headers'] = list(message['headers']) + [(b'server-timing', _server_timing(spans, elapsed))]
+                route = scope.get('route')
+                REQUEST_SECONDS.observe(elapsed, scope['method'], getattr(route, 'path', 'unmatched'))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_spans.reset(token)
+            route = getattr(scope.get('route'), 'path', 'unmatched')
+            REQUESTS.inc(scope['method'], route, status)
+            if status >= 400:
+                ERRORS.inc(route, status)
+            if logger.isEnabledFor(logging.DEBUG):
+                breakdown = ' '.join(f'{stage}={seconds * 1000:.3f}ms' for stage, seconds in spans)
+                logger.debug('%s %s %d %.3fms %s', scope['method'], scope['path'], status,
+                             (time.perf_counter() - start) * 1000, breakdown)
@@ -0,0 +1,86 @@
+# src/prediction_cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+
+def file_version(path: str) -> str:
+    """Short content hash of an artifact (model file, fighter JSON) used in cache keys"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+class PredictionCache:
+    """
+    Bounded LRU + TTL cache for matchup predictions
+
+    Entries are keyed by (model hash, fighter-DB version, matchup key). After
+    a reload, requests still running on the old versions keep their own
+    entries; those just stop being used and age out through the LRU.
+    """
+
+    def __init__(self, max_size: int = 4096, ttl_seconds: Optional[float] = 3600):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Dict]]' = OrderedDict()
+        # Latest versions stored (reported by stats())
+        self._versions: Optional[Tuple[str, str]] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, versions: Tuple[str, str]) -> Optional[Dict]:
+        """Cached entry for key under these versions, or None (counts a hit or a miss)"""
+        entry_key = (versions, key)
+        with self._lock:
+            item = self._entries.get(entry_key)
+            if item is not None:
+                expires_at, value = item
+                if expires_at >= time.monotonic():
+                    self._entries.move_to_end(entry_key)
+                    self.hits += 1
+                    return value
+                del self._entries[entry_key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Dict, versions: Tuple[str, str]):
+        """Store an entry, evicting the least recently used one when full"""
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else float('inf')
+        entry_key = (versions, key)
+        with self._lock:
+            self._versions = versions
+            self._entries[entry_key] = (expires_at, value)
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'model_version': self._versions[0] if self._versions else None,
+                'fighter_db_version': self._versions[1] if self._versions else None
+            }
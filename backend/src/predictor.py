@@ -1,15 +1,63 @@
 # src/predictor.py - FIXED VERSION
+import logging
+import weakref
 import numpy as np
-import pandas as pd
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
+
+from src.features import (FEATURE_NAMES, compute_features, features_from_diffs,
+                          select_features, stats_matrix)
+from src.fighter_table import FighterTable
+from src.flat_forest import FlatForest
+from src.metrics import span
+from src.prediction_cache import PredictionCache
+
+logger = logging.getLogger(__name__)
 
 class PredictorService:
     """UFC fight prediction service for REBALANCED 7+ feature model"""
     
-    def __init__(self, model):
+    def __init__(self, model, engine: str = 'sklearn', n_threads: int = 1,
+                 cache: Optional[PredictionCache] = None, model_version: str = 'unversioned',
+                 symmetric: bool = False):
+        """
+        Args:
+            model: Fitted REBALANCED model (RandomForestClassifier)
+            engine: 'sklearn' (model.predict_proba) or 'flat' (FlatForest arrays, same results)
+            n_threads: Threads across trees for the 'flat' engine
+            cache: Optional PredictionCache used by predict_matchup
+            model_version: Model file hash, part of every cache key
+            symmetric: Average P(1 beats 2) with 1 - P(2 beats 1) so swapping corners flips the odds
+        """
         self.model = model
-        print("🎯 REBALANCED Predictor Service initialized")
-        print("   • Emphasis: FIGHT STATISTICS > Recent Form > Career")
+        self.engine = engine
+        self.cache = cache
+        self.model_version = model_version
+        self.symmetric = symmetric
+        if engine == 'flat':
+            # A FlatForest loaded from a snapshot is used as-is (no sklearn needed)
+            self._scorer = model if isinstance(model, FlatForest) else FlatForest(model, n_threads=n_threads)
+        elif engine == 'sklearn':
+            self._scorer = model
+        else:
+            raise ValueError(f"Unknown inference engine '{engine}' (use 'sklearn' or 'flat')")
+        logger.info("🎯 REBALANCED Predictor Service initialized (%s engine)", engine)
+    
+    def close(self):
+        """Stop the flat engine's tree threads (the sklearn engine has none)"""
+        close = getattr(self._scorer, 'close', None)
+        if close is not None:
+            close()
+    
+    def retire(self):
+        """
+        Close this predictor once nothing uses it any more
+        
+        Called when a reload swaps it out: requests still scoring with it hold
+        a reference, so the threads stop only after the last one finishes.
+        """
+        close = getattr(self._scorer, 'close', None)
+        if close is not None:
+            weakref.finalize(self, close)
     
     def predict_from_fighters(self, fighter1_stats: Dict, fighter2_stats: Dict) -> Dict:
         """
@@ -22,76 +70,165 @@ class PredictorService:
         Returns:
             Dictionary with prediction results
         """
-        # Calculate ALL feature differences for REBALANCED model
-        features_dict = {}
-        
-        # 1. FIGHT STATISTICS FEATURES (MOST IMPORTANT)
-        # Striking features
-        str_diff = fighter1_stats.get('avg_strikes', 0) - fighter2_stats.get('avg_strikes', 0)
-        features_dict['str_diff'] = str_diff
-        features_dict['str_ratio'] = fighter1_stats.get('avg_strikes', 0.1) / (fighter2_stats.get('avg_strikes', 0.1) + 0.1)
-        features_dict['str_dominance'] = 1 if str_diff > 0 else 0
-        
-        # Enhanced striking (weighted)
-        features_dict['striking_volume_advantage'] = str_diff * 1.5
-        features_dict['striking_dominance'] = features_dict['str_dominance'] * 2
-        
-        # Knockdown features
-        kd_diff = fighter1_stats.get('avg_knockdowns', 0) - fighter2_stats.get('avg_knockdowns', 0)
-        features_dict['kd_diff'] = kd_diff
-        features_dict['kd_ratio'] = fighter1_stats.get('avg_knockdowns', 0.1) / (fighter2_stats.get('avg_knockdowns', 0.1) + 0.1)
-        features_dict['kd_dominance'] = 1 if kd_diff > 0 else 0
-        features_dict['knockdown_power'] = kd_diff * 2  # Double weight
-        
-        # Takedown features
-        td_diff = fighter1_stats.get('avg_takedowns', 0) - fighter2_stats.get('avg_takedowns', 0)
-        features_dict['td_diff'] = td_diff
-        features_dict['td_ratio'] = fighter1_stats.get('avg_takedowns', 0.1) / (fighter2_stats.get('avg_takedowns', 0.1) + 0.1)
-        features_dict['td_dominance'] = 1 if td_diff > 0 else 0
-        
-        # Submission features
-        sub_diff = fighter1_stats.get('avg_submissions', 0) - fighter2_stats.get('avg_submissions', 0)
-        features_dict['sub_diff'] = sub_diff
-        features_dict['sub_ratio'] = fighter1_stats.get('avg_submissions', 0.1) / (fighter2_stats.get('avg_submissions', 0.1) + 0.1)
-        features_dict['sub_dominance'] = 1 if sub_diff > 0 else 0
-        features_dict['submission_threat'] = sub_diff * 1.8  # Higher weight
-        
-        # 2. RECENT FORM FEATURES
-        streak_diff = fighter1_stats.get('win_streak', 0) - fighter2_stats.get('win_streak', 0)
-        features_dict['streak_diff'] = streak_diff
-        
-        # 3. CAREER FEATURES (LEAST IMPORTANT)
-        win_rate_diff = fighter1_stats.get('win_rate', 0.5) - fighter2_stats.get('win_rate', 0.5)
-        features_dict['win_rate_diff'] = win_rate_diff
-        exp_diff = fighter1_stats.get('total_fights', 0) - fighter2_stats.get('total_fights', 0)
-        features_dict['exp_diff'] = exp_diff
-        
-        # Create DataFrame
-        features_df = pd.DataFrame([features_dict])
-        
-        # Ensure all expected columns exist
-        if hasattr(self.model, 'feature_names_in_'):
-            expected_columns = list(self.model.feature_names_in_)
-        else:
-            # Default columns from REBALANCED model
-            expected_columns = [
-                'str_diff', 'str_ratio', 'str_dominance', 'striking_volume_advantage', 'striking_dominance',
-                'kd_diff', 'kd_ratio', 'kd_dominance', 'knockdown_power',
-                'td_diff', 'td_ratio', 'td_dominance',
-                'sub_diff', 'sub_ratio', 'sub_dominance', 'submission_threat',
-                'streak_diff', 'win_rate_diff', 'exp_diff'
-            ]
+        return self.predict_many([(fighter1_stats, fighter2_stats)])[0]
+    
+    def predict_many(self, fighter_pairs: List[Tuple[Dict, Dict]]) -> List[Dict]:
+        """
+        Predict a whole card of fights with ONE predict_proba call
         
-        # Fill missing columns with 0
-        for col in expected_columns:
-            if col not in features_df.columns:
-                features_df[col] = 0
+        Args:
+            fighter_pairs: List of (fighter1_stats, fighter2_stats) tuples
+            
+        Returns:
+            List of prediction result dictionaries, in the same order as fighter_pairs
+        """
+        if not fighter_pairs:
+            return []
         
-        # Reorder columns
-        features_df = features_df[expected_columns]
+        fighter1 = stats_matrix([f1 for f1, _ in fighter_pairs])
+        fighter2 = stats_matrix([f2 for _, f2 in fighter_pairs])
+        return self._predict_stats(fighter1, fighter2)
+    
+    def predict_rows(self, table: FighterTable, rows1, rows2) -> List[Dict]:
+        """
+        predict_many for fighters already resolved to FighterTable rows
         
-        # Predict
-        probability = self.model.predict_proba(features_df)[0, 1]
+        Stat differences for all N fights are column subtractions - no
+        per-fighter dicts are built.
+        """
+        if len(rows1) == 0:
+            return []
+        return self._predict_stats(table.matrix(rows1), table.matrix(rows2))
+    
+    def predict_from_diffs(self, diffs: Dict[str, float]) -> Dict:
+        """Predict from raw stat differences (str_diff, kd_diff, ...) instead of two fighters"""
+        features = features_from_diffs(diffs)
+        probability = self._predict_features(select_features(features, self._expected_columns()))[0]
+        return self._build_result(self._feature_dicts(features)[0], probability)
+    
+    def predict_matchup(self, fighter1_stats: Dict, fighter2_stats: Dict, db_version: str = '') -> Dict:
+        """
+        predict_from_fighters behind the prediction cache
+        
+        Entries are keyed by (fighter ids, model_version, db_version). With a
+        symmetric model, red/blue swapped requests share one entry.
+        """
+        id1, id2 = fighter1_stats.get('id'), fighter2_stats.get('id')
+        if self.cache is None or id1 is None or id2 is None:
+            return self.predict_from_fighters(fighter1_stats, fighter2_stats)
+        return self._cached_matchups([id1], [id2], stats_matrix([fighter1_stats]),
+                                     stats_matrix([fighter2_stats]), db_version)[0]
+    
+    def predict_matchup_rows(self, table: FighterTable, row1: int, row2: int, db_version: str = '') -> Dict:
+        """predict_matchup for FighterTable rows (same cache entries - ids are the table ids, i.e. Fighter_Ids)"""
+        return self.predict_matchups_rows(table, [row1], [row2], db_version)[0]
+    
+    def predict_matchups_rows(self, table: FighterTable, rows1, rows2, db_version: str = '') -> List[Dict]:
+        """predict_matchup_rows for many pairs: cache lookups first, then ONE model call for all the misses"""
+        if len(rows1) == 0:
+            return []
+        if self.cache is None:
+            return self.predict_rows(table, rows1, rows2)
+        return self._cached_matchups([table.ids[row] for row in rows1], [table.ids[row] for row in rows2],
+                                     table.matrix(rows1), table.matrix(rows2), db_version)
+    
+    def _cached_matchups(self, ids1: List[str], ids2: List[str], stats1: np.ndarray, stats2: np.ndarray,
+                         db_version: str) -> List[Dict]:
+        """Matchups through the cache (stats are (n, n_stats) arrays); misses share one model call"""
+        versions = (self.model_version, db_version)
+        keys, swapped, entries = [], [], []
+        for id1, id2 in zip(ids1, ids2):
+            swap = self.symmetric and id2 < id1
+            key = (id2, id1) if swap else (id1, id2)
+            keys.append(key)
+            swapped.append(swap)
+            entries.append(self.cache.get(key, versions))
+        
+        misses = [i for i, entry in enumerate(entries) if entry is None]
+        if misses:
+            flip = np.array([swapped[i] for i in misses])[:, None]
+            first = np.where(flip, stats2[misses], stats1[misses])
+            second = np.where(flip, stats1[misses], stats2[misses])
+            results = self._predict_stats(first, second)
+            if self.symmetric:
+                # Reverse orientation costs no extra model call
+                reverse_features = self._feature_dicts(compute_features(second, first))
+            for j, i in enumerate(misses):
+                entry = {'forward': results[j]}
+                if self.symmetric:
+                    entry['reverse'] = self._build_result(reverse_features[j], 1 - results[j]['probability_fighter1_wins'])
+                self.cache.put(keys[i], entry, versions)
+                entries[i] = entry
+        
+        # Shallow copies: callers add fighter names to the result
+        return [dict(entry['reverse' if swap else 'forward']) for entry, swap in zip(entries, swapped)]
+    
+    def predict_proba_rows(self, table: FighterTable, rows1, rows2) -> np.ndarray:
+        """P(fighter 1 wins) for many FighterTable row pairs as a plain array (no result dicts)"""
+        if len(rows1) == 0:
+            return np.empty(0)
+        with span('features'):
+            fighter1, fighter2 = table.matrix(rows1), table.matrix(rows2)
+            features = compute_features(fighter1, fighter2)
+        return self._probabilities(fighter1, fighter2, features)
+    
+    def _probabilities(self, fighter1: np.ndarray, fighter2: np.ndarray, features: np.ndarray) -> np.ndarray:
+        """P(fighter 1 wins) for (n, n_stats) stat arrays, with ONE model call"""
+        expected_columns = self._expected_columns()
+        if self.symmetric:
+            # Same call also scores every fight with corners swapped
+            swapped = compute_features(fighter2, fighter1)
+            both = self._predict_features(select_features(np.vstack([features, swapped]), expected_columns))
+            n = len(features)
+            return (both[:n] + 1 - both[n:]) / 2
+        return self._predict_features(select_features(features, expected_columns))
+    
+    def _predict_stats(self, fighter1: np.ndarray, fighter2: np.ndarray) -> List[Dict]:
+        """Prediction results for (n, n_stats) stat arrays, with ONE model call"""
+        with span('features'):
+            features = compute_features(fighter1, fighter2)
+        probabilities = self._probabilities(fighter1, fighter2, features)
+        
+        with span('result'):
+            return [
+                self._build_result(features_dict, probability)
+                for features_dict, probability in zip(self._feature_dicts(features), probabilities)
+            ]
+    
+    @staticmethod
+    def _feature_dicts(features: np.ndarray) -> List[Dict]:
+        """Per-fight {feature: value} dicts from a FEATURE_NAMES-ordered array"""
+        return [dict(zip(FEATURE_NAMES, row)) for row in features.tolist()]
+    
+    def _predict_features(self, features: np.ndarray) -> np.ndarray:
+        """P(fighter 1 wins) for each row of a model-ordered feature matrix, with ONE model call"""
+        if self.engine == 'flat':
+            with span('model'):
+                return self._scorer.predict_proba(features)[:, 1]
+        
+        # sklearn wants the column names it was fitted with
+        import pandas as pd
+        with span('dataframe'):
+            frame = pd.DataFrame(features, columns=self._expected_columns())
+        with span('model'):
+            return self.model.predict_proba(frame)[:, 1]
+    
+    def _expected_columns(self) -> List[str]:
+        """Feature columns in the order the REBALANCED model was trained with"""
+        if hasattr(self.model, 'feature_names_in_'):
+            return list(self.model.feature_names_in_)
+        
+        # Default columns from REBALANCED model
+        return FEATURE_NAMES
+    
+    def _build_result(self, features_dict: Dict, probability: float) -> Dict:
+        """Turn one fight's features and model probability into a prediction result"""
+        str_diff = features_dict['str_diff']
+        kd_diff = features_dict['kd_diff']
+        td_diff = features_dict['td_diff']
+        streak_diff = features_dict['streak_diff']
+        win_rate_diff = features_dict['win_rate_diff']
+        exp_diff = features_dict['exp_diff']
         
         # Calculate impact by category
         fight_stat_impact = sum(abs(features_dict.get(col, 0)) for col in 
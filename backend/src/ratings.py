@@ -0,0 +1,239 @@
+# src/ratings.py
+import math
+import numpy as np
+import pandas as pd
+from typing import Dict, Hashable, List, Optional, Tuple
+
+# Glicko-1 (Glickman 1999); every event is one rating period
+INITIAL_RATING = 1500.0
+INITIAL_DEVIATION = 350.0
+MIN_DEVIATION = 30.0
+# Deviation growth per year out of the cage: a settled 50 drifts back to 350 in ~15 years
+DEVIATION_GROWTH = math.sqrt((INITIAL_DEVIATION ** 2 - 50.0 ** 2) / 15)
+
+Q = math.log(10) / 400
+DAYS_PER_YEAR = 365.25
+
+# Result_1 -> score for Fighter_1 (No Contest and unknown results don't move ratings)
+RESULT_SCORES = {'W': 1.0, 'L': 0.0, 'D': 0.5}
+
+
+def _g(deviation: float) -> float:
+    return 1.0 / math.sqrt(1.0 + 3.0 * (Q * deviation) ** 2 / math.pi ** 2)
+
+
+def fight_scores(result_1: pd.Series) -> np.ndarray:
+    """Result_1 column -> Fighter_1 score (1 / 0 / 0.5, NaN when the fight is not rated)"""
+    return pd.Series(result_1).map(RESULT_SCORES).to_numpy(dtype=np.float64)
+
+
+def days_since_epoch(dates) -> np.ndarray:
+    """Dates -> float days since 1970-01-01 (NaN for missing)"""
+    dates = pd.to_datetime(pd.Series(dates)).to_numpy(dtype='datetime64[D]')
+    days = dates.astype(np.int64).astype(np.float64)
+    days[np.isnat(dates)] = np.nan
+    return days
+
+
+class RatingEngine:
+    """
+    Glicko ratings for every fighter, stored as arrays indexed by fighter row
+
+    Fighters get a row the first time they are seen (arrays grow by doubling),
+    so rating a new event costs O(fights on the card) whatever the history
+    length. Deviations grow with time out of the cage, applied lazily at a
+    fighter's next fight (or when asked with a date).
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.keys: List[Hashable] = []
+        self.row_of: Dict[Hashable, int] = {}
+        self.rating = np.full(capacity, INITIAL_RATING)
+        self.deviation = np.full(capacity, INITIAL_DEVIATION)
+        self.last_day = np.full(capacity, np.nan)
+        self.fights = np.zeros(capacity, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key) -> bool:
+        return key in self.row_of
+
+    def _row(self, key: Hashable) -> int:
+        row = self.row_of.get(key)
+        if row is None:
+            row = len(self.keys)
+            if row == len(self.rating):
+                grow = len(self.rating)
+                self.rating = np.concatenate([self.rating, np.full(grow, INITIAL_RATING)])
+                self.deviation = np.concatenate([self.deviation, np.full(grow, INITIAL_DEVIATION)])
+                self.last_day = np.concatenate([self.last_day, np.full(grow, np.nan)])
+                self.fights = np.concatenate([self.fights, np.zeros(grow, dtype=np.int32)])
+            self.keys.append(key)
+            self.row_of[key] = row
+        return row
+
+    def _deviation_on(self, row: int, day: Optional[float]) -> float:
+        """Deviation grown by the time since the fighter's last fight"""
+        deviation = float(self.deviation[row])
+        last_day = self.last_day[row]
+        if day is None or math.isnan(day) or math.isnan(last_day) or day <= last_day:
+            return deviation
+        years = (day - last_day) / DAYS_PER_YEAR
+        return min(math.sqrt(deviation ** 2 + DEVIATION_GROWTH ** 2 * years), INITIAL_DEVIATION)
+
+    def get(self, key: Hashable, day: Optional[float] = None) -> Tuple[float, float]:
+        """(rating, deviation) of one fighter, as of day if given (unknown fighters get the defaults)"""
+        row = self.row_of.get(key)
+        if row is None:
+            return INITIAL_RATING, INITIAL_DEVIATION
+        return float(self.rating[row]), self._deviation_on(row, day)
+
+    def rate_event(self, keys1: List[Hashable], keys2: List[Hashable], scores: np.ndarray,
+                   day: Optional[float] = None) -> np.ndarray:
+        """
+        Apply one event (one Glicko rating period)
+
+        Every bout is scored against the fighters' pre-event ratings, so a
+        fighter with two bouts on the card gets one combined update.
+
+        Args:
+            scores: Fighter_1 score per bout (1 / 0 / 0.5, NaN = not rated)
+
+        Returns:
+            Array of shape (n_bouts, 8): pre rating/deviation of fighter 1 and 2,
+            then post rating/deviation of fighter 1 and 2
+        """
+        rows1 = [self._row(key) for key in keys1]
+        rows2 = [self._row(key) for key in keys2]
+        pre = {row: (float(self.rating[row]), self._deviation_on(row, day)) for row in rows1 + rows2}
+
+        # Sum of q^2 g^2 E (1 - E) and of g (s - E) per fighter, over their bouts
+        information, improvement = {}, {}
+        for row1, row2, score in zip(rows1, rows2, scores):
+            if math.isnan(score) or row1 == row2:
+                continue
+            for row, opponent, s in ((row1, row2, score), (row2, row1, 1.0 - score)):
+                rating, _ = pre[row]
+                opponent_rating, opponent_deviation = pre[opponent]
+                g = _g(opponent_deviation)
+                expected = 1.0 / (1.0 + 10 ** (-g * (rating - opponent_rating) / 400))
+                information[row] = information.get(row, 0.0) + Q * Q * g * g * expected * (1.0 - expected)
+                improvement[row] = improvement.get(row, 0.0) + g * (s - expected)
+
+        # Fighters whose only bout wasn't rated (NC) keep their state untouched
+        for row, (rating, deviation) in pre.items():
+            if row in information:
+                precision = 1.0 / deviation ** 2 + information[row]
+                self.rating[row] = rating + Q / precision * improvement[row]
+                self.deviation[row] = max(math.sqrt(1.0 / precision), MIN_DEVIATION)
+                self.fights[row] += 1
+                if day is not None and not math.isnan(day):
+                    self.last_day[row] = day
+
+        out = np.empty((len(rows1), 8))
+        for i, (row1, row2) in enumerate(zip(rows1, rows2)):
+            out[i] = (*pre[row1], *pre[row2], self.rating[row1], self.deviation[row1],
+                      self.rating[row2], self.deviation[row2])
+        return out
+
+    def rate_fights(self, keys1, keys2, scores, events=None, days=None) -> pd.DataFrame:
+        """
+        Rate a chronological run of fights in one pass (one rating period per event)
+
+        Args:
+            keys1, keys2: Fighter keys per fight (names or Fighter_Ids), oldest fight first
+            scores: Fighter_1 score per fight (see fight_scores)
+            events: Event key per fight; consecutive equal keys form one period
+                    (default: every fight is its own period)
+            days: Day number per fight (see days_since_epoch) for deviation growth
+
+        Returns:
+            pre_rating_1, pre_deviation_1, pre_rating_2, pre_deviation_2 and the
+            post_* columns, one row per fight
+        """
+        keys1, keys2 = list(keys1), list(keys2)
+        scores = np.asarray(scores, dtype=np.float64)
+        n = len(keys1)
+        if events is None:
+            boundaries = np.arange(n)
+        else:
+            events = pd.Series(list(events))
+            boundaries = np.flatnonzero(events.ne(events.shift()).to_numpy())
+        ends = np.append(boundaries[1:], n).astype(int)
+
+        out = np.empty((n, 8))
+        for begin, end in zip(boundaries, ends):
+            day = None if days is None else float(days[begin])
+            out[begin:end] = self.rate_event(keys1[begin:end], keys2[begin:end], scores[begin:end], day)
+        return pd.DataFrame(out, columns=['pre_rating_1', 'pre_deviation_1', 'pre_rating_2', 'pre_deviation_2',
+                                          'post_rating_1', 'post_deviation_1', 'post_rating_2', 'post_deviation_2'])
+
+    def ratings(self) -> Dict[Hashable, Tuple[float, float]]:
+        """{key: (rating, deviation)} after the last rated fight"""
+        rating = self.rating[:len(self.keys)].tolist()
+        deviation = self.deviation[:len(self.keys)].tolist()
+        return {key: (rating[row], deviation[row]) for row, key in enumerate(self.keys)}
+
+    def to_dict(self) -> Dict:
+        """JSON-friendly state, so a later event can be applied without replaying history"""
+        n = len(self.keys)
+        return {
+            'keys': list(self.keys),
+            'rating': self.rating[:n].tolist(),
+            'deviation': self.deviation[:n].tolist(),
+            'last_day': [None if math.isnan(day) else day for day in self.last_day[:n].tolist()],
+            'fights': self.fights[:n].tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> 'RatingEngine':
+        engine = cls(capacity=max(len(state['keys']), 1024))
+        n = len(state['keys'])
+        engine.keys = list(state['keys'])
+        engine.row_of = {key: row for row, key in enumerate(engine.keys)}
+        engine.rating[:n] = state['rating']
+        engine.deviation[:n] = state['deviation']
+        engine.last_day[:n] = [np.nan if day is None else day for day in state['last_day']]
+        engine.fights[:n] = state['fights']
+        return engine
+
+
+def rate_fights_csv(df: pd.DataFrame, dates: Optional[pd.Series] = None,
+                    engine: Optional[RatingEngine] = None) -> Tuple[RatingEngine, pd.DataFrame]:
+    """
+    Rate a Fights.csv frame (newest-first, keyed by fighter name) in chronological order
+
+    Args:
+        dates: Event date per row of df (optional; enables deviation growth)
+        engine: Existing engine to continue from (default: a fresh one)
+
+    Returns:
+        (engine, per-fight ratings aligned with df's rows)
+    """
+    engine = engine or RatingEngine()
+    chronological = slice(None, None, -1)
+    events = df['Event_Id'].to_numpy()[chronological] if 'Event_Id' in df else None
+    days = days_since_epoch(dates.to_numpy()[chronological]) if dates is not None else None
+    rated = engine.rate_fights(df['Fighter_1'].to_numpy()[chronological], df['Fighter_2'].to_numpy()[chronological],
+                               fight_scores(df['Result_1'])[chronological], events, days)
+    return engine, rated.iloc[chronological].set_index(df.index)
+
+
+if __name__ == "__main__":
+    # Run from backend/: python -m src.ratings
+    import os
+    import time
+    from src.columnar import load_csv
+    from src.feature_store import DATA_DIR
+
+    start = time.perf_counter()
+    fights = load_csv(os.path.join(DATA_DIR, 'Fights.csv'), columns=['Event_Id', 'Fighter_1', 'Fighter_2', 'Result_1'])
+    events = load_csv(os.path.join(DATA_DIR, 'Events.csv'), columns=['Event_Id', 'Date'])
+    dates = fights['Event_Id'].map(events.set_index('Event_Id')['Date'])
+    engine, _ = rate_fights_csv(fights, dates)
+    print(f"✅ Rated {len(fights)} fights for {len(engine)} fighters in {time.perf_counter() - start:.3f}s")
+
+    top = sorted(engine.ratings().items(), key=lambda item: -item[1][0])[:10]
+    for name, (rating, deviation) in top:
+        print(f"   {name:28s} {rating:7.1f} ± {deviation:5.1f}")
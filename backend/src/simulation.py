@@ -0,0 +1,136 @@
+# src/simulation.py
+import time
+import numpy as np
+from typing import Dict, List, Optional
+
+from src.fighter_table import FighterTable
+
+# Samples drawn per vectorized chunk (the time budget is checked between chunks)
+CHUNK_SAMPLES = 1 << 18
+
+
+def win_matrix(predictor, table: FighterTable, rows: List[int]) -> np.ndarray:
+    """
+    Pairwise P(row i beats row j) for every pair, from ONE batched model call
+
+    Tournament bouts have no fixed corners, so each pair is scored both ways
+    and averaged: the matrix satisfies P[i, j] + P[j, i] == 1 (0.5 on the diagonal).
+    """
+    n = len(rows)
+    matrix = np.full((n, n), 0.5)
+    if n < 2:
+        return matrix
+    first, second = np.triu_indices(n, k=1)
+    rows = np.asarray(rows, dtype=np.intp)
+    # Forward and swapped orders in the same call
+    probabilities = predictor.predict_proba_rows(
+        table, np.concatenate([rows[first], rows[second]]), np.concatenate([rows[second], rows[first]])
+    )
+    pairs = len(first)
+    forward = (probabilities[:pairs] + 1.0 - probabilities[pairs:]) / 2.0
+    matrix[first, second] = forward
+    matrix[second, first] = 1.0 - forward
+    return matrix
+
+
+def _run(sample_chunk, n_samples: int, time_budget: Optional[float], rng: np.random.Generator, outcomes: int):
+    """Run sample_chunk(size, rng) -> winner-per-sample arrays until n_samples or the time budget is used up"""
+    started = time.perf_counter()
+    done = 0
+    counts = None
+    while done < n_samples:
+        size = min(CHUNK_SAMPLES, n_samples - done)
+        chunk = sample_chunk(size, rng)
+        chunk_counts = np.stack([np.bincount(winners.ravel(), minlength=outcomes) for winners in chunk])
+        counts = chunk_counts if counts is None else counts + chunk_counts
+        done += size
+        if time_budget is not None and time.perf_counter() - started >= time_budget:
+            break
+    return counts, done, time.perf_counter() - started
+
+
+def simulate_bracket(matrix: np.ndarray, n_samples: int = 100_000, time_budget: Optional[float] = None,
+                     seed: Optional[int] = None) -> Dict:
+    """
+    Single-elimination bracket in seed order (1 vs 2, 3 vs 4, ...; winners meet next round)
+
+    Every round of every sample is one vectorized draw: alive[:, 0::2] vs alive[:, 1::2].
+
+    Returns:
+        {'samples', 'seconds', 'champion': P(win the bracket) per entrant,
+         'rounds': P(win round r) per entrant, shape (n_rounds, n)}
+    """
+    n = len(matrix)
+    if n < 2 or n & (n - 1):
+        raise ValueError(f"A bracket needs a power-of-two number of fighters (got {n})")
+    rng = np.random.default_rng(seed)
+
+    def sample_chunk(size, rng):
+        alive = np.broadcast_to(np.arange(n), (size, n))
+        round_winners = []
+        while alive.shape[1] > 1:
+            red, blue = alive[:, 0::2], alive[:, 1::2]
+            alive = np.where(rng.random(red.shape) < matrix[red, blue], red, blue)
+            round_winners.append(alive)
+        return round_winners
+
+    counts, samples, seconds = _run(sample_chunk, n_samples, time_budget, rng, n)
+    rounds = counts / samples
+    return {'samples': samples, 'seconds': seconds, 'champion': rounds[-1], 'rounds': rounds}
+
+
+def simulate_title_defenses(matrix: np.ndarray, n_samples: int = 100_000, time_budget: Optional[float] = None,
+                            seed: Optional[int] = None) -> Dict:
+    """
+    Entrant 0 holds the belt and entrants 1..n-1 challenge for it in order (winner keeps it)
+
+    Returns:
+        {'samples', 'seconds', 'champion': P(holding the belt after the last fight) per entrant,
+         'rounds': P(holding it after each fight), shape (n - 1, n)}
+    """
+    n = len(matrix)
+    if n < 2:
+        raise ValueError("A title picture needs a champion and at least one challenger")
+    rng = np.random.default_rng(seed)
+
+    def sample_chunk(size, rng):
+        holder = np.zeros(size, dtype=np.intp)
+        holders = []
+        for challenger in range(1, n):
+            holder = np.where(rng.random(size) < matrix[holder, challenger], holder, challenger)
+            holders.append(holder)
+        return holders
+
+    counts, samples, seconds = _run(sample_chunk, n_samples, time_budget, rng, n)
+    rounds = counts / samples
+    return {'samples': samples, 'seconds': seconds, 'champion': rounds[-1], 'rounds': rounds}
+
+
+def standard_error(probability: np.ndarray, samples: int) -> np.ndarray:
+    """Monte Carlo standard error of an estimated probability"""
+    return np.sqrt(probability * (1.0 - probability) / max(samples, 1))
+
+
+if __name__ == "__main__":
+    # Run from backend/: python -m src.simulation
+    import os
+    from src.snapshots import load_model, load_fighter_service
+    from src.predictor import PredictorService
+
+    backend_dir = os.path.join(os.path.dirname(__file__), '..')
+    model, _ = load_model(os.path.join(backend_dir, 'models', 'ufc_predictor.joblib'), os.path.join(backend_dir, 'snapshots'))
+    predictor = PredictorService(model, engine='flat')
+    fighter_service = load_fighter_service(os.path.join(backend_dir, 'fighter_database_REBALANCED.json'),
+                                           os.path.join(backend_dir, 'snapshots'))
+
+    names = ['Merab Dvalishvili', 'Petr Yan', 'Sean O\'Malley', 'Umar Nurmagomedov',
+             'Cory Sandhagen', 'Song Yadong', 'Deiveson Figueiredo', 'Aiemann Zahabi']
+    rows = [fighter_service.get_fighter_row(name) for name in names]
+    start = time.perf_counter()
+    matrix = win_matrix(predictor, fighter_service.table, rows)
+    print(f"✅ Win matrix for {len(rows)} fighters in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    result = simulate_bracket(matrix, n_samples=1_000_000, seed=0)
+    print(f"🎲 {result['samples']:,} brackets in {result['seconds']:.2f}s")
+    for i in np.argsort(-result['champion']):
+        print(f"   {names[i]:22s} {result['champion'][i]:6.1%}")
@@ -0,0 +1,92 @@
+# src/snapshots.py
+import os
+import logging
+from typing import Tuple
+
+import numpy as np
+
+from src.features import FEATURE_NAMES
+from src.fighter_service import FighterService
+from src.flat_forest import FlatForest
+from src.prediction_cache import file_version
+
+logger = logging.getLogger(__name__)
+
+
+def _load_joblib_model(model_path: str, mmap_mode=None):
+    """joblib.load the sklearn model (imports sklearn - the slow part of a cold start)"""
+    import warnings
+    import joblib
+    from sklearn.exceptions import InconsistentVersionWarning
+    warnings.filterwarnings("ignore", category=InconsistentVersionWarning)
+    return joblib.load(model_path, mmap_mode=mmap_mode)
+
+
+def load_model(model_path: str, snapshot_dir: str, engine: str = 'flat', mmap: bool = True,
+               n_threads: int = 1) -> Tuple[object, str]:
+    """
+    Load the REBALANCED model, compiling it to a FlatForest snapshot once
+
+    With the 'flat' engine the forest arrays are memory-mapped .npy files, so
+    every uvicorn worker shares one copy through the page cache and never
+    unpickles sklearn. The snapshot is keyed by the model file hash, so a new
+    ufc_predictor.joblib is recompiled automatically. n_threads is the
+    FlatForest's tree-thread count (close() it when the model is retired).
+
+    Returns:
+        (model, model_version)
+    """
+    version = file_version(model_path)
+    mmap_mode = 'r' if mmap else None
+
+    if engine != 'flat':
+        return _load_joblib_model(model_path, mmap_mode=mmap_mode), version
+
+    snapshot_path = os.path.join(snapshot_dir, f"ufc_predictor-{version}.flat")
+    if not os.path.isdir(snapshot_path):
+        logger.info("🔧 Compiling model snapshot: %s", snapshot_path)
+        FlatForest(_load_joblib_model(model_path)).save(snapshot_path)
+    return FlatForest.load(snapshot_path, mmap_mode=mmap_mode, n_threads=n_threads), version
+
+
+def load_fighter_service(json_path: str, snapshot_dir: str) -> FighterService:
+    """
+    Load FighterService from a binary snapshot (roster + name indexes)
+
+    The snapshot is keyed by the JSON content hash and the snapshot layout; a
+    rebuilt fighter_database_REBALANCED.json gets a fresh snapshot on first load.
+    """
+    version = file_version(json_path)
+    snapshot_path = os.path.join(snapshot_dir, f"fighters-{version}-v{FighterService.SNAPSHOT_FORMAT}.pkl")
+    if os.path.exists(snapshot_path):
+        return FighterService.from_snapshot(snapshot_path)
+
+    fighter_service = FighterService(json_path)
+    os.makedirs(snapshot_dir, exist_ok=True)
+    fighter_service.save_snapshot(snapshot_path)
+    return fighter_service
+
+
+def validate_services(predictor, fighter_service: FighterService):
+    """
+    Check a freshly loaded predictor + fighter database before serving them
+
+    Raises ValueError when the model expects features compute_features can't
+    produce, the roster is empty, or a smoke prediction is not a probability.
+    """
+    expected = list(getattr(predictor.model, 'feature_names_in_', FEATURE_NAMES))
+    unknown = [name for name in expected if name not in FEATURE_NAMES]
+    if unknown:
+        raise ValueError(f"Model expects unknown features: {unknown}")
+    n_features = getattr(predictor.model, 'n_features_in_', len(expected))
+    if n_features != len(expected):
+        raise ValueError(f"Model takes {n_features} features but names {len(expected)}")
+
+    table = fighter_service.table
+    if len(table) < 2:
+        raise ValueError(f"Fighter database has {len(table)} fighters")
+
+    probabilities = predictor.predict_proba_rows(table, [0, 1], [1, 0])
+    if probabilities.shape != (2,) or not np.all(np.isfinite(probabilities)) \
+            or not np.all((probabilities >= 0) & (probabilities <= 1)):
+        raise ValueError(f"Smoke prediction returned {probabilities!r}")
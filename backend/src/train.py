@@ -0,0 +1,264 @@
+# src/train.py
+import os
+import json
+import time
+import hashlib
+import platform
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+from src.feature_store import DATA_DIR, FeatureStore
+from src.prediction_cache import file_version
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
+CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', 'snapshots', 'train-cache')
+
+# Tables the training set is built from (their hashes make up the data version)
+DATA_FILES = ['Fights.csv', 'Events.csv', 'Fighters.csv']
+
+# REBALANCED Random Forest from archive/predictor.ipynb (step 3.2)
+BASE_PARAMS = {
+    'n_estimators': 150,        # MORE trees for stability
+    'max_depth': 8,             # SHALLOWER trees (prevent overfitting to career stats)
+    'min_samples_split': 15,    # Require more samples to split
+    'max_features': 0.6,        # Use only 60% of features per tree
+    'min_samples_leaf': 5,      # Prevent over-reliance on any single feature
+    'class_weight': 'balanced'  # Handle any class imbalance
+}
+
+# Hyperparameter search around the notebook settings
+PARAM_GRID = {
+    'max_depth': [6, 8, 12],
+    'min_samples_leaf': [1, 5, 10],
+    'max_features': [0.6, 'sqrt']
+}
+
+# Metric -> True when higher is better
+METRICS = {'accuracy': True, 'log_loss': False, 'brier': False, 'roc_auc': True}
+
+
+def data_version(data_dir: str = DATA_DIR) -> str:
+    """Short hash over the content hashes of DATA_FILES"""
+    digest = hashlib.sha256()
+    for name in DATA_FILES:
+        digest.update(f"{name}:{file_version(os.path.join(data_dir, name))};".encode())
+    return digest.hexdigest()[:12]
+
+
+def load_training_data(data_dir: str = DATA_DIR) -> Tuple[pd.DataFrame, np.ndarray]:
+    """Point-in-time training set (src/feature_store.py) as (features, target)"""
+    training = FeatureStore.from_csv(data_dir).training_set()
+    return training.drop(columns='target'), training['target'].to_numpy()
+
+
+def candidates(grid: Dict[str, List], base_params: Optional[Dict] = None) -> List[Dict]:
+    """Every combination of grid values on top of base_params, in a stable order"""
+    from sklearn.model_selection import ParameterGrid
+    base_params = BASE_PARAMS if base_params is None else base_params
+    return [{**base_params, **params} for params in ParameterGrid(grid)]
+
+
+def features_version(X: np.ndarray, y: np.ndarray, feature_names: Optional[List[str]] = None) -> str:
+    """Short hash of the feature names and the feature matrix + target themselves"""
+    digest = hashlib.sha256(json.dumps(list(feature_names or [])).encode())
+    digest.update(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(y).tobytes())
+    return digest.hexdigest()[:12]
+
+
+def cache_folds(X: np.ndarray, y: np.ndarray, cache_dir: str, n_folds: int = 5, seed: int = 42,
+                feature_names: Optional[List[str]] = None) -> str:
+    """
+    Write the stratified k-fold train/test matrices as .npy files (once per feature matrix)
+
+    Workers memory-map them instead of receiving pickled copies of the feature
+    matrix, and a rerun on the same data skips the split entirely. The cache
+    key hashes X itself, so a feature definition change with the same CSVs
+    never reuses stale folds.
+
+    Returns:
+        Directory holding fold-{i}-{X,y}_{train,test}.npy
+    """
+    fold_dir = os.path.join(cache_dir, f'k{n_folds}-seed{seed}-{features_version(X, y, feature_names)}')
+    if os.path.exists(os.path.join(fold_dir, 'done')):
+        return fold_dir
+
+    from sklearn.model_selection import StratifiedKFold
+    os.makedirs(fold_dir, exist_ok=True)
+    splitter = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=seed)
+    for fold, (train_rows, test_rows) in enumerate(splitter.split(X, y)):
+        for part, rows in (('train', train_rows), ('test', test_rows)):
+            np.save(os.path.join(fold_dir, f'fold-{fold}-X_{part}.npy'), np.ascontiguousarray(X[rows]))
+            np.save(os.path.join(fold_dir, f'fold-{fold}-y_{part}.npy'), y[rows])
+    open(os.path.join(fold_dir, 'done'), 'w').close()
+    return fold_dir
+
+
+def evaluate(y_true: np.ndarray, proba: np.ndarray) -> Dict[str, float]:
+    """METRICS for P(Fighter_1 wins)"""
+    from sklearn.metrics import accuracy_score, brier_score_loss, log_loss, roc_auc_score
+    return {
+        'accuracy': float(accuracy_score(y_true, proba >= 0.5)),
+        'log_loss': float(log_loss(y_true, proba, labels=[0, 1])),
+        'brier': float(brier_score_loss(y_true, proba)),
+        'roc_auc': float(roc_auc_score(y_true, proba)) if len(np.unique(y_true)) == 2 else float('nan')
+    }
+
+
+def _fit_forest(X, y, params: Dict, seed: int, n_jobs: int = 1):
+    from sklearn.ensemble import RandomForestClassifier
+    return RandomForestClassifier(**params, random_state=seed, n_jobs=n_jobs).fit(X, y)
+
+
+def _score_fold(params: Dict, fold_dir: str, fold: int, seed: int) -> Dict[str, float]:
+    """Fit one candidate on one cached fold (runs in a worker process)"""
+    def load(name):
+        return np.load(os.path.join(fold_dir, f'fold-{fold}-{name}.npy'), mmap_mode='r')
+
+    model = _fit_forest(load('X_train'), load('y_train'), params, seed)
+    return evaluate(np.asarray(load('y_test')), model.predict_proba(load('X_test'))[:, 1])
+
+
+def search(fold_dir: str, n_folds: int, param_candidates: List[Dict], seed: int = 42,
+           n_jobs: int = -1, scoring: str = 'log_loss') -> List[Dict]:
+    """
+    Cross-validate every candidate, one (candidate, fold) fit per task across n_jobs processes
+
+    Returns:
+        [{'params', 'mean', 'std'}, ...] best first by scoring
+    """
+    from joblib import Parallel, delayed
+    tasks = [(i, fold) for i in range(len(param_candidates)) for fold in range(n_folds)]
+    scores = Parallel(n_jobs=n_jobs)(
+        delayed(_score_fold)(param_candidates[i], fold_dir, fold, seed) for i, fold in tasks
+    )
+
+    per_candidate = [[] for _ in param_candidates]
+    for (i, _), fold_scores in zip(tasks, scores):
+        per_candidate[i].append(fold_scores)
+
+    results = []
+    for params, folds in zip(param_candidates, per_candidate):
+        results.append({
+            'params': params,
+            'mean': {metric: float(np.mean([f[metric] for f in folds])) for metric in METRICS},
+            'std': {metric: float(np.std([f[metric] for f in folds])) for metric in METRICS}
+        })
+    # Stable sort: ties keep grid order, so the winner is reproducible
+    sign = -1 if METRICS[scoring] else 1
+    results.sort(key=lambda result: sign * result['mean'][scoring])
+    return results
+
+
+def _jsonable(params: Dict) -> Dict:
+    return {key: (value.item() if isinstance(value, np.generic) else value) for key, value in params.items()}
+
+
+def train(data_dir: str = DATA_DIR, models_dir: str = MODELS_DIR, cache_dir: str = CACHE_DIR,
+          grid: Optional[Dict[str, List]] = None, n_folds: int = 5, seed: int = 42, n_jobs: int = -1,
+          scoring: str = 'log_loss', promote: bool = False) -> Dict:
+    """
+    Build features, search hyperparameters with k-fold CV, fit the winner on all fights and save it
+
+    Writes models_dir/ufc_predictor-{run_id}.joblib and a .json metadata sidecar
+    (features, data version, params, CV metrics, timings). run_id hashes the
+    data version and training config, so reruns on unchanged data produce the
+    same artifact name. promote=True also copies them to ufc_predictor.joblib/.json,
+    the files the API serves.
+
+    Returns:
+        The metadata dict written to the sidecar
+    """
+    import joblib
+    import shutil
+    import sklearn
+
+    started = time.perf_counter()
+    if scoring not in METRICS:
+        raise ValueError(f"Unknown scoring {scoring!r} (choose from {', '.join(METRICS)})")
+    grid = PARAM_GRID if grid is None else grid
+    version = data_version(data_dir)
+
+    X, y = load_training_data(data_dir)
+    feature_names = list(X.columns)
+    fold_dir = cache_folds(X.to_numpy(dtype=np.float64), y, os.path.join(cache_dir, version), n_folds, seed,
+                           feature_names)
+    features_seconds = time.perf_counter() - started
+    print(f"✅ {len(X)} fights x {len(feature_names)} features (data {version}), {n_folds} folds cached")
+
+    param_candidates = candidates(grid)
+    search_started = time.perf_counter()
+    results = search(fold_dir, n_folds, param_candidates, seed=seed, n_jobs=n_jobs, scoring=scoring)
+    search_seconds = time.perf_counter() - search_started
+    best = results[0]
+    print(f"🔍 {len(param_candidates)} candidates x {n_folds} folds in {search_seconds:.1f}s - "
+          f"best {scoring} {best['mean'][scoring]:.4f} (accuracy {best['mean']['accuracy']:.4f})")
+
+    fit_started = time.perf_counter()
+    model = _fit_forest(X, y, best['params'], seed, n_jobs=n_jobs)
+    fit_seconds = time.perf_counter() - fit_started
+
+    config = {'data_version': version, 'params': _jsonable(best['params']), 'n_folds': n_folds,
+              'seed': seed, 'scoring': scoring, 'grid': grid, 'features': feature_names,
+              'sklearn': sklearn.__version__}
+    run_id = hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:12]
+
+    os.makedirs(models_dir, exist_ok=True)
+    model_path = os.path.join(models_dir, f'ufc_predictor-{run_id}.joblib')
+    temp_path = f"{model_path}.tmp.{os.getpid()}"
+    joblib.dump(model, temp_path)
+    os.replace(temp_path, model_path)
+
+    metadata = {
+        'run_id': run_id,
+        'model_file': os.path.basename(model_path),
+        'model_version': file_version(model_path),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'estimator': 'RandomForestClassifier',
+        'params': _jsonable(best['params']),
+        'feature_names': feature_names,
+        'data': {'version': version, 'dir': os.path.normpath(data_dir), 'files': DATA_FILES,
+                 'rows': int(len(X)), 'fighter_1_win_rate': float(np.mean(y))},
+        'cv': {'n_folds': n_folds, 'seed': seed, 'scoring': scoring,
+               'mean': best['mean'], 'std': best['std']},
+        'search': [{'params': _jsonable(result['params']), 'mean': result['mean']} for result in results],
+        'timing_seconds': {'features': round(features_seconds, 3), 'search': round(search_seconds, 3),
+                           'fit': round(fit_seconds, 3), 'total': round(time.perf_counter() - started, 3)},
+        'environment': {'python': platform.python_version(), 'sklearn': sklearn.__version__,
+                        'numpy': np.__version__, 'pandas': pd.__version__}
+    }
+    sidecar_path = os.path.join(models_dir, f'ufc_predictor-{run_id}.json')
+    with open(sidecar_path, 'w') as f:
+        json.dump(metadata, f, indent=2)
+    print(f"💾 Saved {os.path.normpath(model_path)} (+ metadata sidecar)")
+
+    if promote:
+        shutil.copyfile(model_path, os.path.join(models_dir, 'ufc_predictor.joblib'))
+        shutil.copyfile(sidecar_path, os.path.join(models_dir, 'ufc_predictor.json'))
+        print("🚀 Promoted to ufc_predictor.joblib")
+    return metadata
+
+
+if __name__ == "__main__":
+    # Run from backend/: python -m src.train [--folds 5] [--jobs -1] [--promote]
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train the REBALANCED model with k-fold CV and a hyperparameter search")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--models-dir', default=MODELS_DIR)
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--jobs', type=int, default=-1, help="Worker processes (-1 = all cores)")
+    parser.add_argument('--scoring', default='log_loss', help=f"Model selection metric: {', '.join(METRICS)}")
+    parser.add_argument('--grid', help="JSON object of parameter lists overriding the default search grid")
+    parser.add_argument('--promote', action='store_true', help="Also copy the result to models/ufc_predictor.joblib")
+    args = parser.parse_args()
+    if args.scoring not in METRICS:
+        parser.error(f"unknown scoring: {args.scoring}")
+
+    train(args.data_dir, args.models_dir, args.cache_dir,
+          grid=json.loads(args.grid) if args.grid else None,
+          n_folds=args.folds, seed=args.seed, n_jobs=args.jobs,
+          scoring=args.scoring, promote=args.promote)
@@ -0,0 +1,95 @@
+# src/workers.py
+import asyncio
+import contextvars
+import functools
+import math
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Callable
+
+from src.metrics import REGISTRY
+
+REJECTED = REGISTRY.counter('ufc_executor_rejected_total', 'Tasks refused because the worker queue was full',
+                            ('executor',))
+TASK_SECONDS = REGISTRY.histogram('ufc_executor_task_seconds', 'Time a task spent running on a worker', ('executor',))
+QUEUE_SECONDS = REGISTRY.histogram('ufc_executor_queue_seconds', 'Time a task waited for a worker', ('executor',))
+
+# Retry-After bounds (seconds)
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 30
+
+
+class Overloaded(Exception):
+    """The worker queue is full - the caller should answer 503 and retry after retry_after seconds"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Server is overloaded, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class BoundedExecutor(Executor):
+    """
+    Thread pool that refuses work instead of queuing it without limit
+
+    At most max_workers tasks run and max_queue wait; submit() raises
+    Overloaded beyond that, with a Retry-After estimate from the recent task
+    time. Tasks run in a copy of the caller's context, so request spans
+    recorded on a worker still reach the request's Server-Timing header.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 64, name: str = 'inference'):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.name = name
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._pending = 0
+        self._lock = threading.Lock()
+        # Moving average of task seconds (for Retry-After)
+        self._average_seconds = 0.0
+
+    @property
+    def pending(self) -> int:
+        """Tasks running or waiting"""
+        return self._pending
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog should have drained"""
+        backlog = self._pending * self._average_seconds / self.max_workers
+        return int(min(max(math.ceil(backlog), MIN_RETRY_AFTER), MAX_RETRY_AFTER))
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                REJECTED.inc(self.name)
+                raise Overloaded(self.retry_after())
+            self._pending += 1
+
+        context = contextvars.copy_context()
+        queued_at = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            QUEUE_SECONDS.observe(started - queued_at, self.name)
+            try:
+                return context.run(fn, *args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                TASK_SECONDS.observe(elapsed, self.name)
+                with self._lock:
+                    self._pending -= 1
+                    self._average_seconds = 0.9 * self._average_seconds + 0.1 * elapsed
+
+        try:
+            return self._executor.submit(task)
+        except RuntimeError:
+            with self._lock:
+                self._pending -= 1
+            raise
+
+    async def run(self, fn: Callable, /, *args, **kwargs):
+        """await fn(*args, **kwargs) on a worker (raises Overloaded immediately when full)"""
+        return await asyncio.wrap_future(self.submit(functools.partial(fn, *args, **kwargs)))
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
@@ -19,19 +19,20 @@ def test_home_endpoint():
     assert "endpoints" in data
 
 def test_predict_endpoint_valid():
-    """Test prediction with valid stats"""
-    response = client.get("/predict?kd=2&strikes=35&takedowns=1")
+    """Test prediction from REBALANCED stat differences"""
+    response = client.get("/predict?str_diff=15&kd_diff=0.5&td_diff=1&sub_diff=0"
+                          "&streak_diff=2&win_rate_diff=0.2&exp_diff=5")
     assert response.status_code == 200
     data = response.json()
-    assert "red_win_probability" in data
-    assert "predicted_winner" in data
+    assert "prediction" in data
     assert "confidence" in data
-    # Probability should be between 0 and 1
-    assert "0%" in data["red_win_probability"] or "100%" in data["red_win_probability"]
+    # Both corners' probabilities are percentages adding up to 100%
+    probabilities = [float(value.rstrip('%')) for value in data["probabilities"].values()]
+    assert len(probabilities) == 2 and abs(sum(probabilities) - 100) < 0.2
 
 def test_predict_endpoint_missing_params():
     """Test prediction with missing parameters"""
-    response = client.get("/predict?kd=2")  # Missing strikes and takedowns
+    response = client.get("/predict?kd_diff=2")  # Missing the other differences
     assert response.status_code == 422  # FastAPI validation error
 
 def test_search_fighters():
@@ -46,4 +47,315 @@ def test_search_fighters():
 def test_search_fighters_short_query():
     """Test search with query too short"""
     response = client.get("/search/a")  # Too short (needs 2 chars)
-    assert response.status_code == 400
\ No newline at end of file
+    assert response.status_code == 400
+
+def test_predict_batch():
+    """Test batch prediction returns per-fight results and per-fight errors"""
+    response = client.post("/predict-batch", json={"fights": [
+        {"red_name": "Merab Dvalishvili", "blue_name": "Petr Yan"},
+        {"red_name": "Nobody Atall", "blue_name": "Petr Yan"},
+        {"red_name": "Alexander Volkanovski", "blue_name": "Diego Lopes"}
+    ]})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 3
+    assert [p["index"] for p in data["predictions"]] == [0, 2]
+    assert data["errors"][0]["index"] == 1
+
+    single = client.get("/predict-fight?red_name=Merab Dvalishvili&blue_name=Petr Yan").json()
+    assert data["predictions"][0]["probabilities"] == single["probabilities"]
+
+def test_predict_fight_with_typo():
+    """Test misspelled names still resolve through fuzzy matching"""
+    response = client.get("/predict-fight?red_name=Volkanowski&blue_name=Diego Lopes")
+    assert response.status_code == 200
+
+    response = client.get("/search/Khabib Nurmagomedev")
+    assert response.json()["fighters"][0]["name"] == "Khabib Nurmagomedov"
+
+def test_cache_stats():
+    """Test repeated predictions are served from the cache"""
+    before = client.get("/cache-stats").json()
+    client.get("/predict-fight?red_name=Islam Makhachev&blue_name=Charles Oliveira")
+    client.get("/predict-fight?red_name=Islam Makhachev&blue_name=Charles Oliveira")
+    after = client.get("/cache-stats").json()
+    assert after["hits"] >= before["hits"] + 1
+    assert after["model_version"] is not None
+
+def test_simulate_bracket():
+    """Test a seeded bracket simulation is reproducible and its probabilities add up"""
+    request = {"fighters": ["Merab Dvalishvili", "Petr Yan", "Sean O'Malley", "Cory Sandhagen"],
+               "samples": 20000, "seed": 7}
+    response = client.post("/simulate", json=request)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["samples"] == 20000 and data["seed"] == 7
+    assert abs(sum(f["win_probability"] for f in data["fighters"]) - 1) < 1e-6
+    assert len(data["fighters"][0]["rounds"]) == 2
+    assert client.post("/simulate", json=request).json()["fighters"] == data["fighters"]
+
+    # Brackets need a power-of-two field; unknown fighters are 404s
+    assert client.post("/simulate", json={"fighters": ["Merab Dvalishvili", "Petr Yan", "Cory Sandhagen"]}).status_code == 400
+    assert client.post("/simulate", json={"fighters": ["Merab Dvalishvili", "Nobody Atall"]}).status_code == 404
+
+def test_matchup_matrix():
+    """Test division matrix slices and top-N opponents"""
+    import api
+    # Built by a background job (startup / after a reload), not by the request
+    api.start_matrices_job().join()
+    response = client.get("/matrix/bantamweight", params={"fighters": "Merab Dvalishvili,Petr Yan"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["weight_class"] == "Bantamweight" and data["rows"] == ["Merab Dvalishvili", "Petr Yan"]
+    assert len(data["win_probability"][0]) == data["fighters"]
+
+    response = client.get("/matrix/Bantamweight/Merab Dvalishvili/opponents", params={"top": 3})
+    assert response.status_code == 200
+    opponents = response.json()["opponents"]
+    assert len(opponents) == 3 and opponents[0]["win_probability"] >= opponents[-1]["win_probability"]
+
+    assert client.get("/matrix/Cruiserweight").status_code == 404
+
+def test_matchup_matrix_is_503_while_building(monkeypatch):
+    """Test a request never builds the matrices itself: it gets a 503 + Retry-After until the job is done"""
+    import api
+    started = []
+    monkeypatch.setattr(api, "matchup_matrices", None)
+    monkeypatch.setattr(api, "start_matrices_job", lambda services=None: started.append(services))
+    response = client.get("/matrix/bantamweight")
+    assert response.status_code == 503 and response.headers["Retry-After"] == str(api.MATRICES_RETRY_AFTER)
+    assert started == [api.get_services()]
+def test_metrics_endpoint():
+    """Test /metrics exposes request counters and per-stage latency, and responses carry Server-Timing"""
+    response = client.get("/predict-fight", params={"red_name": "Merab Dvalishvili", "blue_name": "Petr Yan"})
+    assert response.status_code == 200
+    assert "resolve;dur=" in response.headers["server-timing"]
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'ufc_http_requests_total{method="GET",route="/predict-fight",status="200"}' in response.text
+    assert 'ufc_stage_seconds_count{stage="resolve"}' in response.text
+    assert "ufc_prediction_cache_hits_total" in response.text
+
+def test_predict_fight_concurrent_requests():
+    """Test concurrent /predict-fight requests (micro-batched) match one-at-a-time responses"""
+    import asyncio
+    import httpx
+
+    pairs = [("Merab Dvalishvili", "Petr Yan"), ("Petr Yan", "Merab Dvalishvili"),
+             ("Sean O'Malley", "Merab Dvalishvili"), ("Merab Dvalishvili", "Petr Yan")]
+    expected = [client.get("/predict-fight", params={"red_name": red, "blue_name": blue}).json()
+                for red, blue in pairs]
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            return await asyncio.gather(*(
+                async_client.get("/predict-fight", params={"red_name": red, "blue_name": blue}) for red, blue in pairs
+            ))
+
+    responses = asyncio.run(run())
+    assert [response.status_code for response in responses] == [200] * len(pairs)
+    assert [response.json() for response in responses] == expected
+
+def test_overload_returns_503_and_bounds_latency(monkeypatch):
+    """Test a burst beyond the worker queue is shed with 503 + Retry-After while accepted requests stay fast"""
+    import asyncio
+    import time
+    import httpx
+    import api
+    from src.workers import BoundedExecutor
+
+    # Every search holds a worker for 50 ms; 2 workers + 2 queue slots
+    _, fighter_service = api.get_services()
+    search = fighter_service.search_fighters
+    def slow_search(*args, **kwargs):
+        time.sleep(0.05)
+        return search(*args, **kwargs)
+    monkeypatch.setattr(fighter_service, "search_fighters", slow_search)
+    executor = BoundedExecutor(max_workers=2, max_queue=2, name="overload-test")
+    monkeypatch.setattr(api, "inference", executor)
+
+    async def timed_search(async_client):
+        start = time.perf_counter()
+        response = await async_client.get("/search/jones")
+        return response, time.perf_counter() - start
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            return await asyncio.gather(*(timed_search(async_client) for _ in range(40)))
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        executor.shutdown()
+    served = [elapsed for response, elapsed in results if response.status_code == 200]
+    shed = [response for response, _ in results if response.status_code == 503]
+    assert len(served) + len(shed) == 40
+    assert 4 <= len(served) < 40 and shed
+    assert all(int(response.headers["retry-after"]) >= 1 for response in shed)
+    # Queuing all 40 would take 40 x 50 ms / 2 workers = 1 s for the last one
+    assert max(served) < 0.5
+
+def test_admin_reload(monkeypatch, tmp_path):
+    """Test a changed fighter DB is validated and swapped in while the old version keeps working"""
+    import json
+    import api
+
+    before = client.get("/model-info").json()["versions"]
+    assert client.post("/admin/reload").json()["status"] == "unchanged"
+    old_predictor, old_fighters = api.get_services()
+
+    with open(api.FIGHTER_DB_PATH) as f:
+        fighters = json.load(f)
+    merab = next(fighter_id for fighter_id, stats in fighters.items() if stats["name"] == "Merab Dvalishvili")
+    fighters[merab]["avg_strikes"] += 25
+    rebuilt = tmp_path / "fighters.json"
+    rebuilt.write_text(json.dumps(fighters))
+    monkeypatch.setattr(api, "FIGHTER_DB_PATH", str(rebuilt))
+    monkeypatch.setattr(api, "SNAPSHOT_DIR", str(tmp_path))
+    try:
+        response = client.post("/admin/reload")
+        assert response.status_code == 200 and response.json()["status"] == "reloaded"
+        versions = response.json()["versions"]
+        assert versions["model"] == before["model"] and versions["fighter_db"] != before["fighter_db"]
+        assert client.get("/model-info").json()["versions"] == versions
+
+        # A request that started before the swap finishes on the old pair
+        assert old_predictor.predict_matchup_rows(old_fighters.table, 0, 1, old_fighters.version)
+
+        # A database that fails validation is never served
+        broken = tmp_path / "broken.json"
+        broken.write_text("{}")
+        monkeypatch.setattr(api, "FIGHTER_DB_PATH", str(broken))
+        assert client.post("/admin/reload").status_code == 422
+        assert client.get("/model-info").json()["versions"] == versions
+    finally:
+        monkeypatch.undo()
+        client.post("/admin/reload")
+    assert client.get("/model-info").json()["versions"] == before
+
+def test_reload_of_new_fight_data_swaps_a_copy(monkeypatch):
+    """Test changed CSVs alone (same model + DB) go through validation and a swap, leaving the served roster as is"""
+    import copy
+    import api
+
+    _, served = api.get_services()
+    entities = served.entities
+    rebuilt = copy.copy(entities)
+    monkeypatch.setattr(api, "_load_entities", lambda current=None: rebuilt)
+    try:
+        assert client.post("/admin/reload").json()["status"] == "reloaded"
+        _, fighters = api.get_services()
+        assert fighters is not served and fighters.table is served.table
+        assert fighters.entities is rebuilt and served.entities is entities
+    finally:
+        monkeypatch.undo()
+        client.post("/admin/reload")
+
+def test_fighter_fights():
+    """Test fight history by name (resolved through Fighter_Ids)"""
+    response = client.get("/fighters/Jon Jones/fights", params={"limit": 3})
+    assert response.status_code == 200
+    fighters = response.json()["fighters"]
+    assert len(fighters) == 1 and fighters[0]["name"] == "Jon Jones"
+    fights = fighters[0]["fights"]
+    assert len(fights) == 3 and fighters[0]["total_fights"] >= 3
+    assert fights[0]["date"] >= fights[1]["date"] >= fights[2]["date"]
+
+    # Two different fighters share this name
+    response = client.get("/fighters/bruno silva/fights")
+    assert response.status_code == 200
+    assert len({fighter["fighter_id"] for fighter in response.json()["fighters"]}) == 2
+
+    assert client.get("/fighters/Nobody Atall Xyzzy/fights").status_code == 404
+
+def test_export_fighters():
+    """Test the streamed roster export with filters, as NDJSON and CSV"""
+    import json
+
+    response = client.get("/export/fighters", params={"weight_class": "bantamweight", "min_fights": 10})
+    assert response.status_code == 200 and response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert records and all(record["weight_class"] == "Bantamweight" and record["total_fights"] >= 10 for record in records)
+    assert "Merab Dvalishvili" in [record["name"] for record in records]
+
+    response = client.get("/export/fighters", params={"format": "csv", "min_fights": 10})
+    lines = response.text.splitlines()
+    assert lines[0].startswith("name,fighter_id,weight_class,") and len(lines) > 100
+
+    assert client.get("/export/fighters", params={"format": "xml"}).status_code == 400
+
+def test_export_predictions():
+    """Test predictions for pairs streamed in the body match /predict-batch, as NDJSON and CSV"""
+    import json
+
+    pairs = [("Merab Dvalishvili", "Petr Yan"), ("Petr Yan", "Nobody Atall Xyzzy"), ("Sean O'Malley", "Petr Yan")] * 700
+    body = "".join(json.dumps({"red_name": red, "blue_name": blue}) + "\n" for red, blue in pairs)
+    response = client.post("/export/predictions", content=body)
+    assert response.status_code == 200
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["index"] for record in records] == list(range(len(pairs)))
+    assert "not found" in records[1]["error"] and records[2]["error"] is None
+
+    batch = client.post("/predict-batch", json={"fights": [{"red_name": red, "blue_name": blue} for red, blue in pairs[:3]]}).json()
+    assert batch["predictions"][0]["prediction"] == records[0]["predicted_winner"]
+    assert {**records[3], "index": 0} == records[0]
+
+    response = client.post("/export/predictions", params={"format": "csv"}, headers={"content-type": "text/csv"},
+                           content="red_name,blue_name\nMerab Dvalishvili,Petr Yan\n")
+    lines = response.text.splitlines()
+    assert response.headers["content-type"].startswith("text/csv") and len(lines) == 2
+    assert lines[1].startswith("0,Merab Dvalishvili,Petr Yan,")
+
+def test_export_predictions_stops_retrying_a_full_pool(monkeypatch):
+    """Test a streamed batch the pool keeps refusing becomes error records once the retry deadline passes"""
+    import json
+    import api
+    from src.workers import Overloaded
+
+    class FirstBatchOnly:
+        calls = 0
+
+        async def run(self, fn, *args):
+            self.calls += 1
+            if self.calls > 1:
+                raise Overloaded(retry_after=1)
+            return fn(*args)
+
+    async def two_batches(body, input_format):
+        # The first batch starts the response, the second meets the full pool
+        async for _ in body:
+            pass
+        yield [(0, "Merab Dvalishvili", "Petr Yan", None)]
+        yield [(1, "Petr Yan", "Merab Dvalishvili", None), (2, "", "", "Bad line")]
+
+    monkeypatch.setattr(api, "inference", FirstBatchOnly())
+    monkeypatch.setattr(api, "read_pairs", two_batches)
+    monkeypatch.setattr(api, "EXPORT_RETRY_SECONDS", 0)
+    response = client.post("/export/predictions", content="unused\n")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["index"] for record in records] == [0, 1, 2] and records[0]["error"] is None
+    assert records[1]["error"].startswith("Not scored") and records[1]["probability_red_wins"] is None
+    assert records[2]["error"] == "Bad line"
+
+def test_duplex_response_reports_a_disconnect():
+    """Test a send that fails because the client went away surfaces as ClientDisconnect"""
+    import asyncio
+    from starlette.requests import ClientDisconnect
+    from api import DuplexStreamingResponse
+
+    async def send(message):
+        raise OSError("connection reset")
+
+    async def chunks():
+        yield b"data"
+
+    try:
+        asyncio.run(DuplexStreamingResponse(chunks())({"type": "http"}, None, send))
+    except ClientDisconnect:
+        pass
+    else:
+        raise AssertionError("ClientDisconnect not raised")
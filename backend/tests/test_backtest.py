@@ -0,0 +1,66 @@
+# tests/test_backtest.py
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pandas as pd
+from src.backtest import walk_forward_windows, run_backtest, score, report
+from src.feature_store import FeatureStore
+
+def _make_store(n_events=12, fights_per_event=4):
+    """Monthly events; the busier striker (by fight-night stats) usually wins"""
+    rng = np.random.default_rng(0)
+    fights, events = [], []
+    for event in range(n_events):
+        events.append({'Event_Id': f'e{event}', 'Date': f'2020-{event + 1:02d}-01'})
+        for bout in range(fights_per_event):
+            a, b = rng.choice(8, size=2, replace=False)
+            str1, str2 = rng.integers(0, 100, size=2)
+            fights.append({
+                'Fight_Id': f'f{event}-{bout}', 'Event_Id': f'e{event}',
+                'Fighter_1': f'F{a}', 'Fighter_2': f'F{b}', 'Fighter_Id_1': f'id{a}', 'Fighter_Id_2': f'id{b}',
+                'KD_1': 0, 'KD_2': 0, 'STR_1': str1, 'STR_2': str2, 'TD_1': 0, 'TD_2': 0, 'SUB_1': 0, 'SUB_2': 0,
+                'Result_1': 'W' if str1 >= str2 else 'L', 'Weight_Class': ['Lightweight', 'Welterweight'][bout % 2]
+            })
+    # Newest-first, like Fights.csv
+    return FeatureStore(pd.DataFrame(fights[::-1]), pd.DataFrame(events))
+
+def test_windows_only_train_on_the_past():
+    """Test every window starts on a new date and covers the rest of history once"""
+    dates = pd.Series(pd.to_datetime(['2020-01-01'] * 3 + ['2020-02-01'] * 2 + ['2020-02-15'] * 2 + ['2020-04-01']))
+    event_ids = pd.Series(['e1', 'e1', 'e2', 'e3', 'e3', 'e4', 'e4', 'e5'])
+
+    # e1 and e2 share a date, so they are one window
+    assert walk_forward_windows(dates, '2020-01-01', 'event', event_ids, min_train_fights=0) == [(0, 3), (3, 5), (5, 7), (7, 8)]
+    assert walk_forward_windows(dates, '2020-01-01', 'month', min_train_fights=0) == [(0, 3), (3, 7), (7, 8)]
+    assert walk_forward_windows(dates, '2020-02-10', 'month', min_train_fights=0) == [(7, 8)]
+    assert walk_forward_windows(dates, '2020-01-01', 'quarter', min_train_fights=4) == [(7, 8)]
+
+def test_backtest_scores_every_fight_once():
+    """Test a quarterly walk-forward scores each later fight once and reports per group"""
+    predictions = run_backtest(_make_store(), start='2020-04-01', cadence='quarter',
+                               params={'n_estimators': 5, 'max_depth': 3}, n_jobs=1, min_train_fights=8)
+    assert len(predictions) == 9 * 4 and predictions['Fight_Id'].is_unique
+    assert predictions['Date'].min() == pd.Timestamp('2020-04-01')
+    assert predictions['window'].nunique() == 3
+    assert predictions['proba'].between(0, 1).all()
+
+    results = report(predictions)
+    assert results['overall']['fights'] == 36
+    assert [row['year'] for row in results['per_year']] == [2020]
+    assert {row['weight_class'] for row in results['per_weight_class']} == {'Lightweight', 'Welterweight'}
+    assert len(results['per_event']) == 9
+
+def test_score_metrics():
+    """Test accuracy, log loss, Brier and ECE on hand-checked predictions"""
+    predictions = pd.DataFrame({'proba': [0.8, 0.8, 0.3, 0.6], 'target': [1, 0, 0, 1], 'group': ['a', 'a', 'b', 'b']})
+    overall = score(predictions).iloc[0]
+    assert overall['fights'] == 4 and overall['accuracy'] == 0.75
+    assert np.isclose(overall['brier'], (0.04 + 0.64 + 0.09 + 0.16) / 4)
+    assert np.isclose(overall['log_loss'], -np.mean(np.log([0.8, 0.2, 0.7, 0.6])))
+    # Bins: 0.8 (x2, observed 0.5), 0.3 (observed 0), 0.6 (observed 1)
+    assert np.isclose(overall['ece'], (2 * 0.3 + 0.3 + 0.4) / 4)
+
+    per_group = score(predictions, by='group')
+    assert per_group.loc['a', 'accuracy'] == 0.5 and per_group.loc['b', 'accuracy'] == 1.0
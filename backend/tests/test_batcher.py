@@ -0,0 +1,61 @@
+# tests/test_batcher.py
+import sys
+import os
+import asyncio
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.batcher import MicroBatcher
+
+class Recorder:
+    """process_batch stand-in: squares each item and remembers every batch it was given"""
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, items):
+        self.batches.append(list(items))
+        return [ValueError(f"bad item {item}") if item < 0 else item * item for item in items]
+
+def test_concurrent_requests_share_a_batch():
+    """Test requests arriving within max_wait are scored in one call, split at max_batch_size"""
+    recorder = Recorder()
+    
+    async def run():
+        batcher = MicroBatcher(recorder, max_batch_size=4, max_wait_ms=50)
+        return await asyncio.gather(*(batcher.submit(item, item) for item in range(6)))
+    
+    assert asyncio.run(run()) == [0, 1, 4, 9, 16, 25]
+    assert recorder.batches == [[0, 1, 2, 3], [4, 5]]
+
+def test_identical_requests_are_coalesced():
+    """Test in-flight duplicates share one result and an error only reaches its own callers"""
+    recorder = Recorder()
+    
+    async def run():
+        batcher = MicroBatcher(recorder, max_batch_size=32, max_wait_ms=5)
+        results = await asyncio.gather(batcher.submit('a', 3), batcher.submit('a', 3), batcher.submit('b', -1),
+                                       return_exceptions=True)
+        # Nothing in flight any more: the same key is scored again
+        again = await batcher.submit('a', 3)
+        return results, again
+    
+    results, again = asyncio.run(run())
+    assert results[:2] == [9, 9] and isinstance(results[2], ValueError)
+    assert again == 9
+    assert recorder.batches == [[3, -1], [3]]
+
+def test_shed_batch_is_not_logged_as_an_error(caplog):
+    """Test a full worker pool fails the batch with Overloaded and logs no ERROR traceback"""
+    from concurrent.futures import Executor
+    from src.workers import Overloaded
+    
+    class FullExecutor(Executor):
+        def submit(self, fn, *args, **kwargs):
+            raise Overloaded(retry_after=2)
+    
+    async def run():
+        batcher = MicroBatcher(Recorder(), max_batch_size=4, max_wait_ms=1, executor=FullExecutor())
+        return await asyncio.gather(batcher.submit('a', 1), batcher.submit('b', 2), return_exceptions=True)
+    
+    results = asyncio.run(run())
+    assert all(isinstance(result, Overloaded) and result.retry_after == 2 for result in results)
+    assert not [record for record in caplog.records if record.levelname == 'ERROR']
@@ -0,0 +1,22 @@
+# tests/test_benchmarks.py
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from benchmarks.suite import compare, measure
+
+def test_compare_flags_regressions():
+    """Test benchmarks slower than the baseline by more than the tolerance are flagged"""
+    baseline = {'results': {'a': {'ms': 1.0}, 'b': {'ms': 1.0}, 'c': {'ms': 1.0}, 'gone': {'ms': 1.0}}}
+    current = {'results': {'a': {'ms': 1.1}, 'b': {'ms': 1.5}, 'c': {'ms': 0.5}, 'new': {'ms': 1.0}}}
+    rows = {row['name']: row for row in compare(current, baseline, tolerance=0.25)}
+    assert set(rows) == {'a', 'b', 'c'}
+    assert rows['a']['status'] == 'ok' and rows['b']['status'] == 'regression' and rows['c']['status'] == 'faster'
+    assert rows['b']['ratio'] == 1.5
+
+def test_measure_reports_per_call_time():
+    """Test measure() batches fast calls and reports milliseconds per call"""
+    calls = []
+    result = measure(lambda: calls.append(1), repeat=3, min_sample_seconds=0.001)
+    assert result['samples'] == 3 and result['calls_per_sample'] > 1
+    assert 0 < result['ms'] <= result['median_ms'] <= result['p90_ms']
@@ -0,0 +1,81 @@
+# tests/test_columnar.py
+import sys
+import os
+import json
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pandas as pd
+from unittest import mock
+from src import columnar
+from src.columnar import load_csv, read_table, write_table, write_fighter_db, read_fighter_db, store_path
+
+def test_load_csv_matches_read_csv():
+    """Test the columnar copy reads back exactly like pd.read_csv and follows CSV changes"""
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'Fights.csv')
+        with open(csv_path, 'w') as f:
+            f.write('Fight_Id,Fighter_1,Fighter_2,KD_1,STR_1,Result_1,Method,Referee\n'
+                    'f2,Tom Aaron,Danny Abbadi,1,44.5,W,KO/TKO,Herb Dean\n'
+                    'f1,Danny Abbadi,Nariman Abbasov,0,12.0,L,Decision,\n')
+
+        expected = pd.read_csv(csv_path)
+        pd.testing.assert_frame_equal(load_csv(csv_path), expected)
+        # Second load comes from the columnar copy, a subset keeps the requested order
+        pd.testing.assert_frame_equal(load_csv(csv_path, columns=['STR_1', 'Fighter_1']),
+                                      expected[['STR_1', 'Fighter_1']])
+        assert load_csv(csv_path, columns=['KD_1', 'TD_1'], skip_missing=True).columns.tolist() == ['KD_1']
+
+        # Low-cardinality columns can come back as categoricals (missing -> NaN)
+        referee = load_csv(csv_path, columns=['Referee'], categorical=True)['Referee']
+        assert isinstance(referee.dtype, pd.CategoricalDtype)
+        assert referee[0] == 'Herb Dean' and pd.isna(referee[1])
+
+        # Only the category columns are dictionary-encoded; ids and names are stored as plain values
+        kinds = {entry['name']: entry['kind'] for entry in columnar._read_meta(store_path(csv_path))['columns']}
+        assert kinds['Referee'] == kinds['Method'] == 'category'
+        assert kinds['Fight_Id'] == kinds['Fighter_1'] == 'string'
+
+        # A touched but unchanged CSV is hashed once, then trusted by size + mtime again
+        os.utime(csv_path, ns=(0, 10 ** 18))
+        with mock.patch.object(columnar, 'file_version', wraps=columnar.file_version) as hashed:
+            pd.testing.assert_frame_equal(load_csv(csv_path), expected)
+            pd.testing.assert_frame_equal(load_csv(csv_path), expected)
+        assert hashed.call_count == 1
+
+        # A changed CSV rebuilds the copy
+        with open(csv_path, 'a') as f:
+            f.write('f0,Nariman Abbasov,Tom Aaron,2,30.0,W,KO/TKO,Marc Goddard\n')
+        assert load_csv(csv_path)['Fight_Id'].tolist() == ['f2', 'f1', 'f0']
+
+def test_write_table_round_trip():
+    """Test numeric, boolean and datetime columns survive and only requested columns are read"""
+    frame = pd.DataFrame({
+        'Date': pd.to_datetime(['2025-12-06', '2025-11-22']),
+        'W': np.array([5, 4], dtype=np.int64),
+        'Belt': [False, True],
+        'Reach_In': [np.nan, 72.0]
+    })
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'fighters')
+        write_table(frame, path)
+        pd.testing.assert_frame_equal(read_table(path), frame)
+        assert read_table(path, ['Belt']).columns.tolist() == ['Belt']
+
+def test_fighter_db_round_trip():
+    """Test the columnar fighter database gives the same records as the JSON"""
+    fighters = {
+        'Tom Aaron': {'avg_strikes': 44.5, 'avg_knockdowns': 0.5, 'win_streak': 2, 'total_fights': 4},
+        'Danny Abbadi': {'avg_strikes': 12.25, 'win_rate': 0.25, 'total_fights': 8, 'finish_rate': 0.125}
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, 'fighter_database_REBALANCED.json')
+        with open(json_path, 'w') as f:
+            json.dump(fighters, f)
+        write_fighter_db(json_path, os.path.join(tmp, 'fighter_db'))
+
+        table = read_fighter_db(os.path.join(tmp, 'fighter_db'))
+        assert table.names == ['Tom Aaron', 'Danny Abbadi']
+        assert table['Tom Aaron']['win_streak'] == 2 and table['Tom Aaron']['win_rate'] == 0.5
+        assert table['Danny Abbadi']['avg_strikes'] == 12.25 and table['Danny Abbadi']['finish_rate'] == 0.125
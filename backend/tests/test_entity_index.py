@@ -0,0 +1,77 @@
+# tests/test_entity_index.py
+import sys
+import os
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pandas as pd
+from src.entity_index import EntityIndex, csr, load_entity_index
+from src.feature_store import FeatureStore
+from src.fighter_service import FighterService
+
+def _write_data(data_dir):
+    # Newest-first, like Fights.csv; two different fighters are both called 'Sam Lee',
+    # and f3's ids are swapped relative to its names (as in about a third of Fights.csv)
+    pd.DataFrame([
+        ['f4', 'a', 's2', 'Ann Ray', 'Sam Lee', 'e3', 'W', 'L'],
+        ['f3', 'b', 's1', 'Sam Lee', 'Bo Cole', 'e2', 'W', 'L'],
+        ['f2', 'a', 'b', 'Ann Ray', 'Bo Cole', 'e2', 'L', 'W'],
+        ['f1', 'a', 's1', 'Ann Ray', 'Sam Lee', 'e1', 'W', 'L'],
+    ], columns=['Fight_Id', 'Fighter_Id_1', 'Fighter_Id_2', 'Fighter_1', 'Fighter_2', 'Event_Id',
+                'Result_1', 'Result_2']).assign(
+        Weight_Class='Lightweight', Method='U-DEC', Round=3, Fight_Time='5:00',
+        KD_1=0, KD_2=0, STR_1=40, STR_2=30, TD_1=1, TD_2=0, SUB_1=0, SUB_2=0
+    ).to_csv(os.path.join(data_dir, 'Fights.csv'), index=False)
+    pd.DataFrame({'Event_Id': ['e3', 'e2', 'e1'], 'Date': ['2024-01-01', '2023-01-01', '2022-01-01']}).to_csv(
+        os.path.join(data_dir, 'Events.csv'), index=False)
+    pd.DataFrame({'Full Name': ['Ann Ray', 'Bo Cole', 'Sam Lee', 'Sam Lee'], 'Fighter_Id': ['a', 'b', 's1', 's2'],
+                  'Nickname': ['Ace', 'Bolt', 'Old', 'New']}).to_csv(os.path.join(data_dir, 'Fighters.csv'), index=False)
+    pd.DataFrame({'Fighter_Id': ['s2', 'a'], 'Full Name': ['Sam Lee', 'Ann Ray'], 'Weight_Class': ['Lightweight'] * 2}).to_csv(
+        os.path.join(data_dir, 'Fighters Stats.csv'), index=False)
+
+def test_csr_slices():
+    """Test CSR grouping: every owner's slice holds its items, ordered, and -1 owners are dropped"""
+    owners = np.array([2, 0, 2, -1, 1, 0])
+    offsets, items = csr(owners, 4, np.array([5, 4, 3, 2, 1, 0]))
+    assert offsets.tolist() == [0, 2, 3, 5, 5]
+    assert [items[offsets[k]:offsets[k + 1]].tolist() for k in range(4)] == [[5, 1], [4], [2, 0], []]
+
+def test_entity_index():
+    """Test fighter/event slices match full-table filters, duplicate names stay apart and the snapshot round-trips"""
+    with tempfile.TemporaryDirectory() as tmp:
+        _write_data(tmp)
+        index = load_entity_index(tmp, os.path.join(tmp, 'snapshots'))
+        
+        # Oldest first; f3's swapped ids still land on the right fighters
+        assert [index.fight_ids[row] for row in index.fights_of('a')] == ['f1', 'f2', 'f4']
+        assert [index.fight_ids[row] for row in index.fights_of('s1')] == ['f1', 'f3']
+        assert index.opponents_of('b') == ['a', 's1']
+        assert [index.fight_ids[row] for row in index.bouts_at('e2')] == ['f3', 'f2']
+        
+        # Most recently active 'Sam Lee' first
+        assert index.ids_for_name(' sam  LEE') == ['s2', 's1']
+        record = index.fight_records('s1', limit=1)[0]
+        assert record['fight_id'] == 'f3' and record['result'] == 'W' and record['opponent_id'] == 'b'
+        assert record['date'] == '2023-01-01'
+        assert index.profile('s2')['Nickname'] == 'New' and index.profile('s2')['Weight_Class'] == 'Lightweight'
+        assert 'Weight_Class' not in index.profile('s1')
+        
+        # Second load comes from the memory-mapped snapshot
+        reloaded = load_entity_index(tmp, os.path.join(tmp, 'snapshots'))
+        assert isinstance(reloaded.fighter_fights, np.memmap)
+        for fighter_id in index.fighter_ids:
+            assert reloaded.fights_of(fighter_id).tolist() == index.fights_of(fighter_id).tolist()
+
+def test_fighter_service_resolves_through_ids():
+    """Test a Fighter_Id-keyed roster: namesakes keep their own rows, the name resolves to the most recent one"""
+    with tempfile.TemporaryDirectory() as tmp:
+        _write_data(tmp)
+        service = FighterService(fighters_dict=FeatureStore.from_csv(tmp).snapshot(key='Fighter_Id'))
+        assert service.fighter_ids('Sam Lee') == []
+        service.attach_entities(EntityIndex.build(tmp))
+    assert service.fighter_ids('sam lee') == ['s2', 's1']
+    assert service.row_of_id('s2') == service.exact_row('Sam Lee') != service.row_of_id('s1')
+    assert service.get_fighter('Sam Lee')['total_fights'] == 1 and service.get_fighter('s1')['total_fights'] == 2
+    assert service.get_fighter('s1')['id'] == 's1'
+    assert service.get_fighter_row('bo') == service.row_of_id('b')
@@ -0,0 +1,71 @@
+# tests/test_export.py
+import sys
+import os
+import asyncio
+import csv
+import io
+import json
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+from src.export import MAX_LINE_BYTES, PREDICTION_COLUMNS, RecordEncoder, fighter_records, read_pairs, score_pairs
+from src.fighter_service import FighterService
+
+class StrikesPredictor:
+    """Stand-in predictor: P(fighter 1 wins) grows with the strike difference"""
+    def predict_proba_rows(self, table, rows1, rows2):
+        strikes = table.columns['avg_strikes']
+        return 1.0 / (1.0 + np.exp(-(strikes[rows1] - strikes[rows2]) / 10.0))
+
+    def calculate_confidence(self, probability):
+        return 'High' if max(probability, 1 - probability) > 0.75 else 'Low'
+
+def _service():
+    return FighterService(fighters_dict={name: {'avg_strikes': strikes, 'total_fights': fights} for name, strikes, fights in
+                                         [('Ann Ray', 50, 12), ('Bo Cole', 30, 3), ('Sam Lee', 40, 8)]})
+
+def _collect(chunks, batch_size=2):
+    async def body():
+        for chunk in chunks:
+            yield chunk
+    
+    async def run():
+        return [batch async for batch in read_pairs(body(), 'csv' if chunks[0].startswith(b'red') else 'ndjson',
+                                                    batch_size=batch_size)]
+    return asyncio.run(run())
+
+def test_read_pairs_across_chunk_boundaries():
+    """Test lines split across body chunks, bad lines, over-long lines and the CSV header"""
+    batches = _collect([b'{"red_name": "Ann Ray", "blue_na', b'me": "Bo Cole"}\nnot json\n',
+                        b'x' * (MAX_LINE_BYTES + 1), b'yyy\n{"red_name": "Sam Lee", "blue_name": "Ann Ray"}'])
+    assert [len(batch) for batch in batches] == [2, 2]
+    pairs = [pair for batch in batches for pair in batch]
+    assert [index for index, _, _, _ in pairs] == [0, 1, 2, 3]
+    assert pairs[0] == (0, 'Ann Ray', 'Bo Cole', None) and pairs[3] == (3, 'Sam Lee', 'Ann Ray', None)
+    assert pairs[1][3].startswith('Invalid JSON') and 'longer than' in pairs[2][3]
+    
+    batches = _collect([b'red_name,blue_name\n"Lee, Sam",Bo Cole\nAnn Ray\n'], batch_size=10)
+    assert batches == [[(0, 'Lee, Sam', 'Bo Cole', None), (1, '', '', 'Expected red_name,blue_name')]]
+
+def test_score_pairs_and_encoding():
+    """Test scored records (one model call), per-pair errors and NDJSON/CSV output"""
+    service = _service()
+    records = score_pairs(StrikesPredictor(), service, [(0, 'ann ray', 'Bo Cole', None), (1, 'Nobody', 'Bo Cole', None),
+                                                        (2, '', '', 'Invalid JSON')])
+    assert list(records[0]) == PREDICTION_COLUMNS
+    assert records[0]['red_fighter'] == 'Ann Ray' and records[0]['predicted_winner'] == 'Ann Ray'
+    assert records[0]['probability_red_wins'] + records[0]['probability_blue_wins'] == 1.0
+    assert 'not found' in records[1]['error'] and records[1]['probability_red_wins'] is None
+    assert records[2]['error'] == 'Invalid JSON'
+    
+    ndjson = RecordEncoder('ndjson', PREDICTION_COLUMNS)
+    assert [json.loads(line) for line in ndjson.encode(records).decode().splitlines()] == records
+    encoder = RecordEncoder('csv', PREDICTION_COLUMNS)
+    rows = list(csv.DictReader(io.StringIO((encoder.header() + encoder.encode(records)).decode())))
+    assert rows[0]['red_fighter'] == 'Ann Ray' and rows[1]['probability_red_wins'] == ''
+
+def test_fighter_records_filters():
+    """Test min_fights filtering and chunked roster records"""
+    records = [record for chunk in fighter_records(_service(), min_fights=5) for record in chunk]
+    assert [record['name'] for record in records] == ['Ann Ray', 'Sam Lee']
+    assert records[0]['total_fights'] == 12 and records[0]['fighter_id'] is None
@@ -0,0 +1,95 @@
+# tests/test_feature_store.py
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pandas as pd
+from src.feature_store import FeatureStore
+from src.fighter_service import FighterService
+
+def _fight(fight_id, event_id, f1, f2, str1, str2, result, swap_ids=False):
+    ids = (f2.lower(), f1.lower()) if swap_ids else (f1.lower(), f2.lower())
+    return {
+        'Fight_Id': fight_id, 'Event_Id': event_id,
+        'Fighter_1': f1, 'Fighter_2': f2, 'Fighter_Id_1': ids[0], 'Fighter_Id_2': ids[1],
+        'KD_1': 0, 'KD_2': 0, 'STR_1': str1, 'STR_2': str2,
+        'TD_1': 0, 'TD_2': 0, 'SUB_1': 0, 'SUB_2': 0,
+        'Result_1': result, 'Weight_Class': 'Lightweight'
+    }
+
+def _make_store():
+    # Newest-first, like Fights.csv; e1 is a tournament night (A fights twice)
+    fights = pd.DataFrame([
+        _fight('f4', 'e3', 'A', 'C', 30, 10, 'W'),
+        _fight('f3', 'e2', 'B', 'A', 50, 20, 'W', swap_ids=True),
+        _fight('f2', 'e1', 'A', 'C', 40, 0, 'W'),
+        _fight('f1', 'e1', 'A', 'B', 10, 20, 'L'),
+    ])
+    events = pd.DataFrame({'Event_Id': ['e1', 'e2', 'e3'],
+                           'Date': ['2020-01-01', '2020-06-01', '2021-01-01']})
+    fighters = pd.DataFrame({'Fighter_Id': ['a', 'b', 'c'], 'Full Name': ['A', 'B', 'C']})
+    return FeatureStore(fights, events, fighters)
+
+def test_pre_fight_stats_never_see_the_future():
+    """Test each fight only sees earlier events, including same-night bouts"""
+    frame = _make_store().training_frame().set_index('Fight_Id')
+    
+    # Both bouts on A's debut night see no history at all
+    assert frame.loc['f1', 'f1_total_fights'] == 0
+    assert frame.loc['f2', 'f1_total_fights'] == 0
+    assert frame.loc['f2', 'f1_win_rate'] == 0.5
+    
+    # Event 2: A has 1 win in 2 fights, averaging (10 + 40) / 2 strikes
+    assert frame.loc['f3', 'f2_total_fights'] == 2
+    assert frame.loc['f3', 'f2_win_rate'] == 0.5
+    assert frame.loc['f3', 'f2_avg_strikes'] == 25
+    
+    # Event 3: the last 3 fights were L, W, L (chronological)
+    assert frame.loc['f4', 'f1_win_streak'] == 1
+    assert list(frame.index) == ['f1', 'f2', 'f3', 'f4']
+
+def test_snapshot_serves_same_stats():
+    """Test serving snapshot matches the store and loads into FighterService"""
+    store = _make_store()
+    snapshot = store.snapshot()
+    assert snapshot['A']['total_fights'] == 4
+    assert snapshot['A']['win_rate'] == 0.5
+    assert store.snapshot(as_of='2020-06-01')['A']['total_fights'] == 2
+    assert store.stats_before('a', '2021-01-01') == store.snapshot(as_of='2021-01-01')['A']
+    
+    service = FighterService(fighters_dict=snapshot)
+    assert service.get_fighter('a')['avg_strikes'] == snapshot['A']['avg_strikes']
+    
+    training = store.training_set()
+    assert list(training.columns[:2]) == ['target', 'kd_diff']
+    assert len(training) == 4
+
+def test_pre_fight_ratings():
+    """Test ratings start at the default and only move after the event is over"""
+    frame = _make_store().training_frame().set_index('Fight_Id')
+    
+    # Debut night: both of A's bouts are rated from the same pre-event 1500
+    assert frame.loc['f1', 'f1_rating'] == frame.loc['f2', 'f1_rating'] == 1500.0
+    assert frame.loc['f1', 'f1_rating_deviation'] == 350.0
+    # B beat A and C lost to A on night 1, so B goes into event 2 above 1500 and C into event 3 below it
+    assert frame.loc['f3', 'f1_rating'] > 1500.0
+    assert frame.loc['f4', 'f2_rating'] < 1500.0
+    
+    service = FighterService(fighters_dict=_make_store().snapshot())
+    assert service.get_rating('B')['rating'] == _make_store().snapshot()['B']['rating']
+    assert service.top_rated(1)[0]['name'] in ('A', 'B')
+
+def test_snapshot_name_collisions_are_logged(caplog):
+    """Test two Fighter_Ids sharing a name are both kept by id and the name-keyed collision is logged"""
+    fights = pd.DataFrame([
+        _fight('f2', 'e2', 'A', 'B', 30, 10, 'W'),
+        {**_fight('f1', 'e1', 'A', 'C', 10, 20, 'L'), 'Fighter_Id_1': 'a2'},
+    ])
+    events = pd.DataFrame({'Event_Id': ['e1', 'e2'], 'Date': ['2020-01-01', '2020-06-01']})
+    store = FeatureStore(fights, events)
+    by_id = store.snapshot(key='Fighter_Id')
+    assert by_id['a']['win_rate'] == 1.0 and by_id['a2']['win_rate'] == 0.0
+    with caplog.at_level('WARNING'):
+        by_name = store.snapshot()
+    assert {'name': 'A', **by_name['A']} == by_id['a']
+    assert "1 fighter(s) left out" in caplog.text
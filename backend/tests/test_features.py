@@ -0,0 +1,43 @@
+# tests/test_features.py
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.features import (FEATURE_NAMES, build_features, compute_features,
+                          features_from_diffs, stats_matrix)
+
+def test_compute_features_vectorized():
+    """Test the array path matches one-fight-at-a-time dicts, in the requested column order"""
+    fighters = [
+        {'avg_strikes': 80, 'avg_knockdowns': 0.5, 'win_streak': 3, 'win_rate': 0.8, 'total_fights': 20},
+        {'avg_strikes': 20, 'avg_takedowns': 2.0, 'win_rate': 0.4, 'total_fights': 5},
+        {'avg_strikes': 50, 'avg_submissions': 1.2}
+    ]
+    fighter1 = stats_matrix(fighters)
+    fighter2 = stats_matrix(fighters[::-1])
+    
+    features = compute_features(fighter1, fighter2)
+    assert features.shape == (3, len(FEATURE_NAMES))
+    for row, (f1, f2) in enumerate(zip(fighters, fighters[::-1])):
+        assert dict(zip(FEATURE_NAMES, features[row])) == build_features(f1, f2)
+    
+    # Model column order (e.g. model.feature_names_in_), unknown features are 0
+    ordered = compute_features(fighter1, fighter2, ['exp_diff', 'str_ratio', 'rating_diff'])
+    assert ordered[0].tolist() == [20.0, 80 / 50.1, 0.0]
+
+def test_feature_definitions():
+    """Test ratios use the training formula and missing stats one set of defaults"""
+    features = build_features({'avg_strikes': 30}, {})
+    assert features['str_ratio'] == 30 / 0.1
+    assert features['kd_ratio'] == 0.0
+    assert features['win_rate_diff'] == 0.0
+    assert features['str_dominance'] == 1.0
+    assert features['striking_dominance'] == 2.0
+    assert features['striking_volume_advantage'] == 45.0
+    
+    # Raw diffs only: weighted features are derived, ratios are unknown
+    diffs = dict(zip(FEATURE_NAMES, features_from_diffs({'kd_diff': 1.0, 'sub_diff': -1.0})[0]))
+    assert diffs['knockdown_power'] == 2.0
+    assert diffs['kd_dominance'] == 1.0
+    assert diffs['submission_threat'] == -1.8
+    assert diffs['kd_ratio'] == 0.0
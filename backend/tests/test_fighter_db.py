@@ -0,0 +1,122 @@
+# tests/test_fighter_db.py
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import json
+import pandas as pd
+from fighter_db import (build_fighter_db_for_REBALANCED_model, update_fighter_db_incremental,
+                        check_consistency)
+from src.feature_store import FeatureStore
+
+def _write_fights(rows, data_dir):
+    """Write a tiny Fights.csv (+ Events.csv, Fighters.csv) and return the Fights.csv path"""
+    columns = ['Fighter_1', 'Fighter_2', 'KD_1', 'KD_2', 'STR_1', 'STR_2',
+               'TD_1', 'TD_2', 'SUB_1', 'SUB_2', 'Result_1', 'Event_Id']
+    fights = pd.DataFrame(rows, columns=columns)
+    fights.insert(0, 'Fight_Id', [f'f{len(rows) - i}' for i in range(len(rows))])
+    fights['Fighter_Id_1'] = fights['Fighter_1'].str.lower()
+    fights['Fighter_Id_2'] = fights['Fighter_2'].str.lower()
+    fights['Weight_Class'] = 'Lightweight'
+    path = os.path.join(data_dir, 'Fights.csv')
+    fights.to_csv(path, index=False)
+
+    # Event eN happens N months into 2020
+    events = sorted(fights['Event_Id'].unique())
+    pd.DataFrame({'Event_Id': events, 'Date': [f'2020-{int(event[1:]):02d}-01' for event in events]}).to_csv(
+        os.path.join(data_dir, 'Events.csv'), index=False)
+    names = sorted(set(fights['Fighter_1']) | set(fights['Fighter_2']))
+    pd.DataFrame({'Fighter_Id': [name.lower() for name in names], 'Full Name': names}).to_csv(
+        os.path.join(data_dir, 'Fighters.csv'), index=False)
+    return path
+
+def test_build_fighter_db():
+    """Test career, recent and finish stats from a tiny fight history"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _write_fights([
+            ['A', 'B', 1, 0, 50, 20, 2, 0, 0, 1, 'W', 'e4'],
+            ['C', 'A', 0, 0, 30, 40, 0, 1, 1, 0, 'L', 'e3'],
+            ['A', 'C', 0, 1, 10, 60, 0, 0, 0, 0, 'NC', 'e2'],
+            ['B', 'A', 0, 0, 25, 35, 1, 3, 0, 2, 'W', 'e1'],
+        ], tmp)
+        db = build_fighter_db_for_REBALANCED_model(path)
+
+        # Same records the training set's FeatureStore serves
+        assert db == FeatureStore.from_csv(tmp).snapshot(key='Fighter_Id')
+
+    # Keyed by Fighter_Id, most recently active fighters first
+    assert list(db.keys()) == ['a', 'b', 'c']
+
+    a = db['a']
+    assert a['name'] == 'A'
+    assert a['total_fights'] == 4
+    assert a['avg_strikes'] == (50 + 40 + 10 + 35) / 4
+    assert a['win_rate'] == 2 / 4
+    # Streak counts wins in the 3 most recent bouts: W, W, D
+    assert a['win_streak'] == 2
+    assert a['recent_avg_knockdowns'] == 1 / 4
+    # Fights with a KD (1) plus fights with a submission (1)
+    assert a['finish_rate'] == 2 / 4
+
+    assert db['c']['win_rate'] == 0.0
+    assert db['b']['win_streak'] == 1
+
+def test_incremental_update_matches_full_rebuild():
+    """Test new events only touch their fighters, an unchanged CSV is skipped, and the result equals a full rebuild"""
+    old_fights = [
+        ['A', 'B', 1, 0, 50, 20, 2, 0, 0, 1, 'W', 'e2'],
+        ['C', 'A', 0, 0, 30, 40, 0, 1, 1, 0, 'L', 'e2'],
+        ['A', 'C', 0, 1, 10, 60, 0, 0, 0, 0, 'D', 'e1'],
+        ['B', 'A', 0, 0, 25, 35, 1, 3, 0, 2, 'W', 'e1'],
+        ['A', 'B', 1, 1, 11, 12, 0, 0, 0, 0, 'L', 'e1'],
+    ]
+    # Newest event goes on top, like the real Fights.csv
+    e3 = [['D', 'A', 2, 0, 70, 15, 0, 0, 0, 0, 'W', 'e3']]
+    e4 = [['B', 'D', 0, 0, 44, 33, 1, 1, 0, 0, 'L', 'e4']]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'db.json')
+        state_path = os.path.join(tmp, 'state.json')
+
+        fights_path = _write_fights(old_fights, tmp)
+        assert sorted(update_fighter_db_incremental(fights_path, db_path, state_path)) == ['a', 'b', 'c']
+        assert update_fighter_db_incremental(fights_path, db_path, state_path) == []
+        with open(db_path) as f:
+            before = json.load(f)
+
+        _write_fights(e3 + old_fights, tmp)
+        assert sorted(update_fighter_db_incremental(fights_path, db_path, state_path)) == ['a', 'd']
+        _write_fights(e4 + e3 + old_fights, tmp)
+        assert sorted(update_fighter_db_incremental(fights_path, db_path, state_path)) == ['b', 'd']
+
+        with open(db_path) as f:
+            fighter_db = json.load(f)
+        assert check_consistency(fighter_db, fights_path) == []
+        assert fighter_db == build_fighter_db_for_REBALANCED_model(fights_path)
+        assert list(fighter_db) == ['b', 'd', 'a', 'c']
+        # C never fought again: its entry is untouched
+        assert fighter_db['c'] == before['c']
+        # A's newest bouts: L (e3), W, W (e2)
+        assert fighter_db['a']['win_streak'] == 2
+
+        # Running again is a no-op
+        assert update_fighter_db_incremental(fights_path, db_path, state_path) == []
+
+def test_incremental_update_replays_edited_history():
+    """Test a corrected old bout can't be applied incrementally and falls back to a full replay"""
+    fights = [
+        ['A', 'B', 1, 0, 50, 20, 2, 0, 0, 1, 'W', 'e2'],
+        ['B', 'C', 0, 0, 25, 35, 1, 3, 0, 2, 'W', 'e1'],
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'db.json')
+        state_path = os.path.join(tmp, 'state.json')
+        fights_path = _write_fights(fights, tmp)
+        update_fighter_db_incremental(fights_path, db_path, state_path)
+
+        fights[1][10] = 'L'
+        _write_fights(fights, tmp)
+        assert sorted(update_fighter_db_incremental(fights_path, db_path, state_path)) == ['a', 'b', 'c']
+        with open(db_path) as f:
+            assert json.load(f) == build_fighter_db_for_REBALANCED_model(fights_path)
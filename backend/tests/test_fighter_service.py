@@ -11,8 +11,8 @@ def test_fighter_service():
     """Test fighter database service"""
     # Create a temporary test database
     test_db = {
-        "Conor McGregor": {"avg_kd": 1.2, "avg_strikes": 45},
-        "Khabib Nurmagomedov": {"avg_kd": 0.3, "avg_strikes": 22}
+        "Conor McGregor": {"avg_knockdowns": 1.2, "avg_strikes": 45},
+        "Khabib Nurmagomedov": {"avg_knockdowns": 0.3, "avg_strikes": 22}
     }
     
     with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
@@ -24,11 +24,11 @@ def test_fighter_service():
         
         # Test exact match
         stats = service.get_fighter("Conor McGregor")
-        assert stats["avg_kd"] == 1.2
+        assert stats["avg_knockdowns"] == 1.2
         
         # Test case-insensitive
         stats = service.get_fighter("conor mcgregor")
-        assert stats["avg_kd"] == 1.2
+        assert stats["avg_knockdowns"] == 1.2
         
         # Test search
         results = service.search_fighters("Conor", limit=5)
@@ -36,7 +36,90 @@ def test_fighter_service():
         assert results[0]["name"] == "Conor McGregor"
         
         # Test fighter count
-        assert service.get_fighter_count() == 2
+        assert len(service.table) == 2
         
     finally:
         os.unlink(temp_path)
+
+
+def _make_service(test_db):
+    """Write test_db to a temporary JSON file and load it"""
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+        json.dump(test_db, f)
+        temp_path = f.name
+    try:
+        return FighterService(temp_path)
+    finally:
+        os.unlink(temp_path)
+
+def test_indexed_lookup_ranking():
+    """Test exact > single partial > prefix > first partial ranking"""
+    service = _make_service({
+        "Anthony Silva": {"avg_strikes": 10},
+        "Silva Santos": {"avg_strikes": 20},
+        "Jon Jones": {"avg_strikes": 30},
+        "Jones Jon": {"avg_strikes": 40},
+        "Ilia Topuria": {"avg_strikes": 50}
+    })
+    
+    # Exact (case-insensitive, trimmed)
+    assert service.get_fighter("  jones jon ")["name"] == "Jones Jon"
+    # Single partial match
+    assert service.get_fighter("topur")["name"] == "Ilia Topuria"
+    # Several partials: prefix match wins over roster order
+    assert service.get_fighter("silva")["name"] == "Silva Santos"
+    # Several partials, no prefix: first in roster order
+    assert service.get_fighter("ones")["name"] == "Jon Jones"
+    
+    # Search keeps roster order and respects the limit
+    assert [f["name"] for f in service.search_fighters("jon", limit=10)] == ["Jon Jones", "Jones Jon"]
+    assert [f["name"] for f in service.search_fighters("SILVA", limit=1)] == ["Anthony Silva"]
+    assert service.search_fighters("zz") == []
+    
+    try:
+        service.get_fighter("Conor McGregor")
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+def test_fuzzy_lookup():
+    """Test typo-tolerant lookup and 'Did you mean' suggestions"""
+    service = _make_service({
+        "Khabib Nurmagomedov": {"avg_strikes": 10},
+        "Umar Nurmagomedov": {"avg_strikes": 20},
+        "Alexander Volkanovski": {"avg_strikes": 30},
+        "Jon Jones": {"avg_strikes": 40}
+    })
+    
+    assert service.get_fighter("Khabib Nurmagomedev")["name"] == "Khabib Nurmagomedov"
+    assert service.get_fighter("Volkanowski")["name"] == "Alexander Volkanovski"
+    
+    similar = service.find_similar("Nurmagomedow", limit=2)
+    assert {fighter_name for fighter_name, _ in similar} == {"Khabib Nurmagomedov", "Umar Nurmagomedov"}
+    
+    # Search tops up substring results with close spellings
+    assert [f["name"] for f in service.search_fighters("volkanowski")] == ["Alexander Volkanovski"]
+    assert service.search_fighters("volkanowski", fuzzy=False) == []
+    
+    # Too far from anything: error lists suggestions
+    try:
+        service.get_fighter("Jon Jonesy Smithson")
+        assert False, "expected ValueError"
+    except ValueError as e:
+        assert "Did you mean" in str(e)
+
+def test_snapshot_roundtrip():
+    """Test the binary snapshot restores roster, indexes and version"""
+    from src.snapshots import load_fighter_service
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, 'fighters.json')
+        with open(json_path, 'w') as f:
+            json.dump({"Jon Jones": {"avg_strikes": 30}, "Jones Jon": {"avg_strikes": 40}}, f)
+        
+        first = load_fighter_service(json_path, tmp)
+        second = load_fighter_service(json_path, tmp)
+        assert any(name.endswith('.pkl') for name in os.listdir(tmp))
+        assert second.version == first.version
+        assert second.get_fighter("jon jnes")["name"] == "Jon Jones"
+        assert [f["name"] for f in second.search_fighters("jon")] == ["Jon Jones", "Jones Jon"]
@@ -0,0 +1,34 @@
+# tests/test_fighter_table.py
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+from src.fighter_table import FighterTable, STAT_KEYS
+
+def test_fighter_table_columns():
+    """Test stats are stored as typed columns with dict-style access on top"""
+    table = FighterTable.from_dict({
+        "Jon Jones": {"avg_strikes": 30.5, "win_streak": 3, "total_fights": 20},
+        "Petr Yan": {"avg_strikes": 91.0}
+    })
+    
+    assert len(table) == 2
+    assert "Petr Yan" in table and "Nobody" not in table
+    assert table.columns['avg_strikes'].dtype == np.float64
+    assert table.columns['total_fights'].dtype == np.int32
+    
+    # Missing stats get the REBALANCED defaults
+    assert table["Petr Yan"]["win_rate"] == 0.5
+    assert table["Jon Jones"] == dict(table.items())["Jon Jones"]
+    assert table.record(0)["name"] == "Jon Jones"
+    assert isinstance(table.record(0)["win_streak"], int)
+    
+    # Many fighters at once
+    rows = table.rows(["Petr Yan", "Jon Jones", "Petr Yan"])
+    assert list(rows) == [1, 0, 1]
+    assert list(table.gather(rows)['avg_strikes']) == [91.0, 30.5, 91.0]
+    matrix = table.matrix(rows, ['avg_strikes', 'total_fights'])
+    assert matrix.shape == (3, 2)
+    assert matrix[1].tolist() == [30.5, 20.0]
+    assert table.matrix([0]).shape == (1, len(STAT_KEYS))
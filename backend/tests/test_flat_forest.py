@@ -0,0 +1,80 @@
+# tests/test_flat_forest.py
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from src.flat_forest import FlatForest
+from src.predictor import PredictorService
+
+FEATURES = ['str_diff', 'kd_diff', 'td_diff', 'sub_diff', 'streak_diff', 'win_rate_diff', 'exp_diff']
+
+def _fit_forest():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(400, len(FEATURES))), columns=FEATURES)
+    y = (X['str_diff'] + 0.5 * X['td_diff'] + rng.normal(scale=0.5, size=400) > 0).astype(int)
+    return RandomForestClassifier(n_estimators=25, max_depth=6, random_state=0).fit(X, y), X
+
+def test_flat_forest_matches_sklearn():
+    """Test flat-array scoring matches sklearn to 1e-9 for single rows and batches"""
+    model, X = _fit_forest()
+    
+    for n_threads in (1, 3):
+        flat = FlatForest(model, n_threads=n_threads)
+        assert np.abs(flat.predict_proba(X.to_numpy()) - model.predict_proba(X)).max() < 1e-9
+        assert np.abs(flat.predict_proba(X.to_numpy()[0]) - model.predict_proba(X.iloc[[0]])).max() < 1e-9
+    assert (flat.predict(X.to_numpy()) == model.predict(X)).all()
+
+def test_predictor_engines_agree():
+    """Test PredictorService gives the same answer with either engine"""
+    model, _ = _fit_forest()
+    sklearn_predictor = PredictorService(model, engine='sklearn')
+    flat_predictor = PredictorService(model, engine='flat')
+    
+    pairs = [({'avg_strikes': 60, 'avg_takedowns': 2}, {'avg_strikes': 30}),
+             ({'avg_strikes': 10, 'win_streak': 3}, {'avg_strikes': 45, 'total_fights': 9})]
+    for expected, actual in zip(sklearn_predictor.predict_many(pairs), flat_predictor.predict_many(pairs)):
+        assert abs(expected['probability_fighter1_wins'] - actual['probability_fighter1_wins']) < 1e-9
+    
+    try:
+        PredictorService(model, engine='gpu')
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+def test_flat_forest_snapshot_roundtrip():
+    """Test a saved forest loads memory-mapped and scores identically"""
+    import tempfile
+    model, X = _fit_forest()
+    flat = FlatForest(model)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'forest.flat')
+        flat.save(path)
+        loaded = FlatForest.load(path, mmap_mode='r')
+        assert isinstance(loaded.threshold, np.memmap)
+        assert np.array_equal(loaded.predict_proba(X.to_numpy()), flat.predict_proba(X.to_numpy()))
+        assert list(loaded.feature_names_in_) == FEATURES
+        
+        predictor = PredictorService(loaded, engine='flat')
+        assert len(predictor.get_feature_importance()) == len(FEATURES)
+
+def test_retired_predictor_stops_threads():
+    """Test a retired flat predictor shuts its tree threads down once released, and a closed forest still scores"""
+    import gc
+    model, X = _fit_forest()
+    flat = FlatForest(model, n_threads=2)
+    expected = model.predict_proba(X)
+    assert np.abs(flat.predict_proba(X.to_numpy()) - expected).max() < 1e-9
+    executor = flat._executor
+    
+    predictor = PredictorService(flat, engine='flat')
+    predictor.retire()
+    assert flat._executor is executor  # still referenced: keeps its threads
+    del predictor
+    gc.collect()
+    assert flat._executor is None and executor._shutdown
+    assert np.abs(flat.predict_proba(X.to_numpy()) - expected).max() < 1e-9
+    flat.close()  # idempotent
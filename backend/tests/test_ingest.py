@@ -0,0 +1,55 @@
+# tests/test_ingest.py
+import sys
+import os
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pandas as pd
+from src.ingest import (ingest_all, read_ingested, parse_of, parse_clock, parse_percent,
+                        parse_weight, parse_height, parse_date)
+
+def test_parsers():
+    """Test the raw string formats parse to numbers (missing markers -> NA)"""
+    landed, attempted = parse_of(pd.Series(['134 of 383', '0 of 0', '']))
+    assert landed.tolist()[:2] == [134, 0] and attempted.tolist()[:2] == [383, 0]
+    assert pd.isna(landed[2])
+    
+    clock = parse_clock(pd.Series(['5:12', '0:26', '--']))
+    assert clock.tolist()[:2] == [312.0, 26.0] and pd.isna(clock[2])
+    assert parse_percent(pd.Series(['34%', '---'])).tolist()[0] == 0.34
+    assert parse_weight(pd.Series(['155 lbs.'])).tolist() == [155.0]
+    assert parse_height(pd.Series(['5\' 11"'])).tolist() == [71.0]
+    assert parse_date(pd.Series(['December 06, 2025']))[0] == pd.Timestamp('2025-12-06')
+
+def test_ingest_is_idempotent():
+    """Test typed output, skipping unchanged files and re-ingesting changed ones"""
+    with tempfile.TemporaryDirectory() as raw_dir, tempfile.TemporaryDirectory() as out_dir:
+        events_path = os.path.join(raw_dir, 'raw_events.csv')
+        with open(events_path, 'w') as f:
+            f.write('Event_Id,Name,Date,Location\n'
+                    'e2,UFC 2,"December 06, 2025","Las Vegas, Nevada, USA"\n'
+                    'e1,UFC 1,"November 22, 2025","Doha, Qatar"\n')
+        with open(os.path.join(raw_dir, 'raw_fighters.csv'), 'w') as f:
+            f.write('Fighter_Id,First,Last,Nickname,Ht.,Wt.,Reach,Stance,W,L,D,Belt\n'
+                    'a,Tom,Aaron,,--,155 lbs.,--,,5,3,0,False\n'
+                    'b,Danny,Abbadi,The Assassin,"5\' 11""",155 lbs.,"72.0""",Orthodox,4,6,0,True\n')
+        
+        status = ingest_all(raw_dir, out_dir, chunk_rows=1)
+        assert status == {'fights': 'missing', 'details': 'missing', 'fighters': 'ingested', 'events': 'ingested'}
+        
+        events = read_ingested('events', out_dir)
+        assert list(events.columns) == ['Event_Id', 'Name', 'Date', 'Location']
+        assert events['Date'].tolist() == [pd.Timestamp('2025-12-06'), pd.Timestamp('2025-11-22')]
+        fighters = read_ingested('fighters', out_dir, columns=['Full Name', 'Height_In', 'Reach_In', 'W', 'Belt'])
+        assert fighters['Full Name'].tolist() == ['Tom Aaron', 'Danny Abbadi']
+        assert pd.isna(fighters['Height_In'][0]) and fighters['Height_In'][1] == 71.0
+        assert fighters['Reach_In'][1] == 72.0
+        assert fighters['W'].tolist() == [5, 4] and fighters['Belt'].tolist() == [False, True]
+        
+        # Unchanged raw files are skipped, a changed one is re-ingested
+        assert set(ingest_all(raw_dir, out_dir).values()) == {'missing', 'skipped'}
+        with open(events_path, 'a') as f:
+            f.write('e0,UFC 0,"November 15, 2025","Abu Dhabi, UAE"\n')
+        status = ingest_all(raw_dir, out_dir)
+        assert status['events'] == 'ingested' and status['fighters'] == 'skipped'
+        assert len(read_ingested('events', out_dir)) == 3
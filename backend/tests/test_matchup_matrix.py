@@ -0,0 +1,57 @@
+# tests/test_matchup_matrix.py
+import sys
+import os
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pandas as pd
+from src.fighter_service import FighterService
+from src.matchup_matrix import MatchupMatrices, division_rosters, division_key
+
+class StrikesPredictor:
+    """Stand-in predictor: P(fighter 1 wins) grows with the strike difference"""
+    model_version = 'test'
+
+    def predict_proba_rows(self, table, rows1, rows2):
+        strikes = table.columns['avg_strikes']
+        return 1.0 / (1.0 + np.exp(-(strikes[rows1] - strikes[rows2]) / 10.0))
+
+def _write_data(data_dir):
+    # Newest-first, like Fights.csv: D moved up to Welterweight; A's catch weight bout doesn't count; F retired
+    fights = pd.DataFrame([
+        ['e3', 'A', 'D', 'Catch Weight'],
+        ['e3', 'D', 'E', 'Welterweight'],
+        ['e2', 'B', 'C', 'Lightweight'],
+        ['e2', 'A', 'D', 'Lightweight'],
+        ['e1', 'F', 'E', 'Catch Weight'],
+        ['e0', 'F', 'A', 'Lightweight'],
+    ], columns=['Event_Id', 'Fighter_1', 'Fighter_2', 'Weight_Class'])
+    fights.to_csv(os.path.join(data_dir, 'Fights.csv'), index=False)
+    pd.DataFrame({'Event_Id': ['e0', 'e1', 'e2', 'e3'],
+                  'Date': ['2015-01-01', '2022-01-01', '2025-01-01', '2025-06-01']}).to_csv(
+        os.path.join(data_dir, 'Events.csv'), index=False)
+
+def test_matrices_per_division():
+    """Test rosters, the stored float32 matrices and top-N opponent queries"""
+    service = FighterService(fighters_dict={name: {'avg_strikes': strikes} for name, strikes in
+                                            [('A', 50), ('B', 30), ('C', 10), ('D', 40), ('E', 20), ('F', 60)]})
+    with tempfile.TemporaryDirectory() as tmp:
+        _write_data(tmp)
+        fights_path, events_path = os.path.join(tmp, 'Fights.csv'), os.path.join(tmp, 'Events.csv')
+        rosters = division_rosters(fights_path, events_path, service.table)
+        assert {division: [service.table.names[row] for row in rows] for division, rows in rosters.items()} == \
+            {'Lightweight': ['A', 'B', 'C'], 'Welterweight': ['D', 'E']}
+        assert 'F' in [service.table.names[row] for row in
+                       division_rosters(fights_path, events_path, service.table, active_years=None)['Lightweight']]
+
+        matrices = MatchupMatrices.build(StrikesPredictor(), service, fights_path, events_path, os.path.join(tmp, 'm'))
+        matrix = matrices.matrix('lightweight')
+        assert isinstance(matrix, np.memmap) and matrix.dtype == np.float32 and matrix.shape == (3, 3)
+        assert np.allclose(matrix + matrix.T, 1) and np.allclose(np.diag(matrix), 0.5)
+
+        assert [name for name, _ in matrices.top_opponents('Lightweight', 'A', top=5)] == ['C', 'B']
+        assert [name for name, _ in matrices.top_opponents('Lightweight', 'C', top=1, favorable=False)] == ['A']
+        rows, columns, probabilities = matrices.slice('Lightweight', ['B'])
+        assert rows == ['B'] and columns == ['A', 'B', 'C'] and probabilities.shape == (1, 3)
+        assert division_key("Women's Strawweight") == 'womens-strawweight'
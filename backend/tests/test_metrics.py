@@ -0,0 +1,32 @@
+# tests/test_metrics.py
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.metrics import Registry, STAGE_SECONDS, span
+
+def test_histogram_exposition():
+    """Test histogram buckets are cumulative and counters render per label set"""
+    registry = Registry()
+    requests = registry.counter('requests_total', 'Requests', ('route',))
+    latency = registry.histogram('latency_seconds', 'Latency', ('route',), buckets=(0.01, 0.1))
+    requests.inc('/a')
+    requests.inc('/a')
+    for seconds in (0.005, 0.05, 0.5):
+        latency.observe(seconds, '/a')
+    registry.callback('cache_entries', 'Entries', lambda: 7)
+
+    lines = registry.render().splitlines()
+    assert 'requests_total{route="/a"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="0.01"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{route="/a"} 3' in lines
+    assert '# TYPE cache_entries gauge' in lines and 'cache_entries 7' in lines
+
+def test_span_records_stage():
+    """Test a span outside a request still lands in the stage histogram"""
+    before = STAGE_SECONDS.count('test-stage')
+    with span('test-stage'):
+        pass
+    assert STAGE_SECONDS.count('test-stage') == before + 1
@@ -6,28 +6,127 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 import numpy as np
 from src.predictor import PredictorService
 
-# Mock model and scaler for testing
+# Mock model for testing
 class MockModel:
     def predict_proba(self, X):
         # Always predict 75% for Red
-        return np.array([[0.25, 0.75]])
-
-class MockScaler:
-    def transform(self, X):
-        return X
+        return np.array([[0.25, 0.75]] * len(X))
 
 def test_predictor_service():
     """Test the predictor service"""
     model = MockModel()
-    scaler = MockScaler()
-    predictor = PredictorService(model, scaler)
+    predictor = PredictorService(model)
     
     # Test prediction
-    prob = predictor.predict_from_stats(kd=2, strikes=35, takedowns=1)
+    result = predictor.predict_from_diffs({'str_diff': 15, 'kd_diff': 2, 'td_diff': 1})
+    prob = result['probability_fighter1_wins']
     assert 0 <= prob <= 1
     assert abs(prob - 0.75) < 0.01  # Should match mock
     
     # Test confidence calculation
-    assert predictor.calculate_confidence(0.9) == "High"
-    assert predictor.calculate_confidence(0.65) == "Medium"
-    assert predictor.calculate_confidence(0.51) == "Low"
\ No newline at end of file
+    assert predictor.calculate_confidence(0.9) == "Very High"
+    assert predictor.calculate_confidence(0.8) == "High"
+    assert predictor.calculate_confidence(0.3) == "Medium"
+    assert predictor.calculate_confidence(0.6) == "Low"
+    assert predictor.calculate_confidence(0.51) == "Very Low (Toss-up)"
+
+class MockBatchModel:
+    feature_names_in_ = np.array(['str_diff', 'kd_diff', 'td_diff', 'sub_diff',
+                                  'streak_diff', 'win_rate_diff', 'exp_diff'])
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def predict_proba(self, X):
+        # Fighter 1 wins whenever he out-strikes Fighter 2
+        self.calls += 1
+        p = np.where(X['str_diff'].to_numpy() > 0, 0.8, 0.3)
+        return np.column_stack([1 - p, p])
+
+def test_predict_many_single_model_call():
+    """Test a whole card is scored with one predict_proba call"""
+    model = MockBatchModel()
+    predictor = PredictorService(model)
+    
+    strong = {'avg_strikes': 80, 'win_rate': 0.8, 'total_fights': 20}
+    weak = {'avg_strikes': 20, 'win_rate': 0.4, 'total_fights': 5}
+    
+    results = predictor.predict_many([(strong, weak), (weak, strong), (strong, weak)])
+    assert model.calls == 1
+    assert len(results) == 3
+    assert results[0]['predicted_winner_id'] == 'fighter1'
+    assert results[1]['predicted_winner_id'] == 'fighter2'
+    assert abs(results[1]['probability_fighter1_wins'] - 0.3) < 1e-9
+    
+    # Single fight goes through the same path
+    single = predictor.predict_from_fighters(strong, weak)
+    assert single['probability_fighter1_wins'] == results[0]['probability_fighter1_wins']
+    assert predictor.predict_many([]) == []
+
+def test_predict_matchup_cache():
+    """Test cache hits, symmetric red/blue sharing and versioned entries"""
+    from src.prediction_cache import PredictionCache
+    
+    model = MockBatchModel()
+    cache = PredictionCache(max_size=2)
+    predictor = PredictorService(model, cache=cache, model_version='m1', symmetric=True)
+    
+    a = {'id': 'A', 'avg_strikes': 80}
+    b = {'id': 'B', 'avg_strikes': 20}
+    c = {'id': 'C', 'avg_strikes': 50}
+    
+    first = predictor.predict_matchup(a, b, 'db1')
+    again = predictor.predict_matchup(a, b, 'db1')
+    swapped = predictor.predict_matchup(b, a, 'db1')
+    assert model.calls == 1
+    assert again['probability_fighter1_wins'] == first['probability_fighter1_wins']
+    assert abs(swapped['probability_fighter1_wins'] - first['probability_fighter2_wins']) < 1e-12
+    assert cache.stats()['hits'] == 2
+    
+    # Bounded LRU: a third matchup evicts the oldest entry
+    predictor.predict_matchup(a, c, 'db1')
+    predictor.predict_matchup(b, c, 'db1')
+    assert cache.stats()['size'] == 2
+    assert cache.stats()['evictions'] == 1
+    
+    # A new fighter DB version gets its own entry; old-version callers still hit theirs
+    predictor.predict_matchup(b, c, 'db2')
+    assert model.calls == 4
+    predictor.predict_matchup(b, c, 'db1')
+    predictor.predict_matchup(b, c, 'db2')
+    assert model.calls == 4
+    assert cache.stats()['fighter_db_version'] == 'db2'
+    assert cache.stats()['invalidations'] == 0
+    
+    # ...and the LRU ages the old versions out
+    predictor.predict_matchup(a, b, 'db2')
+    predictor.predict_matchup(a, c, 'db2')
+    assert cache.stats()['size'] == 2
+    assert predictor.predict_matchup(b, c, 'db1') and model.calls == 7
+
+def test_predict_rows_matches_dicts():
+    """Test the columnar FighterTable path gives the same results as stats dicts"""
+    from src.fighter_table import FighterTable
+    
+    table = FighterTable.from_dict({
+        'A': {'avg_strikes': 80, 'win_streak': 3},
+        'B': {'avg_strikes': 20, 'win_rate': 0.9},
+        'C': {'avg_strikes': 50, 'total_fights': 12}
+    })
+    rows1, rows2 = [0, 1, 2], [1, 2, 0]
+    
+    for symmetric in (False, True):
+        model = MockBatchModel()
+        predictor = PredictorService(model, symmetric=symmetric)
+        from_rows = predictor.predict_rows(table, rows1, rows2)
+        from_dicts = predictor.predict_many([(table.record(r1), table.record(r2)) for r1, r2 in zip(rows1, rows2)])
+        assert model.calls == 2
+        assert from_rows == from_dicts
+    
+    # Row-keyed matchups share cache entries with the dict path
+    from src.prediction_cache import PredictionCache
+    predictor = PredictorService(MockBatchModel(), cache=PredictionCache(), symmetric=True)
+    first = predictor.predict_matchup_rows(table, 0, 1, 'db1')
+    assert predictor.predict_matchup(table['B'], table['A'], 'db1')['probability_fighter2_wins'] == \
+        first['probability_fighter1_wins']
+    assert predictor.cache.stats()['hits'] == 1
@@ -0,0 +1,56 @@
+# tests/test_ratings.py
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pandas as pd
+from src.ratings import RatingEngine, INITIAL_RATING, INITIAL_DEVIATION, days_since_epoch, rate_fights_csv
+
+def test_rating_update():
+    """Test a win moves ratings symmetrically and shrinks deviations; a no contest moves nothing"""
+    engine = RatingEngine(capacity=1)
+    rated = engine.rate_event(['A', 'C'], ['B', 'D'], np.array([1.0, np.nan]))
+
+    # Pre-event values first, then post-event
+    assert rated[0, :4].tolist() == [INITIAL_RATING, INITIAL_DEVIATION, INITIAL_RATING, INITIAL_DEVIATION]
+    a, a_deviation = engine.get('A')
+    b, b_deviation = engine.get('B')
+    assert a > INITIAL_RATING > b and np.isclose(a - INITIAL_RATING, INITIAL_RATING - b)
+    assert a_deviation < INITIAL_DEVIATION and a_deviation == b_deviation
+    assert engine.get('C') == (INITIAL_RATING, INITIAL_DEVIATION)
+    assert len(engine) == 4  # arrays grew past the initial capacity
+
+    # Beating a stronger opponent is worth more than beating a weaker one
+    engine.rate_event(['E'], ['A'], np.array([1.0]))
+    engine.rate_event(['F'], ['B'], np.array([1.0]))
+    assert engine.get('E')[0] > engine.get('F')[0]
+
+def test_deviation_grows_out_of_the_cage():
+    """Test deviation grows with time since the last fight, capped at the initial value"""
+    engine = RatingEngine()
+    day = days_since_epoch(['2020-01-01'])[0]
+    engine.rate_event(['A'], ['B'], np.array([1.0]), day=day)
+    settled = engine.get('A')[1]
+    assert engine.get('A', day=day)[1] == settled
+    assert settled < engine.get('A', day=day + 365)[1] < engine.get('A', day=day + 3650)[1] <= INITIAL_DEVIATION
+
+def test_incremental_equals_full_pass():
+    """Test applying a new event to saved state gives the same ratings as one full pass"""
+    # Newest-first, like Fights.csv
+    fights = pd.DataFrame({
+        'Fighter_1': ['A', 'C', 'A', 'B', 'A'],
+        'Fighter_2': ['C', 'B', 'B', 'C', 'C'],
+        'Result_1': ['W', 'L', 'W', 'NC', 'D'],
+        'Event_Id': ['e3', 'e3', 'e2', 'e1', 'e1']
+    })
+    dates = fights['Event_Id'].map({'e1': '2020-01-01', 'e2': '2020-06-01', 'e3': '2021-01-01'})
+    full, rated = rate_fights_csv(fights, dates)
+
+    old, _ = rate_fights_csv(fights.iloc[2:], dates.iloc[2:])
+    resumed, _ = rate_fights_csv(fights.iloc[:2], dates.iloc[:2], RatingEngine.from_dict(old.to_dict()))
+    assert resumed.ratings() == full.ratings()
+
+    # Rows stay aligned with the newest-first frame; A's e3 rating starts from its e2 result
+    assert rated.loc[0, 'pre_rating_1'] == rated.loc[2, 'post_rating_1']
+    assert full.get('A')[0] > full.get('C')[0]
@@ -0,0 +1,54 @@
+# tests/test_simulation.py
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+from src.fighter_table import FighterTable
+from src.simulation import win_matrix, simulate_bracket, simulate_title_defenses
+
+class StrikesPredictor:
+    """Stand-in predictor: the fighter with more strikes wins 80% of the time, counting calls"""
+    calls = 0
+
+    def predict_proba_rows(self, table, rows1, rows2):
+        self.calls += 1
+        strikes = table.columns['avg_strikes']
+        return np.where(strikes[rows1] > strikes[rows2], 0.8, 0.2)
+
+def test_win_matrix_one_call():
+    """Test the pairwise matrix is built in one call and is consistent (P[i, j] + P[j, i] == 1)"""
+    table = FighterTable.from_dict({name: {'avg_strikes': strikes} for name, strikes in
+                                    [('A', 40), ('B', 30), ('C', 20), ('D', 10)]})
+    predictor = StrikesPredictor()
+    matrix = win_matrix(predictor, table, [0, 1, 2, 3])
+    assert predictor.calls == 1
+    assert np.allclose(matrix + matrix.T, 1) and np.all(np.diag(matrix) == 0.5)
+    assert np.isclose(matrix[0, 3], 0.8) and np.isclose(matrix[3, 0], 0.2)
+
+def test_bracket_probabilities():
+    """Test the bracket matches exact probabilities and a seed reproduces a run"""
+    # A beats anyone 80% of the time; everyone else is a coin flip
+    matrix = np.full((4, 4), 0.5)
+    matrix[0, 1:] = 0.8
+    matrix[1:, 0] = 0.2
+    result = simulate_bracket(matrix, n_samples=200_000, seed=1)
+    assert result['samples'] == 200_000
+    assert abs(result['champion'][0] - 0.64) < 0.01
+    assert abs(result['rounds'][0][0] - 0.8) < 0.01
+    assert np.isclose(result['champion'].sum(), 1.0)
+    assert np.array_equal(simulate_bracket(matrix, n_samples=1000, seed=3)['champion'],
+                          simulate_bracket(matrix, n_samples=1000, seed=3)['champion'])
+
+def test_title_defenses_and_time_budget():
+    """Test the champion must win every defense, and a zero time budget still runs one chunk"""
+    matrix = np.full((3, 3), 0.5)
+    matrix[0, 1:] = 0.9
+    matrix[1:, 0] = 0.1
+    result = simulate_title_defenses(matrix, n_samples=100_000, seed=2)
+    # Champion keeps the belt with 0.9 * 0.9; challenger 2 wins it only in the last fight
+    assert abs(result['champion'][0] - 0.81) < 0.01
+    assert abs(result['champion'][2] - (0.9 * 0.1 + 0.1 * 0.5)) < 0.01
+
+    limited = simulate_title_defenses(matrix, n_samples=10_000_000, time_budget=0.0, seed=2)
+    assert 0 < limited['samples'] < 10_000_000
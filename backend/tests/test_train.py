@@ -0,0 +1,89 @@
+# tests/test_train.py
+import sys
+import os
+import json
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import joblib
+import numpy as np
+import pandas as pd
+from src.train import cache_folds, candidates, search, train
+
+SMALL_GRID = {'n_estimators': [5], 'max_depth': [2, 4]}
+
+def _write_data(data_dir, n_fights=40):
+    """Tiny Fights/Events/Fighters CSVs where the busier striker usually wins"""
+    rng = np.random.default_rng(0)
+    names = [f'Fighter {i}' for i in range(10)]
+    fights = []
+    for i in range(n_fights):
+        a, b = rng.choice(len(names), size=2, replace=False)
+        str1, str2 = rng.integers(0, 100, size=2)
+        fights.append({
+            'Fight_Id': f'f{i}', 'Event_Id': f'e{i // 2}',
+            'Fighter_1': names[a], 'Fighter_2': names[b], 'Fighter_Id_1': f'id{a}', 'Fighter_Id_2': f'id{b}',
+            'KD_1': int(rng.integers(0, 2)), 'KD_2': int(rng.integers(0, 2)), 'STR_1': str1, 'STR_2': str2,
+            'TD_1': 0, 'TD_2': 1, 'SUB_1': 0, 'SUB_2': 0,
+            'Result_1': 'W' if str1 >= str2 else 'L', 'Weight_Class': 'Lightweight'
+        })
+    # Newest-first, like Fights.csv
+    pd.DataFrame(fights[::-1]).to_csv(os.path.join(data_dir, 'Fights.csv'), index=False)
+    dates = pd.date_range('2020-01-01', periods=n_fights // 2, freq='14D').strftime('%Y-%m-%d')
+    pd.DataFrame({'Event_Id': [f'e{i}' for i in range(n_fights // 2)], 'Date': dates}).to_csv(
+        os.path.join(data_dir, 'Events.csv'), index=False)
+    pd.DataFrame({'Fighter_Id': [f'id{i}' for i in range(len(names))], 'Full Name': names}).to_csv(
+        os.path.join(data_dir, 'Fighters.csv'), index=False)
+
+def test_search_is_reproducible():
+    """Test cached folds + the parallel search give the same ranking every run"""
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(60, 3))
+    y = (X[:, 0] + 0.3 * rng.normal(size=60) > 0).astype(int)
+    param_candidates = candidates(SMALL_GRID, base_params={})
+    assert [c['max_depth'] for c in param_candidates] == [2, 4]
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        fold_dir = cache_folds(X, y, cache_dir, n_folds=3, seed=7)
+        assert np.load(os.path.join(fold_dir, 'fold-0-X_train.npy')).shape == (40, 3)
+        first = search(fold_dir, 3, param_candidates, seed=7, n_jobs=2, scoring='accuracy')
+        again = search(cache_folds(X, y, cache_dir, n_folds=3, seed=7), 3, param_candidates, seed=7, n_jobs=1,
+                       scoring='accuracy')
+
+    assert first == again
+    assert first[0]['mean']['accuracy'] >= first[1]['mean']['accuracy']
+    assert set(first[0]['mean']) == {'accuracy', 'log_loss', 'brier', 'roc_auc'}
+
+def test_fold_cache_is_keyed_by_features():
+    """Test new feature values or names on the same data never reuse cached folds"""
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(30, 2))
+    y = (X[:, 0] > 0).astype(int)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        fold_dir = cache_folds(X, y, cache_dir, n_folds=3, feature_names=['a', 'b'])
+        assert cache_folds(X, y, cache_dir, n_folds=3, feature_names=['a', 'b']) == fold_dir
+        assert cache_folds(X, y, cache_dir, n_folds=3, feature_names=['a', 'c']) != fold_dir
+        changed = cache_folds(X * 2, y, cache_dir, n_folds=3, feature_names=['a', 'b'])
+        assert changed != fold_dir
+        parts = [np.load(os.path.join(changed, f'fold-0-X_{part}.npy')) for part in ('train', 'test')]
+        assert np.isclose(sum(part.sum() for part in parts), (X * 2).sum())
+
+def test_train_writes_versioned_artifact():
+    """Test train() saves a loadable model and a metadata sidecar, named by data + config"""
+    with tempfile.TemporaryDirectory() as data_dir, tempfile.TemporaryDirectory() as models_dir, \
+            tempfile.TemporaryDirectory() as cache_dir:
+        _write_data(data_dir)
+        metadata = train(data_dir, models_dir, cache_dir, grid=SMALL_GRID, n_folds=2, n_jobs=1)
+
+        with open(os.path.join(models_dir, f"ufc_predictor-{metadata['run_id']}.json")) as f:
+            sidecar = json.load(f)
+        assert sidecar['feature_names'][:3] == ['kd_diff', 'kd_ratio', 'kd_dominance']
+        assert sidecar['data']['rows'] == 40 and len(sidecar['search']) == 2
+        assert set(sidecar['timing_seconds']) == {'features', 'search', 'fit', 'total'}
+
+        model = joblib.load(os.path.join(models_dir, sidecar['model_file']))
+        assert list(model.feature_names_in_) == sidecar['feature_names']
+
+        # Same data and config -> same run id; not promoted unless asked
+        assert train(data_dir, models_dir, cache_dir, grid=SMALL_GRID, n_folds=2, n_jobs=1)['run_id'] == metadata['run_id']
+        assert not os.path.exists(os.path.join(models_dir, 'ufc_predictor.joblib'))
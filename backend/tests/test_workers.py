@@ -0,0 +1,27 @@
+# tests/test_workers.py
+import sys
+import os
+import threading
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+from src.workers import BoundedExecutor, Overloaded
+
+def test_bounded_executor_rejects_when_full():
+    """Test tasks beyond workers + queue are refused with a Retry-After hint, and capacity comes back"""
+    executor = BoundedExecutor(max_workers=1, max_queue=1, name='test')
+    release = threading.Event()
+    try:
+        running = executor.submit(release.wait)
+        queued = executor.submit(lambda: 'queued')
+        with pytest.raises(Overloaded) as overloaded:
+            executor.submit(lambda: 'rejected')
+        assert overloaded.value.retry_after >= 1
+        assert executor.pending == 2
+        
+        release.set()
+        assert running.result(timeout=5) and queued.result(timeout=5) == 'queued'
+        assert executor.submit(lambda: 'accepted').result(timeout=5) == 'accepted'
+    finally:
+        release.set()
+        executor.shutdown()